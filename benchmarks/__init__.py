@@ -0,0 +1,8 @@
+"""
+SlackLog benchmarks
+===================
+
+Benchmark suite that measures the parser and the formatters over the ChangeLogs in ``test/changelogs``.
+
+Run it either with ``python -m benchmarks`` or ``python setup.py benchmark``.
+"""
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+SlackLog benchmark suite
+========================
+
+For each ChangeLog in the corpus directory, measures the parse time, the format time of every formatter,
+the peak memory of parsing, and the parsing throughput.  The results are written out as JSON, and can be
+compared against the results of an earlier run to catch regressions.
+"""
+from __future__ import print_function
+
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from optparse import OptionParser
+from timeit import default_timer
+
+import slacklog
+from slacklog.scripts import read
+from slacklog.parsers import SlackLogParser
+from slacklog.formatters import SlackLogTxtFormatter, SlackLogRssFormatter, SlackLogAtomFormatter, \
+    SlackLogJsonFormatter, SlackLogPyblosxomFormatter
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None  # Python 2.7: peak memory is not measured
+
+CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test', 'changelogs')
+"""Default corpus directory."""
+
+
+def best_of(repeat, func, *args):
+    """
+    Call the function repeatedly, and return the best wall time and the last result.
+
+    :param repeat: :py:class:`int` -- Number of calls.
+    :param func: Function to call.
+    :return: [:py:class:`float`, object] -- a two element list: best time in seconds, and the return value.
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = default_timer()
+        result = func(*args)
+        elapsed = default_timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return [best, result]
+
+
+def best_of_fresh(repeat, setup, func):
+    """
+    Call the function repeatedly with a fresh argument, and return the best wall time and the last result.
+
+    The argument is created by calling setup before each call, and the setup is not timed.  This keeps the caches
+    that the first call fills, e.g. escaped descriptions and lazily computed identifiers, from making the later calls
+    look faster.
+
+    :param repeat: :py:class:`int` -- Number of calls.
+    :param setup: Function that returns the argument.
+    :param func: Function to call.
+    :return: [:py:class:`float`, object] -- a two element list: best time in seconds, and the return value.
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        arg = setup()
+        start = default_timer()
+        result = func(arg)
+        elapsed = default_timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return [best, result]
+
+
+def peak_memory(func, *args):
+    """
+    Return the peak memory allocated while calling the function.
+
+    :param func: Function to call.
+    :return: :py:class:`int` -- Peak memory in bytes, or :py:const:`None` if it can not be measured.
+    """
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    try:
+        func(*args)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def formatters(name, datadir):
+    """
+    Return the formatters to benchmark, configured like the example scripts do.
+
+    :param name: :py:class:`unicode` -- Distro version, e.g. 'slackware64 current'.
+    :param datadir: Directory for the PyBlosxom entries.
+    :return: [(:py:class:`str`, :any:`SlackLogFormatter`)] -- list of formatter names and formatters.
+    """
+    txt = SlackLogTxtFormatter()
+
+    rss = SlackLogRssFormatter()
+    rss.slackware = name
+    rss.rssLink = u'http://localhost/%s.rss' % name.replace(u' ', u'-')
+    rss.description = u'Recent changes in %s' % name
+    rss.language = u'en'
+
+    atom = SlackLogAtomFormatter()
+    atom.slackware = name
+    atom.link = u'http://localhost/%s.atom' % name.replace(u' ', u'-')
+
+    json_ = SlackLogJsonFormatter()
+
+    pyblosxom = SlackLogPyblosxomFormatter()
+    pyblosxom.slackware = name
+    pyblosxom.datadir = datadir
+    pyblosxom.quiet = True
+    pyblosxom.pyfilemtime = True
+    pyblosxom.overwrite = True
+    pyblosxom.backup = False
+
+    return [('txt', txt), ('rss', rss), ('atom', atom), ('json', json_), ('pyblosxom', pyblosxom)]
+
+
+def benchmark_changelog(path, encoding, repeat, datadir):
+    """
+    Benchmark one ChangeLog.
+
+    :param path: ChangeLog file name.
+    :param encoding: ChangeLog encoding.
+    :param repeat: :py:class:`int` -- How many times each measurement is repeated.
+    :param datadir: Scratch directory for the PyBlosxom entries.
+    :return: :py:class:`dict` -- Measurements.
+    """
+    name = os.path.splitext(os.path.basename(path))[0].replace('-', ' ', 1)
+    read_time, txt = best_of(repeat, read, path, encoding)
+    parser = SlackLogParser()
+    parser.quiet = True
+    parse_time, log = best_of(repeat, parser.parse, txt)
+    entries = len(log.entries)
+    pkgs = sum([len(entry.pkgs) for entry in log.entries])
+    result = {
+        'bytes': os.path.getsize(path),
+        'entries': entries,
+        'pkgs': pkgs,
+        'read': read_time,
+        'parse': parse_time,
+        'parse_peak_memory': peak_memory(parser.parse, txt),
+        'entries_per_sec': entries / parse_time if parse_time else None,
+        'format': {},
+    }
+    for formatter_name, formatter in formatters(u'%s' % name, datadir):
+        result['format'][formatter_name] = best_of_fresh(repeat, lambda: parser.parse(txt), formatter.format)[0]
+    return result
+
+
+def import_times(repeat):
+    """
+    Measure the time it takes to import the SlackLog modules in a fresh interpreter.
+
+    The bare interpreter startup time is subtracted from the module import times.
+
+    :param repeat: :py:class:`int` -- How many times each measurement is repeated.
+    :return: :py:class:`dict` -- Interpreter startup, and import time of each module, in seconds.
+    """
+    def python(statement):
+        subprocess.check_call([sys.executable, '-c', statement])
+
+    interpreter = best_of(repeat, python, 'pass')[0]
+    times = {'interpreter': interpreter}
+    for module in ('slacklog', 'slacklog.models', 'slacklog.parsers', 'slacklog.formatters', 'slacklog.scripts'):
+        times[module] = max(0.0, best_of(repeat, python, 'import %s' % module)[0] - interpreter)
+    return times
+
+
+def run(corpus, encoding, repeat):
+    """
+    Benchmark every ChangeLog in the corpus directory.
+
+    :param corpus: Directory of ChangeLogs.
+    :param encoding: ChangeLog encoding.
+    :param repeat: :py:class:`int` -- How many times each measurement is repeated.
+    :return: :py:class:`dict` -- Measurements, ready to be dumped as JSON.
+    """
+    results = {}
+    datadir = tempfile.mkdtemp(prefix='slacklog-benchmark-')
+    try:
+        for changelog in sorted(os.listdir(corpus)):
+            results[changelog] = benchmark_changelog(os.path.join(corpus, changelog), encoding, repeat, datadir)
+    finally:
+        shutil.rmtree(datadir, True)
+    return {
+        'slacklog': slacklog.__version__,
+        'python': platform.python_version(),
+        'repeat': repeat,
+        'import': import_times(max(repeat, 5)),
+        'results': results,
+    }
+
+
+def timings(result):
+    """
+    Flatten the time measurements of one ChangeLog.
+
+    :param result: :py:class:`dict` -- Measurements of one ChangeLog.
+    :return: :py:class:`dict` -- Measurement name to seconds.
+    """
+    flat = {'read': result['read'], 'parse': result['parse']}
+    for formatter_name, seconds in result['format'].items():
+        flat['format.%s' % formatter_name] = seconds
+    return flat
+
+
+def compare(old, new, threshold):
+    """
+    Compare two benchmark runs.
+
+    :param old: :py:class:`dict` -- Earlier results.
+    :param new: :py:class:`dict` -- Current results.
+    :param threshold: :py:class:`float` -- Allowed relative slowdown, e.g. 0.1 for 10%.
+    :return: [:py:class:`str`] -- Descriptions of the regressions.
+    """
+    regressions = []
+    for module in sorted(new.get('import', {})):
+        before = old.get('import', {}).get(module)
+        after = new['import'][module]
+        if module != 'interpreter' and before and after > before * (1 + threshold):
+            regressions.append('import %s: %.4fs -> %.4fs (+%.0f%%)'
+                               % (module, before, after, 100 * (after / before - 1)))
+    for changelog in sorted(new['results']):
+        if changelog not in old['results']:
+            continue
+        old_timings = timings(old['results'][changelog])
+        new_timings = timings(new['results'][changelog])
+        for measurement in sorted(new_timings):
+            before = old_timings.get(measurement)
+            after = new_timings[measurement]
+            if before and after > before * (1 + threshold):
+                regressions.append('%s: %s: %.4fs -> %.4fs (+%.0f%%)'
+                                   % (changelog, measurement, before, after, 100 * (after / before - 1)))
+    return regressions
+
+
+def main(argv=None):
+    optionParser = OptionParser(usage='USAGE: %prog [options]',
+                                description='Benchmark SlackLog parser and formatters')
+    optionParser.add_option('--corpus', help='Directory of ChangeLogs [default: %default]',
+                            metavar='DIR', default=CORPUS)
+    optionParser.add_option('--encoding', help='ChangeLog encoding [default: %default]',
+                            default='iso8859-1')
+    optionParser.add_option('--repeat', help='Repeat each measurement NUM times [default: %default]',
+                            metavar='NUM', type='int', default=3)
+    optionParser.add_option('--out', help='Write JSON results to FILE [default: stdout]',
+                            metavar='FILE')
+    optionParser.add_option('--compare', help='Compare against earlier JSON results in FILE',
+                            metavar='FILE')
+    optionParser.add_option('--threshold', help='Allowed relative slowdown [default: %default]',
+                            metavar='RATIO', type='float', default=0.1)
+    (opts, args) = optionParser.parse_args(argv)
+
+    results = run(opts.corpus, opts.encoding, opts.repeat)
+
+    data = json.dumps(results, indent=4, sort_keys=True)
+    if opts.out:
+        with open(opts.out, 'w') as f:
+            f.write(data)
+            f.write('\n')
+    else:
+        print(data)
+
+    if opts.compare:
+        with open(opts.compare) as f:
+            old = json.load(f)
+        regressions = compare(old, results, opts.threshold)
+        for regression in regressions:
+            print('Regression: %s' % regression, file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
@@ -23,5 +23,8 @@ extensions = [
     'sphinx.ext.viewcode'
 ]
 
+# NumPy is an optional dependency of slacklog.arrays
+autodoc_mock_imports = ['numpy']
+
 # http://www.sphinx-doc.org/en/stable/theming.html
 html_theme = 'nature'
@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-from setuptools import setup
+from setuptools import setup, Command
 import slacklog
 
 import unittest
@@ -9,6 +9,32 @@ def my_test_suite():
     test_suite = test_loader.discover('test', pattern='*.py')
     return test_suite
 
+
+class BenchmarkCommand(Command):
+    description = 'run the benchmark suite over test/changelogs'
+    user_options = [
+        ('out=', 'o', 'write JSON results to FILE [default: stdout]'),
+        ('repeat=', 'r', 'repeat each measurement NUM times'),
+        ('compare=', 'c', 'compare against earlier JSON results in FILE'),
+    ]
+
+    def initialize_options(self):
+        self.out = None
+        self.repeat = None
+        self.compare = None
+
+    def finalize_options(self):
+        pass
+
+    def run(self):
+        from benchmarks.suite import main
+        argv = []
+        for option in ('out', 'repeat', 'compare'):
+            if getattr(self, option) is not None:
+                argv.extend(['--%s' % option, str(getattr(self, option))])
+        if main(argv):
+            raise SystemExit(1)
+
 setup(
     name='slacklog',
     version=slacklog.__version__,
@@ -28,7 +54,15 @@ setup(
             'slacklog2pyblosxom = slacklog.scripts:slacklog2pyblosxom',
             'slacklog2rss       = slacklog.scripts:slacklog2rss',
             'slacklog2txt       = slacklog.scripts:slacklog2txt',
-            'slacklog2json      = slacklog.scripts:slacklog2json'
+            'slacklog2json      = slacklog.scripts:slacklog2json',
+            'slacklog2sqlite    = slacklog.scripts:slacklog2sqlite',
+            'slacklog-serve     = slacklog.scripts:slacklog_serve',
+            'slacklog-watch     = slacklog.scripts:slacklog_watch',
+            'slacklog-fetch     = slacklog.scripts:slacklog_fetch',
+            'slacklog-pkg-history = slacklog.scripts:slacklog_pkg_history',
+            'slacklog-search    = slacklog.scripts:slacklog_search',
+            'slacklog-diff      = slacklog.scripts:slacklog_diff',
+            'slacklog-rollup    = slacklog.scripts:slacklog_rollup'
         ]
     },
     url='http://pypi.python.org/pypi/slacklog/',
@@ -40,7 +74,7 @@ setup(
             ]),
     python_requires='>=2.7, !=3.0.*, !=3.1.*, !=3.2.*, !=3.3.*, <4',
     install_requires=['python-dateutil>=2.1,<3', ],
-    extras_require={'docs': ['sphinx>=1.8.5', ]},
+    extras_require={'docs': ['sphinx>=1.8.5', ], 'numpy': ['numpy', ]},
     classifiers=[
         'Development Status :: 4 - Beta',
         'Environment :: Console',
@@ -58,5 +92,6 @@ setup(
         'Topic :: Utilities',
         ],
     keywords='slackware changelog rss atom',
-    test_suite='setup.my_test_suite'
+    test_suite='setup.my_test_suite',
+    cmdclass={'benchmark': BenchmarkCommand}
     )
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+SlackLog arrays
+===============
+
+SlackLog arrays export a :any:`SlackLog` to NumPy structured arrays, for vectorized statistics, e.g. updates per
+month, or the time between security fixes.
+
+This module requires NumPy (``pip install slacklog[numpy]``).  The other SlackLog modules do not import it.
+
+The entries are exported with :py:data:`ENTRY_DTYPE`, and the packages with :py:data:`PKG_DTYPE`.  The package
+names are numbered, so that they can be compared as integers: the same :any:`SlackLogArrays` gives the same package
+the same number in every log.
+"""
+import calendar
+
+import numpy
+
+from slacklog.indexes import pkg_short_name
+from slacklog.models import SlackLog, PKG_ACTIONS
+
+ENTRY_DTYPE = numpy.dtype([('entry', numpy.int32),
+                           ('timestamp', 'datetime64[s]'),
+                           ('pkgs', numpy.int32),
+                           ('security', numpy.bool_)])
+"""Entry fields: position of the entry in the log, timestamp in UTC, number of packages, and
+:py:attr:`SlackLogEntry.security`."""
+
+PKG_DTYPE = numpy.dtype([('entry', numpy.int32),
+                         ('timestamp', 'datetime64[s]'),
+                         ('name', numpy.int32),
+                         ('action', numpy.int8),
+                         ('security', numpy.bool_)])
+"""Package fields: position of the entry in the log, timestamp of the entry, number of the package name (see
+:py:attr:`SlackLogArrays.names`), position of :py:attr:`SlackLogPkg.action` in :py:data:`PKG_ACTIONS`, and
+:py:attr:`SlackLogPkg.security`."""
+
+
+class SlackLogArrays (object):
+    """
+    Exports logs to NumPy structured arrays.
+    """
+
+    def __init__(self):
+        self.names = []
+        """Package names (see :py:func:`slacklog.indexes.pkg_short_name`), in the order of their numbers."""
+        self.numbers = {}
+        """Numbers of the package names, keyed by name."""
+        self.actions = dict([(action, code) for code, action in enumerate(PKG_ACTIONS)])
+        """Codes of the actions, keyed by action."""
+
+    def number(self, pkg):
+        """
+        Return the number of the package name, numbering it if needed.
+
+        :param pkg: :py:class:`unicode` -- Package, as in :py:attr:`SlackLogPkg.pkg`.
+        :return: :py:class:`int` -- Position of the package name in :py:attr:`names`.
+        """
+        name = pkg_short_name(pkg)
+        number = self.numbers.get(name)
+        if number is None:
+            number = len(self.names)
+            self.names.append(name)
+            self.numbers[name] = number
+        return number
+
+    def entries(self, log):
+        """
+        Return the entries of the log.
+
+        :param log: :any:`SlackLog` -- in-memory representation of the log.
+        :return: :py:class:`numpy.ndarray` -- The entries, in the order they are in the log, as :py:data:`ENTRY_DTYPE`.
+        """
+        assert(isinstance(log, SlackLog))
+        array = numpy.zeros(len(log.entries), ENTRY_DTYPE)
+        array['entry'] = numpy.arange(len(log.entries))
+        array['timestamp'] = self.seconds([entry.timestamp for entry in log.entries])
+        array['pkgs'] = [len(entry.pkgs) for entry in log.entries]
+        array['security'] = [entry.security for entry in log.entries]
+        return array
+
+    def pkgs(self, log):
+        """
+        Return the packages of the log.
+
+        :param log: :any:`SlackLog` -- in-memory representation of the log.
+        :return: :py:class:`numpy.ndarray` -- The packages, in the order they are in the log, as :py:data:`PKG_DTYPE`.
+        """
+        assert(isinstance(log, SlackLog))
+        pkgs = [(position, pkg) for position, entry in enumerate(log.entries) for pkg in entry.pkgs]
+        array = numpy.zeros(len(pkgs), PKG_DTYPE)
+        entries = numpy.array([position for position, pkg in pkgs], numpy.int32)
+        array['entry'] = entries
+        array['timestamp'] = self.seconds([entry.timestamp for entry in log.entries])[entries]
+        array['name'] = [self.number(pkg.pkg) for position, pkg in pkgs]
+        array['action'] = [self.actions[pkg.action] for position, pkg in pkgs]
+        array['security'] = [pkg.security for position, pkg in pkgs]
+        return array
+
+    def seconds(self, timestamps):
+        """
+        Return the timestamps as a NumPy array.
+
+        :param timestamps: [:py:class:`datetime.datetime`] -- Timezone aware timestamps.
+        :return: :py:class:`numpy.ndarray` -- The timestamps as ``datetime64[s]``.
+        """
+        seconds = numpy.array([calendar.timegm(timestamp.utctimetuple()) for timestamp in timestamps], numpy.int64)
+        return seconds.astype('datetime64[s]')
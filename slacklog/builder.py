@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+SlackLog builder
+================
+
+SlackLog builder keeps the parsed ChangeLogs in memory, and writes the feeds of a ChangeLog only when it has changed.
+
+An updated ChangeLog is re-parsed incrementally (see :py:meth:`SlackLogParser.reparse`), so only the new entries are
+parsed.  The feed files are written to a temporary file first, and then renamed over the old ones, so that a web
+server never serves a half-written feed.
+"""
+import codecs
+import fnmatch
+import os
+
+from slacklog.files import replace_file
+from slacklog.formatters import archive_name
+from slacklog.server import SlackLogFeed
+from slacklog.parsers import SlackLogParser
+
+try:
+    str = unicode
+except NameError:
+    pass  # Forward compatibility with Py3k (unicode is not defined)
+
+
+def write_archive(formatter, log, out):
+    """
+    Write the archive pages of an archived Atom feed that do not exist yet, next to the feed.
+
+    Write them before the feed, so that its ``prev-archive`` link is never broken.
+
+    :param formatter: :any:`SlackLogAtomFormatter` -- The formatter of the feed, with :py:attr:`archiveSize` set.
+    :param log: :any:`SlackLog` -- in-memory representation of the log.
+    :param out: File name of the feed, see :py:func:`slacklog.formatters.archive_name`.
+    :return: [:py:class:`str`] -- File names that were written.
+    :raises ValueError: If the feed has no file name or no link.
+    """
+    if out is None:
+        raise ValueError('An archived feed needs a file name')
+    written = []
+    for page in formatter.archive_pages(log):
+        filename = archive_name(out, page)
+        if os.path.exists(filename):
+            continue
+        replace_file(filename, codecs.encode(formatter.format_archive(log, page), 'utf-8'))
+        written.append(filename)
+    return written
+
+
+class SlackLogBuilder (object):
+    """
+    Builds the feeds of a set of ChangeLogs into an output directory.
+
+    Each ChangeLog ``NAME.txt`` is written as ``NAME.rss``, ``NAME.atom``, etc.
+    """
+
+    def __init__(self, out_dir, formats=('rss', 'atom', 'json'), base_url=None, encoding='iso8859-1', parser=None,
+                 max_entries=None, archive_size=None):
+        self.out_dir = out_dir
+        """Output directory."""
+        self.formats = list(formats)
+        """Formats to write: 'rss', 'atom', 'json', and/or 'txt'."""
+        self.base_url = base_url or u'file://%s' % os.path.abspath(out_dir)
+        """:py:class:`unicode` URL of the output directory, used for the links in the feeds."""
+        self.encoding = encoding
+        """ChangeLog encoding."""
+        self.parser = parser or SlackLogParser()
+        """The :any:`SlackLogParser` used for (re-)parsing the ChangeLogs."""
+        self.max_entries = max_entries
+        """If not :py:const:`None`, must be an :py:class:`int` representing how many entries are written."""
+        self.archive_size = archive_size
+        """If not :py:const:`None`, must be an :py:class:`int` representing how many entries are on each Atom
+        archive page, see :any:`SlackLogAtomFormatter`.  Only the new archive pages are written."""
+        self.feeds = {}
+        """The :any:`SlackLogFeed` objects, keyed by the ChangeLog file name."""
+
+    def feed(self, changelog):
+        """
+        Return the feed of the ChangeLog, creating it on first use.
+
+        :param changelog: ChangeLog file name.
+        :return: :any:`SlackLogFeed` -- The feed.
+        """
+        feed = self.feeds.get(changelog)
+        if feed is None:
+            name = os.path.splitext(os.path.basename(changelog))[0]
+            if not isinstance(name, str):
+                name = name.decode('utf-8')
+            feed = SlackLogFeed(name, changelog, self.encoding, self.parser)
+            self.feeds[changelog] = feed
+        return feed
+
+    def outputs(self, feed):
+        """
+        Return the output files of the feed.
+
+        :param feed: :any:`SlackLogFeed` -- The feed.
+        :return: [(:py:class:`str`, :py:class:`str`)] -- list of formats and file names.
+        """
+        return [(fmt, os.path.join(self.out_dir, '%s.%s' % (feed.name, fmt))) for fmt in self.formats]
+
+    def build(self, changelog, force=False, startup=False):
+        """
+        Write the feeds of the ChangeLog, if it has changed since it was last built.
+
+        :param changelog: ChangeLog file name.
+        :param force: :py:class:`bool` -- If :py:const:`True`, write the feeds even if the ChangeLog has not changed.
+        :param startup: :py:class:`bool` -- If :py:const:`True`, this is the first build of a new process, and a
+            ChangeLog that is older than all its feeds is taken as built by an earlier process, without parsing it.
+            Do not use it for a ChangeLog that is known to have changed: a mirrored or downloaded ChangeLog may
+            keep an older modification time.
+        :return: [:py:class:`str`] -- File names that were written.
+        """
+        feed = self.feed(changelog)
+        outputs = self.outputs(feed)
+        if startup and feed.log is None and not force and self.up_to_date(changelog, outputs):
+            # Not parsed yet, but built by an earlier run
+            return []
+        changed = feed.refresh()
+        if not changed and not force and all([os.path.exists(out) for fmt, out in outputs]):
+            return []
+        log, modified = feed.snapshot()
+        written = []
+        for fmt, out in outputs:
+            url = u'%s/%s.%s' % (self.base_url, feed.name, fmt)
+            formatter = feed.formatter(fmt, url, modified, self.max_entries)
+            if fmt == 'atom' and self.archive_size:
+                formatter = formatter.replace(archiveSize=self.archive_size)
+                written.extend(write_archive(formatter, log, out))
+            data = formatter.format(log)
+            self.write(out, data)
+            written.append(out)
+        return written
+
+    def up_to_date(self, changelog, outputs):
+        """
+        Return :py:const:`True` if every output file is newer than the ChangeLog.
+
+        :param changelog: ChangeLog file name.
+        :param outputs: [(:py:class:`str`, :py:class:`str`)] -- list of formats and file names.
+        :return: :py:class:`bool` -- :py:const:`True` if the outputs need not be written.
+        """
+        mtime = os.path.getmtime(changelog)
+        for fmt, out in outputs:
+            if not os.path.exists(out) or os.path.getmtime(out) < mtime:
+                return False
+        return True
+
+    def build_all(self, directory, pattern='*.txt', force=False, startup=False):
+        """
+        Write the feeds of every ChangeLog in the directory that has changed since it was last built.
+
+        :param directory: Directory of ChangeLogs.
+        :param pattern: :py:class:`str` -- Shell-style pattern of the ChangeLog file names.
+        :param force: :py:class:`bool` -- If :py:const:`True`, write the feeds even if the ChangeLogs have not
+            changed.
+        :param startup: :py:class:`bool` -- If :py:const:`True`, this is the first build of a new process, see
+            :py:meth:`build`.
+        :return: [:py:class:`str`] -- File names that were written.
+        """
+        written = []
+        for name in sorted(fnmatch.filter(os.listdir(directory), pattern)):
+            written.extend(self.build(os.path.join(directory, name), force, startup))
+        return written
+
+    def write(self, out, data):
+        """
+        Replace the file with the UTF-8 encoded data.
+
+        :param out: File name.
+        :param data: :py:class:`unicode` data.
+        """
+        replace_file(out, codecs.encode(data, 'utf-8'))
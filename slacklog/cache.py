@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+SlackLog cache
+==============
+
+SlackLog cache keeps rendered feeds in memory, so that formatting an unchanged log again with the same formatter
+settings is a dictionary lookup.
+
+The cached feeds are keyed by the log content (see :py:func:`log_key`), the formatter class, and the formatter
+settings.  Each cached feed has a strong ETag, which is derived from the rendered bytes.
+"""
+import codecs
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def log_key(log):
+    """
+    Return a key that changes whenever the entries of the log change.
+
+    The identifier of an entry depends on all the entries before it, so the identifiers of the newest and the oldest
+    entry, together with the number of entries, identify the log content.
+
+    :param log: :any:`SlackLog` -- in-memory representation of the log.
+    :return: :py:class:`tuple` -- Hashable key.
+    """
+    if not log.entries:
+        return (None, None, 0, log.startsWithSeparator, log.endsWithSeparator)
+    return (log.entries[0].identifier, log.entries[-1].identifier, len(log.entries),
+            log.startsWithSeparator, log.endsWithSeparator)
+
+
+def formatter_key(formatter):
+    """
+    Return a key that changes whenever the class or the settings of the formatter change.
+
+    :param formatter: :any:`SlackLogFormatter` -- The formatter.
+    :return: :py:class:`tuple` -- Hashable key.
+    """
+    return (type(formatter), tuple([(name, repr(value)) for name, value in formatter.options()]))
+
+
+class SlackLogFeedCache (object):
+    """
+    Least recently used cache of rendered feeds.
+
+    The cache can be shared between threads.
+    """
+
+    def __init__(self, max_size=64, encoding='utf-8'):
+        self.max_size = max_size
+        """Maximum number of rendered feeds to keep."""
+        self.encoding = encoding
+        """Encoding of the rendered feeds."""
+        self.hits = 0
+        """Number of lookups that found a rendered feed."""
+        self.misses = 0
+        """Number of lookups that had to format the log."""
+        self.feeds = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, log, formatter):
+        """
+        Return the log formatted with the formatter, and its ETag.
+
+        The log is formatted only if it has not been formatted with the same formatter settings before, or if the
+        result has already been evicted from the cache.
+
+        :param log: :any:`SlackLog` -- in-memory representation of the log.
+        :param formatter: :any:`SlackLogFormatter` -- The formatter.
+        :return: [:py:class:`bytes`, :py:class:`str`] -- a two element list: the encoded feed, and its quoted ETag.
+        """
+        key = (log_key(log), formatter_key(formatter))
+        with self.lock:
+            feed = self.feeds.pop(key, None)
+            if feed is not None:
+                # Re-insert as the most recently used
+                self.feeds[key] = feed
+                self.hits += 1
+                return list(feed)
+            self.misses += 1
+
+        data = codecs.encode(formatter.format(log), self.encoding)
+        feed = (data, '"%s"' % hashlib.sha1(data).hexdigest())
+
+        with self.lock:
+            self.feeds[key] = feed
+            while len(self.feeds) > self.max_size:
+                self.feeds.popitem(last=False)
+        return list(feed)
+
+    def etag(self, log, formatter):
+        """
+        Return the ETag of the log formatted with the formatter, if it is cached, without formatting the log.
+
+        The lookup is not counted in :py:attr:`hits` or :py:attr:`misses`, and does not make the feed the most
+        recently used.
+
+        :param log: :any:`SlackLog` -- in-memory representation of the log.
+        :param formatter: :any:`SlackLogFormatter` -- The formatter.
+        :return: :py:class:`str` -- The quoted ETag, or :py:const:`None` if the feed is not cached.
+        """
+        key = (log_key(log), formatter_key(formatter))
+        with self.lock:
+            feed = self.feeds.get(key)
+        if feed is None:
+            return None
+        return feed[1]
+
+    def clear(self):
+        """
+        Remove all the rendered feeds.
+        """
+        with self.lock:
+            self.feeds.clear()
@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+"""
+SlackLog columnar
+=================
+
+SlackLog columns are a compact, read-only representation of a :any:`SlackLog`, for keeping many ChangeLogs in
+memory, and scanning all of them.
+
+A :any:`SlackLog` has a Python object for every entry and package, and every description is a string object of its
+own.  :any:`SlackLogColumns` stores the same data in a few arrays instead:
+
+  * The timestamps are seconds since epoch, in an :py:class:`array.array`.
+  * All descriptions and package names are in one contiguous unicode text, in the order they are in the log: the
+    description of an entry, then the name and description of each of its packages.  The text is split by an array
+    of offsets.
+  * The packages of each entry are a range in the package arrays, given by an array of offsets.
+  * The checksums and identifiers are SHA-512 digests, stored as bytes, not as hex strings.
+
+The :any:`SlackLogEntry` and :any:`SlackLogPkg` objects are created on demand, see :py:meth:`SlackLogColumns.entry`.
+"""
+import calendar
+from array import array
+from binascii import hexlify, unhexlify
+
+from slacklog.indexes import timestamp_of
+from slacklog.models import SlackLog, SlackLogEntry, SlackLogPkg
+
+try:
+    array('q')
+    TIMESTAMP_TYPECODE = 'q'
+except ValueError:
+    TIMESTAMP_TYPECODE = 'l'  # Python 2.7 has no 'q', but 'l' is 64 bits on 64 bit Unix
+"""Type code of the timestamp array."""
+
+DIGEST_SIZE = 64
+"""Size of the stored checksums and identifiers in bytes: the size of a SHA-512 digest."""
+
+
+class SlackLogColumns (object):
+    """
+    Columnar representation of the entries of a :any:`SlackLog`.
+
+    The entries are in the same order as in the log, newest first, and are referred to by their position.
+    """
+
+    def __init__(self, log=None):
+        self.timestamps = array(TIMESTAMP_TYPECODE)
+        """Entry timestamps, in seconds since epoch."""
+        self.zones = []
+        """The distinct original timezones (:py:class:`datetime.tzinfo`) of the entries."""
+        self.timezones = array('b')
+        """Position of the original timezone of each entry in :py:attr:`zones`, or -1 for :py:const:`None`."""
+        self.twelve_hour = array('b')
+        """:py:attr:`SlackLogEntry.twelveHourFormat` of each entry: 1, 0, or -1 for :py:const:`None`."""
+        self.checksums = bytearray()
+        """Entry checksums, as :py:data:`DIGEST_SIZE` byte digests, see :py:meth:`checksum`."""
+        self.identifiers = bytearray()
+        """Entry identifiers, as :py:data:`DIGEST_SIZE` byte digests, see :py:meth:`identifier`.  The parent of
+        an entry is usually the identifier of the entry below it."""
+        self.irregular = {}
+        """The checksums and identifiers that are not hex digests, e.g. :py:const:`None`, keyed by the name of the
+        column and the position."""
+        self.ordered = True
+        """:py:const:`True` if the timestamps are newest first, as they are in a log.  See :py:meth:`between`."""
+        self.parents = {}
+        """Parent identifiers of the entries whose parent is not the entry below them, keyed by position."""
+        self.last_parent = None
+        """Parent identifier of the last entry."""
+        self.entry_pkgs = array('l', [0])
+        """Offsets of the packages of the entries: the packages of entry ``i`` are ``entry_pkgs[i]`` to
+        ``entry_pkgs[i + 1]``."""
+        self.pkg_entries = array('l')
+        """Position of the entry of each package."""
+        self.text = u''
+        """Descriptions and package names, one after another."""
+        self.offsets = array('l', [0])
+        """Offsets of the descriptions and package names in :py:attr:`text`."""
+        self.startsWithSeparator = False
+        """See :py:attr:`SlackLog.startsWithSeparator`."""
+        self.endsWithSeparator = False
+        """See :py:attr:`SlackLog.endsWithSeparator`."""
+        self.checksumVersion = 1
+        """See :py:attr:`SlackLog.checksumVersion`."""
+        if log is not None:
+            self.extend(log)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def extend(self, log):
+        """
+        Append the entries of the log.
+
+        :param log: :any:`SlackLog` -- in-memory representation of the log.  If these columns are empty, its
+            separator flags and checksum version are copied, too.
+        """
+        assert(isinstance(log, SlackLog))
+        if not self.timestamps:
+            self.startsWithSeparator = log.startsWithSeparator
+            self.endsWithSeparator = log.endsWithSeparator
+            self.checksumVersion = log.checksumVersion
+        text = [self.text]
+        end = self.offsets[-1]
+        for entry in log.entries:
+            position = len(self.timestamps)
+            seconds = calendar.timegm(entry.timestamp.utctimetuple())
+            if position and seconds > self.timestamps[-1]:
+                self.ordered = False
+            self.timestamps.append(seconds)
+            self.timezones.append(self.zone(entry.timezone))
+            self.twelve_hour.append(-1 if entry.twelveHourFormat is None else int(entry.twelveHourFormat))
+            self.store('checksums', position, entry.checksum)
+            self.store('identifiers', position, entry.identifier)
+            if position and self.last_parent != entry.identifier:
+                self.parents[position - 1] = self.last_parent
+            self.last_parent = entry.parent
+            text.append(entry.description)
+            end += len(entry.description)
+            self.offsets.append(end)
+            for pkg in entry.pkgs:
+                text.append(pkg.pkg)
+                end += len(pkg.pkg)
+                self.offsets.append(end)
+                text.append(pkg.description)
+                end += len(pkg.description)
+                self.offsets.append(end)
+                self.pkg_entries.append(position)
+            self.entry_pkgs.append(len(self.pkg_entries))
+        self.text = u''.join(text)
+
+    def store(self, column, position, digest):
+        """
+        Append a checksum or an identifier to its column.
+
+        :param column: :py:class:`str` -- 'checksums' or 'identifiers'.
+        :param position: :py:class:`int` -- Position of the entry.
+        :param digest: :py:class:`unicode` -- The hex digest, or :py:const:`None`.
+        """
+        data = None
+        if digest is not None and len(digest) == 2 * DIGEST_SIZE:
+            try:
+                data = unhexlify(digest)
+            except (TypeError, ValueError):
+                pass  # Not hex
+            if data is not None and hexlify(data).decode('ascii') != digest:
+                data = None  # Would not be the same when read back, e.g. in upper case
+        if data is None:
+            self.irregular[(column, position)] = digest
+            data = b'\0' * DIGEST_SIZE
+        getattr(self, column).extend(data)
+
+    def load(self, column, position):
+        """
+        Return a checksum or an identifier from its column.
+
+        :param column: :py:class:`str` -- 'checksums' or 'identifiers'.
+        :param position: :py:class:`int` -- Position of the entry.
+        :return: :py:class:`unicode` -- The hex digest, or :py:const:`None`.
+        """
+        key = (column, position)
+        if key in self.irregular:
+            return self.irregular[key]
+        start = position * DIGEST_SIZE
+        return u'%s' % hexlify(bytes(getattr(self, column)[start:start + DIGEST_SIZE])).decode('ascii')
+
+    def checksum(self, position):
+        """
+        Return the checksum of the entry.
+
+        :param position: :py:class:`int` -- Position of the entry.
+        :return: :py:class:`unicode` -- The checksum, or :py:const:`None`.
+        """
+        return self.load('checksums', position)
+
+    def identifier(self, position):
+        """
+        Return the identifier of the entry.
+
+        :param position: :py:class:`int` -- Position of the entry.
+        :return: :py:class:`unicode` -- The identifier, or :py:const:`None`.
+        """
+        return self.load('identifiers', position)
+
+    def zone(self, timezone):
+        """
+        Return the position of the timezone in :py:attr:`zones`, adding it if needed.
+
+        :param timezone: :py:class:`datetime.tzinfo`, or :py:const:`None`.
+        :return: :py:class:`int` -- The position, or -1 for :py:const:`None`.
+        """
+        if timezone is None:
+            return -1
+        for position, zone in enumerate(self.zones):
+            if zone is timezone or zone == timezone:
+                return position
+        self.zones.append(timezone)
+        return len(self.zones) - 1
+
+    def piece(self, index):
+        """
+        Return a description or a package name.
+
+        :param index: :py:class:`int` -- Position of the piece of text in :py:attr:`offsets`.
+        :return: :py:class:`unicode` -- The text.
+        """
+        return self.text[self.offsets[index]:self.offsets[index + 1]]
+
+    def first_piece(self, position):
+        """
+        Return the position of the description of the entry in :py:attr:`offsets`.
+
+        :param position: :py:class:`int` -- Position of the entry.
+        :return: :py:class:`int` -- Position of the piece of text.
+        """
+        return position + 2 * self.entry_pkgs[position]
+
+    def timestamp(self, position):
+        """
+        Return the timestamp of the entry.
+
+        :param position: :py:class:`int` -- Position of the entry.
+        :return: :py:class:`datetime.datetime` -- Timestamp in UTC.
+        """
+        return timestamp_of(self.timestamps[position])
+
+    def description(self, position):
+        """
+        Return the description of the entry.
+
+        :param position: :py:class:`int` -- Position of the entry.
+        :return: :py:class:`unicode` -- The description.
+        """
+        return self.piece(self.first_piece(position))
+
+    def pkgs(self, position):
+        """
+        Return the packages of the entry.
+
+        :param position: :py:class:`int` -- Position of the entry.
+        :return: [(:py:class:`unicode`, :py:class:`unicode`)] -- The packages and their descriptions.
+        """
+        first = self.first_piece(position)
+        return [(self.piece(first + 1 + 2 * index), self.piece(first + 2 + 2 * index))
+                for index in range(self.entry_pkgs[position + 1] - self.entry_pkgs[position])]
+
+    def parent(self, position):
+        """
+        Return the parent identifier of the entry.
+
+        :param position: :py:class:`int` -- Position of the entry.
+        :return: :py:class:`unicode` -- The identifier, or :py:const:`None`.
+        """
+        if position in self.parents:
+            return self.parents[position]
+        if position + 1 < len(self):
+            return self.identifier(position + 1)
+        return self.last_parent
+
+    def entry(self, position, log=None):
+        """
+        Return the :any:`SlackLogEntry` of the entry, with its packages.
+
+        :param position: :py:class:`int` -- Position of the entry.
+        :param log: :any:`SlackLog` of the entry, or :py:const:`None` to create one.  The entry is not added to it.
+        :return: :any:`SlackLogEntry` -- A new entry.
+        """
+        if log is None:
+            log = self.log()
+        timezone = self.timezones[position]
+        twelve_hour = self.twelve_hour[position]
+        entry = SlackLogEntry(self.timestamp(position), self.description(position), log,
+                              checksum=self.checksum(position), identifier=self.identifier(position),
+                              parent=self.parent(position),
+                              timezone=self.zones[timezone] if timezone >= 0 else None,
+                              twelveHourFormat=None if twelve_hour < 0 else bool(twelve_hour))
+        for pkg, description in self.pkgs(position):
+            entry.pkgs.append(SlackLogPkg(pkg, description, entry))
+        return entry
+
+    def log(self, positions=None):
+        """
+        Return a :any:`SlackLog` of the entries.
+
+        :param positions: Positions of the entries, or :py:const:`None` for all entries.
+        :return: :any:`SlackLog` -- A new log.
+        """
+        log = SlackLog()
+        log.startsWithSeparator = self.startsWithSeparator
+        log.endsWithSeparator = self.endsWithSeparator
+        log.checksumVersion = self.checksumVersion
+        if positions is None:
+            positions = range(len(self))
+        log.entries = [self.entry(position, log) for position in positions]
+        return log
+
+    def between(self, start=None, end=None):
+        """
+        Return the positions of the entries with a timestamp between start (inclusive) and end (exclusive).
+
+        The timestamps are searched with binary search, unless they are not :py:attr:`ordered`, e.g. after
+        appending an older log.
+
+        :param start: :py:class:`datetime.datetime` -- Timezone aware start time, or :py:const:`None` for no limit.
+        :param end: :py:class:`datetime.datetime` -- Timezone aware end time, or :py:const:`None` for no limit.
+        :return: [:py:class:`int`] -- The positions, in the order the entries are in the log.
+        """
+        lo = None if start is None else calendar.timegm(start.utctimetuple())
+        hi = None if end is None else calendar.timegm(end.utctimetuple())
+        if not self.ordered:
+            return [position for position, seconds in enumerate(self.timestamps)
+                    if (lo is None or seconds >= lo) and (hi is None or seconds < hi)]
+        first = 0 if hi is None else self.first_before(hi)
+        last = len(self) if lo is None else self.first_before(lo)
+        return list(range(first, last))
+
+    def first_before(self, seconds):
+        """
+        Return the position of the newest entry that is older than the time.  The timestamps must be
+        :py:attr:`ordered`.
+
+        :param seconds: :py:class:`int` -- Time in seconds since epoch.
+        :return: :py:class:`int` -- Position of the entry, or the number of entries if there is none.
+        """
+        lo = 0
+        hi = len(self.timestamps)
+        while lo < hi:
+            middle = (lo + hi) // 2
+            if self.timestamps[middle] < seconds:
+                hi = middle
+            else:
+                lo = middle + 1
+        return lo
+
+    def search(self, text):
+        """
+        Return the positions of the entries whose description, or package name or description, contains the text.
+
+        The text is searched for in :py:attr:`text`, without creating the descriptions.
+
+        :param text: :py:class:`unicode` -- Text to search for, case-sensitive.
+        :return: [:py:class:`int`] -- The positions, in the order the entries are in the log.
+        """
+        positions = []
+        start = self.text.find(text)
+        while 0 <= start < len(self.text):
+            position = self.entry_of(start)
+            # Matches that span two pieces of text do not count
+            piece = self.piece_of(start, position)
+            if start + len(text) <= self.offsets[piece + 1]:
+                positions.append(position)
+                start = self.offsets[self.first_piece(position + 1)]
+            else:
+                start += 1
+            start = self.text.find(text, start)
+        return positions
+
+    def entry_of(self, offset):
+        """
+        Return the position of the entry of an offset in :py:attr:`text`.
+
+        :param offset: :py:class:`int` -- Offset in :py:attr:`text`.
+        :return: :py:class:`int` -- Position of the entry.
+        """
+        lo = 0
+        hi = len(self.timestamps)
+        while hi - lo > 1:
+            middle = (lo + hi) // 2
+            if self.offsets[self.first_piece(middle)] <= offset:
+                lo = middle
+            else:
+                hi = middle
+        return lo
+
+    def piece_of(self, offset, position):
+        """
+        Return the position in :py:attr:`offsets` of the piece of text of an offset in :py:attr:`text`.
+
+        :param offset: :py:class:`int` -- Offset in :py:attr:`text`.
+        :param position: :py:class:`int` -- Position of the entry of the offset.
+        :return: :py:class:`int` -- Position of the piece of text.
+        """
+        piece = self.first_piece(position)
+        while self.offsets[piece + 1] <= offset:
+            piece += 1
+        return piece
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+SlackLog diff
+=============
+
+SlackLog diff tells what changed between two versions of a ChangeLog.
+
+The entries are never compared as text.  Each entry identifier is computed from the checksum of the entry, and the
+identifier of the entry below it (see :py:meth:`SlackLogParser.gen_entry_identifier`), so an identifier stands for
+the entry and everything below it.  The newest entry of the new log whose identifier is also in the old log is
+their common ancestor: it, and every entry below it, are the same in both logs.  Usually the ancestor is the newest
+entry of the old log, and finding it takes one step for each added entry.
+
+Only the entries above the ancestor are compared, by checksum.  The entries that are in one log but not in the
+other are paired by timestamp: an entry that was edited keeps its timestamp, but gets a new checksum.
+"""
+from slacklog.models import SlackLog
+
+
+class SlackLogDiff (object):
+    """
+    Differences between two versions of a :any:`SlackLog`.
+    """
+
+    def __init__(self, old, new):
+        assert(isinstance(old, SlackLog))
+        assert(isinstance(new, SlackLog))
+        self.old = old
+        """The old :any:`SlackLog`."""
+        self.new = new
+        """The new :any:`SlackLog`."""
+        self.ancestor = None
+        """The newest :any:`SlackLogEntry` of the new log that, with every entry below it, is the same in both logs,
+        or :py:const:`None`."""
+        self.added = []
+        """The :any:`SlackLogEntry` objects of the new log that are not in the old log."""
+        self.removed = []
+        """The :any:`SlackLogEntry` objects of the old log that are not in the new log."""
+        self.modified = []
+        """The :any:`SlackLogEntryDiff` objects of the entries that were edited."""
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.modified)
+
+    __nonzero__ = __bool__
+
+
+class SlackLogEntryDiff (object):
+    """
+    Differences between two versions of a :any:`SlackLogEntry`.
+    """
+
+    def __init__(self, old, new):
+        self.old = old
+        """The old :any:`SlackLogEntry`."""
+        self.new = new
+        """The new :any:`SlackLogEntry`."""
+        self.description = old.description != new.description
+        """:py:const:`True` if the description of the entry was edited."""
+        self.added = []
+        """The :any:`SlackLogPkg` objects of the new entry that are not in the old entry."""
+        self.removed = []
+        """The :any:`SlackLogPkg` objects of the old entry that are not in the new entry."""
+        self.modified = []
+        """The edited packages, as (old :any:`SlackLogPkg`, new :any:`SlackLogPkg`) pairs."""
+
+        old_pkgs = {}
+        for pkg in old.pkgs:
+            old_pkgs.setdefault(pkg.pkg, []).append(pkg)
+        for pkg in new.pkgs:
+            same = old_pkgs.get(pkg.pkg)
+            if not same:
+                self.added.append(pkg)
+                continue
+            old_pkg = same.pop(0)
+            if old_pkg.description != pkg.description:
+                self.modified.append((old_pkg, pkg))
+        for pkg in old.pkgs:
+            if pkg in old_pkgs.get(pkg.pkg, []):
+                self.removed.append(pkg)
+
+
+def common_ancestor(old, new):
+    """
+    Return the positions of the common ancestor of two logs.
+
+    :param old: :any:`SlackLog` -- The old log.
+    :param new: :any:`SlackLog` -- The new log.
+    :return: [:py:class:`int`, :py:class:`int`] -- a two element list: position of the ancestor in the old log, and
+        in the new log.  If the logs have nothing in common, the positions are the lengths of the logs.
+    """
+    if old.entries:
+        # The usual case: entries were added on top of the old log
+        head = old.entries[0].identifier
+        for position, entry in enumerate(new.entries):
+            if entry.identifier == head:
+                return [0, position]
+    identifiers = old.index().identifiers
+    for position, entry in enumerate(new.entries):
+        ancestor = identifiers.get(entry.identifier)
+        if ancestor is not None:
+            return [old.entries.index(ancestor), position]
+    return [len(old.entries), len(new.entries)]
+
+
+def diff(old, new):
+    """
+    Return the differences between two versions of a log.
+
+    :param old: :any:`SlackLog` -- The old log.
+    :param new: :any:`SlackLog` -- The new log.
+    :return: :any:`SlackLogDiff` -- The differences.
+    """
+    result = SlackLogDiff(old, new)
+    old_position, new_position = common_ancestor(old, new)
+    if new_position < len(new.entries):
+        result.ancestor = new.entries[new_position]
+    old_entries = old.entries[:old_position]
+    new_entries = new.entries[:new_position]
+
+    checksums = set([entry.checksum for entry in new_entries])
+    old_by_timestamp = {}
+    for entry in old_entries:
+        if entry.checksum not in checksums:
+            old_by_timestamp.setdefault(entry.timestamp, []).append(entry)
+    checksums = set([entry.checksum for entry in old_entries])
+    for entry in new_entries:
+        if entry.checksum in checksums:
+            continue
+        same = old_by_timestamp.get(entry.timestamp)
+        if same:
+            result.modified.append(SlackLogEntryDiff(same.pop(0), entry))
+        else:
+            result.added.append(entry)
+    for entry in old_entries:
+        if entry in old_by_timestamp.get(entry.timestamp, []):
+            result.removed.append(entry)
+    return result
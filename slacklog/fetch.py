@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+SlackLog fetch
+==============
+
+SlackLog fetch downloads ChangeLogs from a Slackware mirror, all of them concurrently.
+
+The downloads are conditional: a ChangeLog that has not changed since the last download is not transferred again.
+``If-Modified-Since`` is taken from the modification time of the downloaded file (which is set from the
+``Last-Modified`` header, like ``curl -R`` does), and ``If-None-Match`` from the ``ETag`` remembered in a state file
+next to the ChangeLogs.
+
+The ChangeLogs are handed to a callback as soon as each download completes, so e.g. the feeds of one ChangeLog
+can be built (see :any:`SlackLogBuilder`) while the others are still downloading.
+"""
+import codecs
+import gzip
+import json
+import os
+import threading
+from email.utils import formatdate, parsedate_tz, mktime_tz
+from io import BytesIO
+
+try:
+    from urllib.request import Request, urlopen
+    from urllib.error import HTTPError
+except ImportError:
+    from urllib2 import Request, urlopen, HTTPError
+
+try:
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    asyncio = None  # Python 2.7: downloads run in plain threads
+
+import slacklog
+from slacklog.files import replace_file
+
+MIRROR = 'http://ftp.osuosl.org/pub/slackware'
+"""Default Slackware mirror."""
+
+RELEASES = ['slackware-12.0', 'slackware-12.1', 'slackware-13.0', 'slackware64-13.0', 'slackware-13.1',
+            'slackware64-13.1', 'slackware-13.37', 'slackware64-13.37', 'slackware-14.0', 'slackware64-14.0',
+            'slackware-14.1', 'slackware64-14.1', 'slackware-14.2', 'slackware64-14.2', 'slackware-current',
+            'slackware64-current']
+"""Default releases to fetch."""
+
+
+class SlackLogFetcher (object):
+    """
+    Downloads ChangeLogs into a directory.
+
+    The ChangeLog of release ``NAME`` is downloaded from ``MIRROR/NAME/ChangeLog.txt`` to ``DIR/NAME.txt``.
+    """
+
+    def __init__(self, directory, mirror=MIRROR, timeout=60, workers=16):
+        self.directory = directory
+        """Directory of the downloaded ChangeLogs."""
+        self.mirror = mirror.rstrip('/')
+        """URL of the Slackware mirror."""
+        self.timeout = timeout
+        """Timeout of each download, in seconds."""
+        self.workers = workers
+        """Maximum number of concurrent downloads."""
+        self.state_file = os.path.join(directory, '.slacklog-fetch.json')
+        """File name of the remembered ETags."""
+
+    def url(self, name):
+        """
+        Return the URL of the ChangeLog of the release.
+
+        :param name: :py:class:`str` -- Release, e.g. 'slackware64-current'.
+        :return: :py:class:`str` -- URL.
+        """
+        return '%s/%s/ChangeLog.txt' % (self.mirror, name)
+
+    def path(self, name):
+        """
+        Return the file name of the ChangeLog of the release.
+
+        :param name: :py:class:`str` -- Release, e.g. 'slackware64-current'.
+        :return: :py:class:`str` -- File name.
+        """
+        return os.path.join(self.directory, '%s.txt' % name)
+
+    def load_state(self):
+        """
+        Return the remembered ETags.
+
+        :return: :py:class:`dict` -- Release to ETag.
+        """
+        try:
+            with codecs.open(self.state_file, 'r', 'utf-8') as f:
+                return json.load(f)
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def save_state(self, state):
+        """
+        Remember the ETags.
+
+        :param state: :py:class:`dict` -- Release to ETag.
+        """
+        self.write(self.state_file, json.dumps(state, indent=4, sort_keys=True).encode('utf-8'))
+
+    def fetch(self, name, etag=None):
+        """
+        Download the ChangeLog of the release, if it has changed.
+
+        :param name: :py:class:`str` -- Release, e.g. 'slackware64-current'.
+        :param etag: :py:class:`str` -- ETag of the already downloaded ChangeLog, or :py:const:`None`.
+        :return: [:py:class:`str`, :py:class:`str`] -- a two element list: file name of the ChangeLog (or
+            :py:const:`None` if it has not changed), and its ETag.
+        """
+        path = self.path(name)
+        request = Request(self.url(name))
+        request.add_header('User-Agent', 'SlackLog/%s' % slacklog.__version__)
+        request.add_header('Accept-Encoding', 'gzip')
+        if os.path.exists(path):
+            request.add_header('If-Modified-Since', formatdate(int(os.path.getmtime(path)), usegmt=True))
+            if etag:
+                request.add_header('If-None-Match', etag)
+        try:
+            response = urlopen(request, timeout=self.timeout)
+        except HTTPError as e:
+            if e.code == 304:
+                return [None, etag]
+            raise
+        try:
+            headers = response.info()
+            data = response.read()
+        finally:
+            response.close()
+        if headers.get('Content-Encoding') == 'gzip':
+            data = gzip.GzipFile(fileobj=BytesIO(data)).read()
+
+        last_modified = headers.get('Last-Modified')
+        mtime = last_modified and parsedate_tz(last_modified)
+        self.write(path, data, mktime_tz(mtime) if mtime else None)
+        return [path, headers.get('ETag')]
+
+    def fetch_all(self, names=RELEASES, callback=None):
+        """
+        Download the ChangeLogs of the releases concurrently.
+
+        The callback is called with the release and the file name of the ChangeLog, once for each ChangeLog that
+        has changed, as soon as it has been downloaded.  The callbacks are called one at a time, from the calling
+        thread.
+
+        :param names: [:py:class:`str`] -- Releases, e.g. ['slackware64-14.2', 'slackware64-current'].
+        :param callback: Function of two arguments, or :py:const:`None`.
+        :return: :py:class:`dict` -- Release to the file name of the ChangeLog if it changed, :py:const:`None` if
+            it has not changed, or the exception if it could not be downloaded or the callback failed.
+        """
+        state = self.load_state()
+        results = {}
+
+        def fetched(name, result, error):
+            if error is None:
+                path, etag = result
+                if etag:
+                    state[name] = etag
+                else:
+                    state.pop(name, None)
+                if path is not None and callback is not None:
+                    try:
+                        callback(name, path)
+                    except Exception as e:
+                        error = e
+            results[name] = result[0] if error is None else error
+
+        if asyncio is not None:
+            self.run_in_executor(names, state, fetched)
+        else:
+            self.run_in_threads(names, state, fetched)
+        self.save_state(state)
+        return results
+
+    def run_in_executor(self, names, state, fetched):
+        """
+        Download the ChangeLogs in an executor of an asyncio event loop.
+        """
+        loop = asyncio.new_event_loop()
+        executor = ThreadPoolExecutor(max(1, min(self.workers, len(names))))
+
+        def done(name, future):
+            if future.exception() is None:
+                fetched(name, future.result(), None)
+            else:
+                fetched(name, None, future.exception())
+
+        try:
+            futures = []
+            for name in names:
+                future = loop.run_in_executor(executor, self.fetch, name, state.get(name))
+                future.add_done_callback(lambda future, name=name: done(name, future))
+                futures.append(future)
+            if futures:
+                loop.run_until_complete(asyncio.wait(futures))
+        finally:
+            executor.shutdown()
+            loop.close()
+
+    def run_in_threads(self, names, state, fetched):
+        """
+        Download the ChangeLogs in threads.
+        """
+        try:
+            from queue import Queue
+        except ImportError:
+            from Queue import Queue
+        queue = Queue()
+        semaphore = threading.Semaphore(max(1, self.workers))
+
+        def fetch(name, etag):
+            with semaphore:
+                try:
+                    queue.put((name, self.fetch(name, etag), None))
+                except Exception as e:
+                    queue.put((name, None, e))
+
+        for name in names:
+            thread = threading.Thread(target=fetch, args=(name, state.get(name)))
+            thread.daemon = True
+            thread.start()
+        for _ in names:
+            fetched(*queue.get())
+
+    def write(self, path, data, mtime=None):
+        """
+        Replace the file with the data.
+
+        :param path: File name.
+        :param data: :py:class:`bytes` data.
+        :param mtime: Modification time to set, or :py:const:`None`.
+        """
+        replace_file(path, data, mtime)
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+SlackLog files
+==============
+
+SlackLog files writes the files that other programs read while they are being updated: feeds, downloaded
+ChangeLogs, archive pages, and rollups.
+
+A file is written to a temporary file in the same directory first, and then renamed over the old file, so that a
+reader never sees a half-written file.
+"""
+import os
+import tempfile
+
+replace = getattr(os, 'replace', os.rename)
+"""Renames a file over another: :py:func:`os.replace`, or :py:func:`os.rename` on Python 2.7, where it does not
+overwrite an existing file on Windows."""
+
+
+def replace_file(path, data, mtime=None):
+    """
+    Replace the file with the data atomically.
+
+    The directory of the file is created if needed.
+
+    :param path: File name.
+    :param data: :py:class:`bytes` data.
+    :param mtime: Modification time to set, or :py:const:`None`.
+    """
+    directory = os.path.dirname(path) or '.'
+    if not os.path.isdir(directory):
+        try:
+            os.makedirs(directory)
+        except OSError:
+            if not os.path.isdir(directory):  # Not created by another thread in between
+                raise
+    fd, tmp = tempfile.mkstemp(prefix='.%s.' % os.path.basename(path), dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        if mtime is not None:
+            os.utime(tmp, (mtime, mtime))
+        replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
@@ -15,6 +15,7 @@ Currently, the following formatters are provided:
   * :py:class:`SlackLogAtomFormatter` produces an Atom feed.
   * :py:class:`SlackLogJsonFormatter` produces a JSON representation.
   * :py:class:`SlackLogPyblosxomFormatter` writes the log entries to PyBlosxom HTML entries.
+  * :py:class:`SlackLogSqliteFormatter` stores the log in an SQLite database.
 
 """
 from __future__ import print_function
@@ -25,7 +26,6 @@ import os
 import re
 import time
 from json import dumps, JSONEncoder
-from dateutil import tz
 from slacklog.models import SlackLog, SlackLogEntry, SlackLogPkg
 
 
@@ -37,14 +37,103 @@ def anchor(d):
     return d.strftime("%Y%m%dT%H%M%SZ")
 
 
+def archive_name(name, page):
+    """
+    Return the file name or URL of an archive page of a feed, e.g. 'slackware64-current-3.atom' for page 3 of
+    'slackware64-current.atom'.
+    """
+    root, ext = os.path.splitext(name)
+    return u'%s-%d%s' % (root, page, ext)
+
+
+def release_of(entry, default):
+    """
+    Return the release of the log of the entry, or the default if the log has none (see :py:attr:`SlackLog.release`).
+    """
+    if entry.log.release is None:
+        return default
+    return entry.log.release
+
+
+def entry_anchor(entry):
+    """
+    Return the anchor of the entry.  The anchors of entries of a labelled log start with the release.
+    """
+    if entry.log.release is None:
+        return anchor(entry.timestamp)
+    return u'%s-%s' % (entry.log.release.replace(' ', '-'), anchor(entry.timestamp))
+
+
+def escape(data):
+    """
+    Return the data with HTML special characters escaped.
+
+    :param data: :py:class:`unicode` -- Text to escape.
+    :return: :py:class:`unicode` -- Escaped text.
+    """
+    return data.replace(u'&', u'&amp;').replace(u'<', u'&lt;')
+
+
+def escape_entry(entry):
+    """
+    Escape the description of the entry, and the descriptions of its packages, for HTML.
+
+    The descriptions are joined into one buffer, and escaped in a single pass.  Most entries do not
+    contain anything to escape, in which case the original strings are used as is.
+
+    The results are cached in :py:attr:`SlackLogEntry.escapedDescription` and
+    :py:attr:`SlackLogPkg.escapedDescription`, so that several formatters run on the same log
+    escape each text only once.
+
+    :param entry: :any:`SlackLogEntry` -- in-memory representation of the log entry.
+    """
+    assert(isinstance(entry, SlackLogEntry))
+    if entry.escapedDescription is not None:
+        return
+    texts = [entry.description]
+    texts.extend([pkg.description for pkg in entry.pkgs])
+    data = u'\0'.join(texts)
+    if u'&' in data or u'<' in data:
+        escaped = escape(data).split(u'\0')
+        if len(escaped) != len(texts):
+            # Some description contained the separator itself
+            escaped = [escape(text) for text in texts]
+    else:
+        escaped = texts
+    for pkg, text in zip(entry.pkgs, escaped[1:]):
+        pkg.escapedDescription = text
+    entry.escapedDescription = escaped[0]
+
+
+def escaped_pkg_description(pkg):
+    """
+    Return the HTML escaped description of the package.
+
+    :param pkg: :any:`SlackLogPkg` -- in-memory representation of the log entry package
+    :return: :py:class:`unicode` -- Escaped description.
+    """
+    if pkg.escapedDescription is None:
+        escape_entry(pkg.entry)
+        if pkg.escapedDescription is None:
+            # Package was added after the entry was escaped
+            pkg.escapedDescription = escape(pkg.description)
+    return pkg.escapedDescription
+
+
 class SlackLogFormatter (object):
     """
     Base class for SlackLog formatters.
 
+    The attributes of a formatter are its options.  Formatting does not change them, so a formatter can format
+    many logs in many threads at the same time, as long as its options are not changed meanwhile.  Call
+    :py:meth:`freeze` to make sure they are not, and :py:meth:`replace` to get a formatter with other options.
+
     This class is meant for subclassing.
     """
 
     def __init__(self):
+        self.frozen = None
+        """:py:const:`None`, or the options of this formatter after :py:meth:`freeze` was called."""
         self.max_entries = None
         """If not :py:const:`None`, must be an :py:class:`int`
         representing how many entries are formatted from the beginning of
@@ -54,6 +143,49 @@ class SlackLogFormatter (object):
         representing how many packages are formatted from the beginning of
         each entry.  Rest of the packages are ignored."""
 
+    def __setattr__(self, name, value):
+        if self.__dict__.get('frozen') is not None:
+            raise AttributeError("'%s' is frozen, cannot set '%s'" % (type(self).__name__, name))
+        object.__setattr__(self, name, value)
+
+    def options(self):
+        """
+        Return the options of this formatter.
+
+        :return: :py:class:`tuple` -- (name, value) pairs, sorted by name.
+        """
+        if self.frozen is not None:
+            return self.frozen
+        options = [(name, value) for name, value in vars(self).items() if name != 'frozen']
+        options.sort(key=lambda option: option[0])
+        return tuple(options)
+
+    def freeze(self):
+        """
+        Make the options of this formatter read-only.
+
+        :return: :any:`SlackLogFormatter` -- This formatter.
+        """
+        if self.frozen is None:
+            object.__setattr__(self, 'frozen', self.options())
+        return self
+
+    def replace(self, **options):
+        """
+        Return a frozen copy of this formatter, with some options changed.
+
+        :param options: New values of the options, keyed by name.
+        :return: :any:`SlackLogFormatter` -- The new formatter.
+        """
+        formatter = type(self).__new__(type(self))
+        formatter.__dict__.update(self.__dict__)
+        formatter.__dict__['frozen'] = None
+        for name, value in options.items():
+            if name not in formatter.__dict__ or name == 'frozen':
+                raise TypeError("'%s' has no option '%s'" % (type(self).__name__, name))
+            setattr(formatter, name, value)
+        return formatter.freeze()
+
     def format(self, log):
         """
         Return unicode representation of the in-memory representation of the log.
@@ -69,11 +201,46 @@ class SlackLogFormatter (object):
         :return: :py:class:`unicode` -- Unicode representation of the log.
         """
         assert(isinstance(log, SlackLog))
-        data = u''
-        data += self.format_log_preamble(log)
-        data += self.format_list(log.entries, self.format_entry, self.max_entries)
-        data += self.format_log_postamble(log)
-        return data
+        return u''.join(self.iter_format(log))
+
+    def iter_format(self, log):
+        """
+        Return an iterator of the unicode representation of the log, in parts.
+
+        Default implementation yields the return values of
+        :py:meth:`format_log_preamble`, :py:meth:`format_entry` for each
+        log entry, and :py:meth:`format_log_postamble`.  Subclasses that
+        override :py:meth:`format` must override this method too.
+
+        :param log: :any:`SlackLog` -- in-memory representation of the log.
+        :return: iterator of :py:class:`unicode` -- Parts of the unicode representation of the log.
+        """
+        assert(isinstance(log, SlackLog))
+        yield self.format_log_preamble(log)
+        for data in self.iter_list(log.entries, self.format_entry, self.max_entries):
+            yield data
+        yield self.format_log_postamble(log)
+
+    def iter_format_async(self, log, entries=16, executor=None, loop=None):
+        """
+        Return an asynchronous iterator of the unicode representation of the log, in parts.
+
+        Each part holds the representation of up to `entries` log entries
+        (see :py:meth:`iter_format`).  If `executor` is :py:const:`None`,
+        the parts are formatted in the event loop, which runs its other
+        tasks between the parts.  Otherwise, the parts are formatted in
+        the executor.
+
+        Requires Python 3.5 or later, for ``async for``.
+
+        :param log: :any:`SlackLog` -- in-memory representation of the log.
+        :param entries: :py:class:`int` -- Number of log entries in each part.
+        :param executor: :py:class:`concurrent.futures.Executor`, or :py:const:`None`.
+        :param loop: The event loop, or :py:const:`None` for the current event loop.
+        :return: :any:`SlackLogAsyncParts` -- Asynchronous iterator of :py:class:`unicode` parts.
+        """
+        assert(isinstance(log, SlackLog))
+        return SlackLogAsyncParts(self.iter_format(log), entries, executor, loop)
 
     def format_log_preamble(self, log):
         """
@@ -244,7 +411,20 @@ class SlackLogFormatter (object):
             If falsy, all items are formatted.
         :return: :py:class:`unicode` -- Formatted data.
         """
-        data = u''
+        return u''.join(self.iter_list(list_of_items, item_formatter, max_items))
+
+    def iter_list(self, list_of_items, item_formatter, max_items=None):
+        """
+        Return an iterator of the unicode representations of a list of objects.
+
+        This method is not meant for subclassing.
+
+        :param list list_of_items: List of items to format.
+        :param item_formatter: Function that formats one item, see :py:meth:`format_list`.
+        :param max_items: :py:class:`int` or falsy -- Maximum number of items to format.
+            If falsy, all items are formatted.
+        :return: iterator of :py:class:`unicode` -- Formatted items.
+        """
         num_items = len(list_of_items)
         if max_items:
             assert(isinstance(max_items, int))
@@ -257,8 +437,50 @@ class SlackLogFormatter (object):
                 is_first = True
             if index == num_items - 1:
                 is_last = True
-            data += item_formatter(list_of_items[index], is_first, is_last)
-        return data
+            yield item_formatter(list_of_items[index], is_first, is_last)
+
+
+class SlackLogAsyncParts (object):
+    """
+    Asynchronous iterator of the parts returned by :py:meth:`SlackLogFormatter.iter_format_async`.
+    """
+
+    def __init__(self, parts, entries=16, executor=None, loop=None):
+        self.parts = parts
+        """Iterator of the :py:class:`unicode` parts from :py:meth:`SlackLogFormatter.iter_format`."""
+        self.entries = entries
+        """Number of parts joined into each part of this iterator."""
+        self.executor = executor
+        """:py:class:`concurrent.futures.Executor` that joins the parts, or :py:const:`None`."""
+        self.loop = loop
+        """The event loop, or :py:const:`None` for the current event loop."""
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        import asyncio
+        if self.executor is not None:
+            loop = self.loop or asyncio.get_event_loop()
+            return loop.run_in_executor(self.executor, self.next_part)
+        # Sleeping for zero seconds lets the event loop run its other tasks
+        return asyncio.sleep(0, self.next_part())
+
+    def next_part(self):
+        """
+        Return the next part.
+
+        :return: :py:class:`unicode` -- The joined parts.
+        :raises StopAsyncIteration: If there are no more parts.
+        """
+        data = []
+        for part in self.parts:
+            data.append(part)
+            if len(data) >= self.entries:
+                break
+        if not data:
+            raise StopAsyncIteration
+        return u''.join(data)
 
 
 class SlackLogTxtFormatter (SlackLogFormatter):
@@ -291,6 +513,27 @@ class SlackLogTxtFormatter (SlackLogFormatter):
             return u'+--------------------------+\n'
         return u''
 
+    def format_entry(self, entry, is_first, is_last):
+        """
+        Overrides :py:meth:`SlackLogFormatter.format_entry`.
+
+        If the parser kept the position of the entry in the original ChangeLog (see
+        :py:attr:`slacklog.parsers.SlackLogParser.keep_spans`), and the entry has not been changed since, the entry
+        is copied from it as it is.  Otherwise, and if :py:attr:`max_pkgs` is set, the entry is formatted from its
+        parts.
+
+        :param entry: :any:`SlackLogEntry` -- in-memory representation of the log entry.
+        :param is_first: :py:class:`bool` -- :py:const:`True` if this is first entry, :py:const:`False` otherwise.
+        :param is_last: :py:class:`bool` -- :py:const:`True` if this is last entry, :py:const:`False` otherwise.
+        :return: :py:class:`unicode` -- Unicode representation of log entry.
+        """
+        assert(isinstance(entry, SlackLogEntry))
+        span = entry.span
+        if span is not None and entry.log.source is not None and not self.max_pkgs:
+            start, end = span
+            return self.format_entry_separator(is_first, is_last) + entry.log.source[start:end]
+        return SlackLogFormatter.format_entry(self, entry, is_first, is_last)
+
     def format_entry_separator(self, is_first, is_last):
         """
         Overrides :py:meth:`SlackLogFormatter.format_entry_separator`.
@@ -311,6 +554,7 @@ class SlackLogTxtFormatter (SlackLogFormatter):
         :return: :py:class:`unicode` -- Unicode representation of log entry preamble.
         """
         assert(isinstance(entry, SlackLogEntry))
+        from dateutil import tz
         timestamp = entry.timestamp
         if entry.timezone is not None and not isinstance(entry.timezone, tz.tzutc):
             timestamp = timestamp.astimezone(entry.timezone)
@@ -439,16 +683,18 @@ class SlackLogRssFormatter (SlackLogFormatter):
         data = u'    <item>\n'
         if self.webLink:
             perma = u'true'
-            link = u'%s#%s' % (self.webLink, anchor(entry.timestamp))
+            link = u'%s#%s' % (self.webLink, entry_anchor(entry))
         else:
             perma = u'false'
-            link = u'%s-%s' % (self.slackware.replace(' ', '-'), anchor(entry.timestamp))
+            link = u'%s-%s' % (self.slackware.replace(' ', '-'), entry_anchor(entry))
         data += u'      <guid isPermaLink="%s">%s</guid>\n' % (perma, link)
-        data += u'      <title>%s changes for %s</title>\n' % (self.slackware, readable(entry.timestamp))
+        data += u'      <title>%s changes for %s</title>\n' % (release_of(entry, self.slackware),
+                                                               readable(entry.timestamp))
         data += u'      <pubDate>%s</pubDate>\n' % readable(entry.timestamp)
         data += u'      <description><![CDATA[<pre>'
         if entry.description:
-            data += entry.description.replace('<', '&lt;')
+            escape_entry(entry)
+            data += entry.escapedDescription
         return data
 
     def format_entry_postamble(self, entry):
@@ -469,12 +715,18 @@ class SlackLogRssFormatter (SlackLogFormatter):
         :return: :py:class:`unicode` -- Unicode representation of log entry package preamble.
         """
         assert(isinstance(pkg, SlackLogPkg))
-        return u'%s:%s' % (pkg.pkg, pkg.description.replace('<', '&lt;'))
+        return u'%s:%s' % (pkg.pkg, escaped_pkg_description(pkg))
 
 
 class SlackLogAtomFormatter (SlackLogFormatter):
     """
     Concrete SlackLog formatter that generates an Atom feed.
+
+    If :py:attr:`archiveSize` is set, the feed is paged as an archived feed (RFC 5005).  The oldest entries are on
+    archive pages of :py:attr:`archiveSize` entries each, page 1 being the oldest (see :py:meth:`archive_pages` and
+    :py:meth:`format_archive`), and the feed itself has only the entries that are not archived yet, at least one.
+    Each page links to the page before it with ``prev-archive``, and to the feed with ``current``.  A full archive
+    page never changes, so it needs to be written only once, see :py:func:`slacklog.builder.write_archive`.
     """
 
     def __init__(self):
@@ -492,6 +744,96 @@ class SlackLogAtomFormatter (SlackLogFormatter):
         """:py:class:`unicode`.  Email of the feed author."""
         self.updated = None
         """:py:class:`datetime.datetime`.  Timestamp when this feed was last generated.  UTC assumed."""
+        self.prevArchive = None
+        """:py:class:`unicode`.  Full URL of the previous archive page, or :py:const:`None`."""
+        self.current = None
+        """:py:class:`unicode`.  Full URL of the current feed, if this is an archive page, or :py:const:`None`."""
+        self.archiveSize = None
+        """If not :py:const:`None`, must be an :py:class:`int` representing how many entries are on each archive
+        page."""
+
+    def format(self, log):
+        """
+        Overrides :py:meth:`SlackLogFormatter.format`.
+
+        If :py:attr:`archiveSize` is set, returns the feed of the entries that are not archived.
+
+        :param log: :any:`SlackLog` -- in-memory representation of the log.
+        :return: :py:class:`unicode` -- Unicode representation of the log.
+        :raises ValueError: If :py:attr:`archiveSize` is set, but :py:attr:`link` is not.
+        """
+        assert(isinstance(log, SlackLog))
+        if not self.archiveSize:
+            return super(SlackLogAtomFormatter, self).format(log)
+        pages = len(self.archive_pages(log))
+        entries = log.entries[:len(log.entries) - pages * self.archiveSize]
+        formatter = self.replace(prevArchive=archive_name(self.link, pages) if pages else None, archiveSize=None,
+                                 max_entries=None)
+        return formatter.format(self.page(log, entries))
+
+    def iter_format(self, log):
+        """
+        Overrides :py:meth:`SlackLogFormatter.iter_format`.
+
+        :param log: :any:`SlackLog` -- in-memory representation of the log.
+        :return: iterator of :py:class:`unicode` -- Parts of the unicode representation of the log.
+        """
+        if not self.archiveSize:
+            return super(SlackLogAtomFormatter, self).iter_format(log)
+        return iter([self.format(log)])
+
+    def archive_pages(self, log):
+        """
+        Return the numbers of the archive pages of the log, oldest first.
+
+        Only full pages are archived, and the newest entry is never archived, so the feed always has
+        1 to :py:attr:`archiveSize` entries.
+
+        :param log: :any:`SlackLog` -- in-memory representation of the log.
+        :return: [:py:class:`int`] -- Page numbers, starting from 1.  Empty if :py:attr:`archiveSize` is not set.
+        :raises ValueError: If :py:attr:`archiveSize` is set, but :py:attr:`link` is not.
+        """
+        assert(isinstance(log, SlackLog))
+        if not self.archiveSize:
+            return []
+        if self.link is None:
+            raise ValueError('An archived feed needs a link')
+        return list(range(1, max(len(log.entries) - 1, 0) // self.archiveSize + 1))
+
+    def format_archive(self, log, page):
+        """
+        Return unicode representation of an archive page of the log.
+
+        :param log: :any:`SlackLog` -- in-memory representation of the log.
+        :param page: :py:class:`int` -- Page number, see :py:meth:`archive_pages`.
+        :return: :py:class:`unicode` -- Unicode representation of the archive page.
+        :raises ValueError: If :py:attr:`link` is not set, or the page is not in :py:meth:`archive_pages`.
+        """
+        assert(isinstance(log, SlackLog))
+        if page not in self.archive_pages(log):
+            raise ValueError('No archive page %r' % (page,))
+        end = len(log.entries) - (page - 1) * self.archiveSize
+        entries = log.entries[end - self.archiveSize:end]
+        prev_archive = archive_name(self.link, page - 1) if page > 1 else None
+        formatter = self.replace(link=archive_name(self.link, page), current=self.link, prevArchive=prev_archive,
+                                 updated=entries[0].timestamp, archiveSize=None, max_entries=None)
+        return formatter.format(self.page(log, entries))
+
+    def page(self, log, entries):
+        """
+        Return a log of some of the entries of the log.
+
+        :param log: :any:`SlackLog` -- in-memory representation of the log.
+        :param entries: [:any:`SlackLogEntry`] -- Entries of the log.
+        :return: :any:`SlackLog` -- A new log.  The entries are not moved to it.
+        """
+        page = SlackLog()
+        page.startsWithSeparator = log.startsWithSeparator
+        page.endsWithSeparator = log.endsWithSeparator
+        page.checksumVersion = log.checksumVersion
+        page.release = log.release
+        page.entries = entries
+        return page
 
     def format_log_preamble(self, log):
         """
@@ -502,8 +844,17 @@ class SlackLogAtomFormatter (SlackLogFormatter):
         """
         assert(isinstance(log, SlackLog))
         data = u'<?xml version="1.0"?>\n'
-        data += u'<feed xmlns="http://www.w3.org/2005/Atom">\n'
+        if self.prevArchive or self.current:
+            data += u'<feed xmlns="http://www.w3.org/2005/Atom" xmlns:fh="http://purl.org/syndication/history/1.0">\n'
+        else:
+            data += u'<feed xmlns="http://www.w3.org/2005/Atom">\n'
         data += u'    <link href="%s" rel="self" type="application/rss+xml" />\n' % self.link
+        if self.current:
+            data += u'    <link href="%s" rel="current" />\n' % self.current
+        if self.prevArchive:
+            data += u'    <link href="%s" rel="prev-archive" />\n' % self.prevArchive
+        if self.current:
+            data += u'    <fh:archive />\n'
         data += u'    <title>%s ChangeLog</title>\n' % self.slackware
         if self.webLink:
             data += u'    <link href="%s" />\n' % self.webLink
@@ -539,13 +890,16 @@ class SlackLogAtomFormatter (SlackLogFormatter):
         """
         assert(isinstance(entry, SlackLogEntry))
         data = u'    <entry>\n'
-        data += u'        <title>%s changes for %s</title>\n' % (self.slackware, readable(entry.timestamp))
+        data += u'        <title>%s changes for %s</title>\n' % (release_of(entry, self.slackware),
+                                                                 readable(entry.timestamp))
+        # The entries of the archive pages keep the links and ids they had in the current feed
+        link = self.current or self.link
         if self.webLink:
-            data += u'        <link href="%s#%s" />\n' % (self.webLink, anchor(entry.timestamp))
+            data += u'        <link href="%s#%s" />\n' % (self.webLink, entry_anchor(entry))
         else:
-            data += u'        <link href="%s#%s" />\n' % (self.link, anchor(entry.timestamp))
+            data += u'        <link href="%s#%s" />\n' % (link, entry_anchor(entry))
         data += u'        <updated>%s</updated>\n' % entry.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
-        data += u'        <id>%s#%s</id>\n' % (self.link, anchor(entry.timestamp))
+        data += u'        <id>%s#%s</id>\n' % (link, entry_anchor(entry))
         data += u'        <content type="html"><![CDATA[<pre>'
         return data
 
@@ -567,7 +921,7 @@ class SlackLogAtomFormatter (SlackLogFormatter):
         :return: :py:class:`unicode` -- Unicode representation of log entry package preamble.
         """
         assert(isinstance(pkg, SlackLogPkg))
-        return u'%s:%s' % (pkg.pkg, pkg.description.replace('<', '&lt;'))
+        return u'%s:%s' % (pkg.pkg, escaped_pkg_description(pkg))
 
 
 class SlackLogPyblosxomFormatter (SlackLogFormatter):
@@ -666,7 +1020,7 @@ class SlackLogPyblosxomFormatter (SlackLogFormatter):
                     if not self.quiet:
                         print("Backing up entry: %s" % backup)
                     os.rename(filename, backup)
-                else:
+                elif not self.quiet:
                     print("Overwriting entry: %s" % filename)
             else:
                 if not self.quiet:
@@ -698,8 +1052,9 @@ class SlackLogPyblosxomFormatter (SlackLogFormatter):
             data += u'#tags %s\n' % self.format_entry_tags(entry)
         data += self.entry_preamble
         if entry.description:
+            escape_entry(entry)
             data += u'%s%s%s' % (self.entry_desc_preamble,
-                                 entry.description,
+                                 entry.escapedDescription,
                                  self.entry_desc_postamble)
         if entry.pkgs:
             data += self.entry_pkgs_preamble
@@ -733,7 +1088,7 @@ class SlackLogPyblosxomFormatter (SlackLogFormatter):
                                         self.pkg_name_postamble,
                                         self.pkg_separator,
                                         self.pkg_desc_preamble,
-                                        pkg.description,
+                                        escaped_pkg_description(pkg),
                                         self.pkg_desc_postamble,
                                         self.pkg_postamble)
         return data
@@ -777,24 +1132,8 @@ class SlackLogJsonFormatter (SlackLogFormatter):
         """
 
         def default(self, o):
-            if isinstance(o, SlackLog):
-                return {'startsWithSeparator': o.startsWithSeparator,
-                        'endsWithSeparator': o.endsWithSeparator,
-                        'entries': o.entries}
-            if isinstance(o, SlackLogEntry):
-                timezone = None
-                if o.timezone is not None:
-                    timezone = o.timezone.tzname(o.timestamp)
-                return {'checksum': o.checksum,
-                        'identifier': o.identifier,
-                        'parent': o.parent,
-                        'timezone': timezone,
-                        'timestamp': o.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                        'description': o.description,
-                        'pkgs': o.pkgs}
-            if isinstance(o, SlackLogPkg):
-                return {'pkg': o.pkg,
-                        'description': o.description}
+            if isinstance(o, (SlackLog, SlackLogEntry, SlackLogPkg)):
+                return SlackLogJsonFormatter().to_json(o)
             # Let the base class default method raise the TypeError
             return JSONEncoder.default(self, o)
 
@@ -822,4 +1161,181 @@ class SlackLogJsonFormatter (SlackLogFormatter):
                      sort_keys=True,
                      indent=self.indent,
                      separators=separators,
-                     cls=self.SlackLogEncoder)
+                     default=self.to_json)
+
+    def iter_format(self, log):
+        """
+        Return an iterator of the unicode representation of the log, in one part.
+
+        :param log: :any:`SlackLog` -- in-memory representation of the log.
+        :return: iterator of :py:class:`unicode` -- The return value of :py:meth:`format`.
+        """
+        yield self.format(log)
+
+    def to_json(self, o):
+        """
+        Return a JSON serializable representation of a log, an entry, or a package.
+
+        :param o: :any:`SlackLog`, :any:`SlackLogEntry`, or :any:`SlackLogPkg` -- object to serialize.
+        :return: :py:class:`dict` -- JSON serializable representation of the object.
+        :raises TypeError: if the object is of some other type.
+        """
+        if isinstance(o, SlackLog):
+            return {'startsWithSeparator': o.startsWithSeparator,
+                    'endsWithSeparator': o.endsWithSeparator,
+                    'entries': o.entries}
+        if isinstance(o, SlackLogEntry):
+            timezone = None
+            if o.timezone is not None:
+                timezone = o.timezone.tzname(o.timestamp)
+            data = {'checksum': o.checksum,
+                    'identifier': o.identifier,
+                    'parent': o.parent,
+                    'timezone': timezone,
+                    'timestamp': o.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    'description': o.description,
+                    'pkgs': o.pkgs}
+            if o.log.release is not None:
+                data['release'] = o.log.release
+            return data
+        if isinstance(o, SlackLogPkg):
+            return {'pkg': o.pkg,
+                    'description': o.description}
+        raise TypeError('Object of type %s is not JSON serializable' % type(o).__name__)
+
+
+class SlackLogSqliteFormatter (SlackLogFormatter):
+    """
+    Concrete SlackLog formatter that stores the log in an SQLite database.
+
+    The database has normalized ``logs``, ``entries``, and ``pkgs`` tables.  Formatting a log again, e.g. after
+    the ChangeLog has been updated, inserts only the entries whose identifiers are not in the database yet, and
+    deletes the entries that are no longer in the log.
+    """
+
+    schema = u'''
+        CREATE TABLE IF NOT EXISTS logs (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            starts_with_separator INTEGER NOT NULL,
+            ends_with_separator INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS entries (
+            id INTEGER PRIMARY KEY,
+            log INTEGER NOT NULL REFERENCES logs (id),
+            identifier TEXT NOT NULL,
+            parent TEXT,
+            checksum TEXT,
+            timestamp TEXT NOT NULL,
+            timezone TEXT,
+            twelve_hour_format INTEGER,
+            description TEXT NOT NULL,
+            UNIQUE (identifier, log)
+        );
+        CREATE INDEX IF NOT EXISTS entries_log_timestamp ON entries (log, timestamp);
+        CREATE INDEX IF NOT EXISTS entries_timestamp ON entries (timestamp);
+        CREATE TABLE IF NOT EXISTS pkgs (
+            id INTEGER PRIMARY KEY,
+            entry INTEGER NOT NULL REFERENCES entries (id),
+            position INTEGER NOT NULL,
+            pkg TEXT NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS pkgs_entry ON pkgs (entry);
+        CREATE INDEX IF NOT EXISTS pkgs_name ON pkgs (name);
+    '''
+    """SQL statements that create the tables."""
+
+    def __init__(self):
+        super(SlackLogSqliteFormatter, self).__init__()
+        self.database = None
+        """Database file name."""
+        self.slackware = None
+        """:py:class:`unicode` name of the log in the database.
+        E.g. 'slackware64 current'."""
+
+    def format(self, log):
+        """
+        Store the in-memory representation of the log in the database, see :py:meth:`store`.
+
+        :param log: :any:`SlackLog` -- in-memory representation of the log.
+        :return: :py:class:`unicode` -- An empty string.
+        """
+        self.store(log)
+        return u''
+
+    def store(self, log):
+        """
+        Store the in-memory representation of the log in the database.
+
+        :param log: :any:`SlackLog` -- in-memory representation of the log.
+        :return: (:py:class:`int`, :py:class:`int`) -- Number of entries inserted, and number of entries deleted.
+        """
+        assert(isinstance(log, SlackLog))
+        import sqlite3
+        db = sqlite3.connect(self.database)
+        try:
+            db.executescript(self.schema)
+            with db:
+                return self.sync(db, log)
+        finally:
+            db.close()
+
+    def iter_format(self, log):
+        """
+        Return an iterator of the unicode representation of the log, in one part.
+
+        :param log: :any:`SlackLog` -- in-memory representation of the log.
+        :return: iterator of :py:class:`unicode` -- The return value of :py:meth:`format`.
+        """
+        yield self.format(log)
+
+    def sync(self, db, log):
+        """
+        Insert the new entries of the log, and delete the entries that are no longer in the log.
+
+        :param db: :py:class:`sqlite3.Connection` -- The database, in a transaction.
+        :param log: :any:`SlackLog` -- in-memory representation of the log.
+        :return: (:py:class:`int`, :py:class:`int`) -- Number of entries inserted, and number of entries deleted.
+        """
+        from slacklog.indexes import pkg_base_name
+        entries = log.entries[:self.max_entries] if self.max_entries else log.entries
+
+        row = db.execute(u'SELECT id FROM logs WHERE name = ?', (self.slackware,)).fetchone()
+        if row is None:
+            log_id = db.execute(u'INSERT INTO logs (name, starts_with_separator, ends_with_separator) '
+                                u'VALUES (?, ?, ?)',
+                                (self.slackware, log.startsWithSeparator, log.endsWithSeparator)).lastrowid
+        else:
+            log_id = row[0]
+            db.execute(u'UPDATE logs SET starts_with_separator = ?, ends_with_separator = ? WHERE id = ?',
+                       (log.startsWithSeparator, log.endsWithSeparator, log_id))
+
+        stored = dict(db.execute(u'SELECT identifier, id FROM entries WHERE log = ?', (log_id,)))
+        current = set([entry.identifier for entry in entries])
+        stale = [(entry_id,) for identifier, entry_id in stored.items() if identifier not in current]
+        db.executemany(u'DELETE FROM pkgs WHERE entry = ?', stale)
+        db.executemany(u'DELETE FROM entries WHERE id = ?', stale)
+
+        entry_id = db.execute(u'SELECT MAX(id) FROM entries').fetchone()[0] or 0
+        entry_rows = []
+        pkg_rows = []
+        for entry in reversed(entries):
+            if entry.identifier in stored:
+                continue
+            entry_id += 1
+            timezone = None
+            if entry.timezone is not None:
+                timezone = entry.timezone.tzname(entry.timestamp)
+            entry_rows.append((entry_id, log_id, entry.identifier, entry.parent, entry.checksum,
+                               entry.timestamp.strftime('%Y-%m-%d %H:%M:%S'), timezone, entry.twelveHourFormat,
+                               entry.description))
+            pkgs = entry.pkgs[:self.max_pkgs] if self.max_pkgs else entry.pkgs
+            for position, pkg in enumerate(pkgs):
+                pkg_rows.append((entry_id, position, pkg.pkg, pkg_base_name(pkg.pkg), pkg.description))
+        db.executemany(u'INSERT INTO entries (id, log, identifier, parent, checksum, timestamp, timezone, '
+                       u'twelve_hour_format, description) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', entry_rows)
+        db.executemany(u'INSERT INTO pkgs (entry, position, pkg, name, description) VALUES (?, ?, ?, ?, ?)',
+                       pkg_rows)
+        return len(entry_rows), len(stale)
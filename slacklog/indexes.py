@@ -0,0 +1,431 @@
+# -*- coding: utf-8 -*-
+"""
+SlackLog indexes
+================
+
+SlackLog indexes are persistent indexes over the entries of many ChangeLogs.
+
+:any:`SlackLogPkgIndex` answers "when did this package change, in any release?" without parsing the ChangeLogs.
+It is stored in an SQLite database, so that a query reads only the changes of the queried package.
+
+:any:`SlackLogSearchIndex` finds the entries and packages whose description contains given words, e.g. a CVE
+identifier.
+
+The indexes are updated incrementally: when a ChangeLog has grown, only its new entries are added.
+"""
+import calendar
+import codecs
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+try:
+    str = unicode
+except NameError:
+    pass  # Forward compatibility with Py3k (unicode is not defined)
+
+pkg_re = re.compile(r'^(.+)-[^-]+-[^-]+-[^-]+\.t[gxlb]z$')
+"""Matches package file names, e.g. 'a/glibc-2.29-x86_64-1.txz'."""
+
+token_re = re.compile(r'\w+(?:[-.:/+]\w+)*', re.UNICODE)
+"""Matches tokens, e.g. 'openssl', 'CVE-2019-1559', or 'n/openssl-1.1.1b-x86_64-1.txz'."""
+
+query_re = re.compile(r'\w+(?:[-.:/+]\w+)*(?:[-.:/+]?\*)?', re.UNICODE)
+"""Matches the words of search queries, e.g. 'openssl', 'CVE-2019-1559', or 'CVE-2019-*'."""
+
+part_re = re.compile(r'[^\W_]+', re.UNICODE)
+"""Matches the parts of compound tokens."""
+
+
+def pkg_base_name(pkg):
+    """
+    Return the package name without version, architecture, build, and suffix.
+
+    E.g. 'a/glibc' for 'a/glibc-2.29-x86_64-1.txz'.  Other files, such as 'isolinux/initrd.img', are returned as is.
+
+    :param pkg: :py:class:`unicode` -- Package, as in :py:attr:`SlackLogPkg.pkg`.
+    :return: :py:class:`unicode` -- Base name.
+    """
+    pkg = pkg.strip()
+    match = pkg_re.match(pkg)
+    if match:
+        return match.group(1)
+    return pkg
+
+
+def pkg_short_name(pkg):
+    """
+    Return the package name without the directory, version, architecture, build, and suffix.
+
+    E.g. 'glibc' for 'a/glibc-2.29-x86_64-1.txz' and 'patches/packages/glibc-2.23-x86_64-4_slack14.2.txz'.
+
+    :param pkg: :py:class:`unicode` -- Package, as in :py:attr:`SlackLogPkg.pkg`.
+    :return: :py:class:`unicode` -- Short name.
+    """
+    return pkg_base_name(pkg).rsplit(u'/', 1)[-1]
+
+
+def tokenize(text):
+    """
+    Return the search tokens of the text.
+
+    The tokens are lower case words.  Words joined with punctuation, like 'CVE-2019-1559', are tokens as a whole,
+    and each of their parts ('cve', '2019', and '1559') is a token, too.
+
+    :param text: :py:class:`unicode` -- Text.
+    :return: :py:class:`set` -- The tokens.
+    """
+    tokens = set()
+    for match in token_re.finditer(text.lower()):
+        token = match.group(0)
+        tokens.add(token)
+        if not token.isalnum():
+            tokens.update(part_re.findall(token))
+    return tokens
+
+
+def timestamp_of(seconds):
+    """
+    Return the UTC :py:class:`datetime.datetime` of the seconds since epoch.
+    """
+    from dateutil import tz
+    return datetime.fromtimestamp(seconds, tz.tzutc())
+
+
+class SlackLogPkgChange (object):
+    """
+    A change of a package, as found in a :any:`SlackLogPkgIndex`.
+    """
+
+    def __init__(self, release, timestamp, identifier, pkg, description):
+        self.release = release
+        """:py:class:`unicode` name of the release.  E.g. 'slackware64-current'."""
+        self.timestamp = timestamp
+        """A :py:class:`datetime.datetime` timestamp of the entry in UTC."""
+        self.identifier = identifier
+        """:py:class:`unicode` identifier of the entry."""
+        self.pkg = pkg
+        """:py:class:`unicode` package, as in :py:attr:`SlackLogPkg.pkg`."""
+        self.description = description
+        """:py:class:`unicode` description of the change."""
+
+
+class SlackLogSearchHit (object):
+    """
+    An entry or a package, as found in a :any:`SlackLogSearchIndex`.
+    """
+
+    def __init__(self, release, timestamp, identifier, pkg, description):
+        self.release = release
+        """:py:class:`unicode` name of the release.  E.g. 'slackware64-current'."""
+        self.timestamp = timestamp
+        """A :py:class:`datetime.datetime` timestamp of the entry in UTC."""
+        self.identifier = identifier
+        """:py:class:`unicode` identifier of the entry."""
+        self.pkg = pkg
+        """:py:class:`unicode` package, as in :py:attr:`SlackLogPkg.pkg`, or :py:const:`None` if the description
+        of the entry matched."""
+        self.description = description
+        """:py:class:`unicode` description of the entry or the package."""
+
+
+class SlackLogIndex (object):
+    """
+    Base class for the persistent indexes.
+
+    An index is a set of tables in an SQLite database.  Subclasses define the tables in :py:attr:`schema`,
+    the name of the table of the indexed releases in :py:attr:`releases_table`, and override :py:meth:`add`
+    and :py:meth:`clear`.
+    """
+
+    releases_table = None
+    """Name of the table of the indexed releases."""
+
+    schema = u''
+    """SQL statements that create the tables of the index."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        """File name of the index."""
+        self.db = sqlite3.connect(filename)
+        self.db.executescript(u'''
+            CREATE TABLE IF NOT EXISTS %s (
+                release TEXT PRIMARY KEY,
+                head TEXT,
+                mtime REAL,
+                size INTEGER
+            );
+        ''' % self.releases_table + self.schema)
+
+    def close(self):
+        self.db.close()
+
+    def releases(self):
+        """
+        Return the indexed releases.
+
+        :return: :py:class:`dict` -- For each release name, a three element list: the identifier of the newest
+            indexed entry, and the modification time and size of the ChangeLog file when it was indexed.
+        """
+        return dict([(row[0], list(row[1:])) for row in self.db.execute(
+            u'SELECT release, head, mtime, size FROM %s' % self.releases_table)])
+
+    def update(self, release, log, stamp=None):
+        """
+        Add the entries of the log to the index.
+
+        If the newest entry indexed earlier is still in the log, only the entries newer than it are added.
+        Otherwise the release is indexed again from scratch.
+
+        :param release: :py:class:`unicode` -- Name of the release, e.g. 'slackware64-current'.
+        :param log: :any:`SlackLog` -- in-memory representation of the ChangeLog of the release.
+        :param stamp: Modification time and size of the ChangeLog, see :py:meth:`update_changelog`.
+        :return: :py:class:`int` -- Number of added entries.
+        """
+        indexed = self.releases().get(release)
+        entries = log.entries
+        with self.db:
+            head = None
+            if indexed is not None and indexed[0] is not None:
+                head = log.find(indexed[0])
+            if head is not None:
+                entries = entries[:entries.index(head)]
+            else:
+                self.clear(release)
+            self.add(release, entries)
+            mtime, size = stamp or (None, None)
+            self.db.execute(u'INSERT OR REPLACE INTO %s (release, head, mtime, size) VALUES (?, ?, ?, ?)'
+                            % self.releases_table,
+                            (release, log.entries[0].identifier if log.entries else None, mtime, size))
+        return len(entries)
+
+    def update_changelog(self, release, changelog, encoding='iso8859-1', parser=None):
+        """
+        Add the entries of the ChangeLog file to the index, if the file has changed since it was last indexed.
+
+        :param release: :py:class:`unicode` -- Name of the release, e.g. 'slackware64-current'.
+        :param changelog: ChangeLog file name.
+        :param encoding: ChangeLog encoding.
+        :param parser: :any:`SlackLogParser` to parse the ChangeLog with, or :py:const:`None` for the default.
+        :return: :py:class:`int` -- Number of added entries, or :py:const:`None` if the file has not changed.
+        """
+        st = os.stat(changelog)
+        stamp = [st.st_mtime, st.st_size]
+        indexed = self.releases().get(release)
+        if indexed is not None and indexed[1:] == stamp:
+            return None
+        if parser is None:
+            from slacklog.parsers import SlackLogParser
+            parser = SlackLogParser()
+        f = codecs.open(changelog, 'r', encoding)
+        try:
+            data = f.read()
+        finally:
+            f.close()
+        return self.update(release, parser.parse(data), stamp)
+
+    def remove(self, release):
+        """
+        Remove the release from the index.
+
+        :param release: :py:class:`unicode` -- Name of the release.
+        """
+        with self.db:
+            self.clear(release)
+            self.db.execute(u'DELETE FROM %s WHERE release = ?' % self.releases_table, (release,))
+
+    def add(self, release, entries):
+        """
+        Add the entries to the index.  Called in a transaction.
+
+        :param release: :py:class:`unicode` -- Name of the release.
+        :param entries: [:any:`SlackLogEntry`] -- The entries, newest first.
+        """
+        raise NotImplementedError()
+
+    def clear(self, release):
+        """
+        Remove the entries of the release from the index.  Called in a transaction.
+
+        :param release: :py:class:`unicode` -- Name of the release.
+        """
+        raise NotImplementedError()
+
+
+class SlackLogPkgIndex (SlackLogIndex):
+    """
+    Persistent inverted index from package names to the entries that changed them.
+
+    The changes of the packages are indexed by short package name.
+    """
+
+    releases_table = u'pkg_releases'
+
+    schema = u'''
+        CREATE TABLE IF NOT EXISTS pkg_changes (
+            name TEXT NOT NULL,
+            release TEXT NOT NULL,
+            timestamp INTEGER NOT NULL,
+            identifier TEXT NOT NULL,
+            pkg TEXT NOT NULL,
+            description TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS pkg_changes_name ON pkg_changes (name, timestamp);
+        CREATE INDEX IF NOT EXISTS pkg_changes_release ON pkg_changes (release);
+    '''
+
+    def add(self, release, entries):
+        changes = []
+        for entry in entries:
+            seconds = calendar.timegm(entry.timestamp.utctimetuple())
+            for pkg in entry.pkgs:
+                changes.append((pkg_short_name(pkg.pkg), release, seconds, entry.identifier, pkg.pkg,
+                                pkg.description))
+        self.db.executemany(u'''INSERT INTO pkg_changes (name, release, timestamp, identifier, pkg, description)
+                               VALUES (?, ?, ?, ?, ?, ?)''', changes)
+
+    def clear(self, release):
+        self.db.execute(u'DELETE FROM pkg_changes WHERE release = ?', (release,))
+
+    def history(self, name, releases=None):
+        """
+        Return the changes of the package, newest first.
+
+        The name can be a short name, like 'openssl', which matches the package in any directory, or a base name,
+        like 'n/openssl'.  A base name matches also the patches to the stable releases, e.g.
+        'patches/packages/openssl'.
+
+        :param name: :py:class:`unicode` -- Package name.
+        :param releases: [:py:class:`unicode`] -- If not :py:const:`None`, only changes in these releases are
+            returned.
+        :return: [:any:`SlackLogPkgChange`] -- The changes.
+        """
+        short = name.rsplit(u'/', 1)[-1]
+        bases = None
+        if u'/' in name:
+            bases = (name, u'patches/packages/%s' % short)
+        changes = []
+        for release, seconds, identifier, pkg, description in self.db.execute(
+                u'''SELECT release, timestamp, identifier, pkg, description FROM pkg_changes
+                   WHERE name = ? ORDER BY timestamp DESC, rowid''', (short,)):
+            if releases is not None and release not in releases:
+                continue
+            if bases is not None and pkg_base_name(pkg) not in bases:
+                continue
+            changes.append(SlackLogPkgChange(release, timestamp_of(seconds), identifier, pkg, description))
+        return changes
+
+
+class SlackLogSearchIndex (SlackLogIndex):
+    """
+    Persistent full text index of the descriptions of the entries and the packages.
+
+    Each entry description and each package (name and description) is a document, and the index maps every token
+    (see :py:func:`tokenize`) to the documents that contain it.
+    """
+
+    releases_table = u'search_releases'
+
+    schema = u'''
+        CREATE TABLE IF NOT EXISTS search_docs (
+            id INTEGER PRIMARY KEY,
+            release TEXT NOT NULL,
+            timestamp INTEGER NOT NULL,
+            identifier TEXT NOT NULL,
+            pkg TEXT,
+            description TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS search_docs_release ON search_docs (release);
+        CREATE TABLE IF NOT EXISTS search_tokens (
+            id INTEGER PRIMARY KEY,
+            token TEXT NOT NULL UNIQUE
+        );
+    ''' + (u'''
+        CREATE TABLE IF NOT EXISTS search_postings (
+            token INTEGER NOT NULL,
+            doc INTEGER NOT NULL,
+            PRIMARY KEY (token, doc)
+        ) WITHOUT ROWID;
+    ''' if sqlite3.sqlite_version_info >= (3, 8, 2) else u'''
+        CREATE TABLE IF NOT EXISTS search_postings (
+            token INTEGER NOT NULL,
+            doc INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS search_postings_token ON search_postings (token, doc);
+    ''')
+
+    def add(self, release, entries):
+        cursor = self.db.cursor()
+        doc = cursor.execute(u'SELECT MAX(id) FROM search_docs').fetchone()[0] or 0
+        docs = []
+        tokenized = []
+        for entry in reversed(entries):
+            seconds = calendar.timegm(entry.timestamp.utctimetuple())
+            if entry.description.strip():
+                doc += 1
+                docs.append((doc, release, seconds, entry.identifier, None, entry.description))
+                tokenized.append((doc, tokenize(entry.description)))
+            for pkg in entry.pkgs:
+                doc += 1
+                docs.append((doc, release, seconds, entry.identifier, pkg.pkg, pkg.description))
+                tokenized.append((doc, tokenize(u'%s %s' % (pkg.pkg, pkg.description))))
+        cursor.executemany(u'''INSERT INTO search_docs (id, release, timestamp, identifier, pkg, description)
+                              VALUES (?, ?, ?, ?, ?, ?)''', docs)
+
+        tokens = dict(cursor.execute(u'SELECT token, id FROM search_tokens'))
+        new_tokens = set()
+        for doc, doc_tokens in tokenized:
+            new_tokens.update([token for token in doc_tokens if token not in tokens])
+        cursor.executemany(u'INSERT INTO search_tokens (token) VALUES (?)', [(token,) for token in new_tokens])
+        if new_tokens:
+            tokens = dict(cursor.execute(u'SELECT token, id FROM search_tokens'))
+        postings = [(tokens[token], doc) for doc, doc_tokens in tokenized for token in doc_tokens]
+        postings.sort()  # Insert in index order
+        cursor.executemany(u'INSERT INTO search_postings (token, doc) VALUES (?, ?)', postings)
+
+    def clear(self, release):
+        self.db.execute(u'''DELETE FROM search_postings
+                           WHERE doc IN (SELECT id FROM search_docs WHERE release = ?)''', (release,))
+        self.db.execute(u'DELETE FROM search_docs WHERE release = ?', (release,))
+
+    def search(self, query, releases=None, limit=None):
+        """
+        Return the entries and the packages that match the query, newest first.
+
+        The query is a list of words, and the descriptions that contain all of them match.  The words are matched
+        case insensitively, as whole tokens (see :py:func:`tokenize`).  A word that ends with an asterisk matches
+        any token that starts with it, e.g. 'CVE-2019-*'.
+
+        :param query: :py:class:`unicode` -- Query.
+        :param releases: [:py:class:`unicode`] -- If not :py:const:`None`, only matches in these releases are
+            returned.
+        :param limit: :py:class:`int` -- If not :py:const:`None`, the maximum number of matches to return.
+        :return: [:any:`SlackLogSearchHit`] -- The matching entries and packages.
+        """
+        terms = []
+        params = []
+        for match in query_re.finditer(query.lower()):
+            word = match.group(0)
+            if word.endswith(u'*'):
+                prefix = word.rstrip(u'*')
+                terms.append(u'''SELECT doc FROM search_postings WHERE token IN
+                                (SELECT id FROM search_tokens WHERE token >= ? AND token < ?)''')
+                params.extend([prefix, prefix + u'\uffff'])
+            else:
+                terms.append(u'''SELECT doc FROM search_postings WHERE token =
+                                (SELECT id FROM search_tokens WHERE token = ?)''')
+                params.append(word)
+        if not terms:
+            return []
+        sql = u'''SELECT release, timestamp, identifier, pkg, description FROM search_docs
+                 WHERE id IN (%s)''' % u' INTERSECT '.join(terms)
+        if releases is not None:
+            sql += u' AND release IN (%s)' % u', '.join([u'?'] * len(releases))
+            params.extend(releases)
+        sql += u' ORDER BY timestamp DESC, id'
+        if limit is not None:
+            sql += u' LIMIT ?'
+            params.append(limit)
+        return [SlackLogSearchHit(release, timestamp_of(seconds), identifier, pkg, description)
+                for release, seconds, identifier, pkg, description in self.db.execute(sql, params)]
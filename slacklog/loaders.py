@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+SlackLog loaders
+================
+
+SlackLog loader keeps a set of parsed ChangeLogs in memory, e.g. the ChangeLogs of every Slackware release.
+
+The ChangeLogs are parsed with a :any:`SlackLogInterningParser`, so the entries that the ChangeLogs have in common
+are parsed only once, and their descriptions are stored only once.  A reloaded ChangeLog is re-parsed
+incrementally (see :py:meth:`SlackLogParser.reparse`).
+"""
+import codecs
+import fnmatch
+import os
+
+from slacklog.parsers import SlackLogInterningParser
+
+try:
+    str = unicode
+except NameError:
+    pass  # Forward compatibility with Py3k (unicode is not defined)
+
+
+class SlackLogLoader (object):
+    """
+    Loads ChangeLogs, sharing the identical entries between them.
+    """
+
+    def __init__(self, encoding='iso8859-1', parser=None):
+        self.encoding = encoding
+        """ChangeLog encoding."""
+        self.parser = parser or SlackLogInterningParser()
+        """The :any:`SlackLogInterningParser` used for (re-)parsing the ChangeLogs."""
+        self.logs = {}
+        """The :any:`SlackLog` objects, keyed by name."""
+
+    def load(self, changelog, name=None):
+        """
+        Parse the ChangeLog, and keep it.
+
+        If a ChangeLog with the same name has already been loaded, only its new entries are parsed.
+
+        :param changelog: ChangeLog file name.
+        :param name: :py:class:`unicode` name of the log, e.g. 'slackware64-current', or :py:const:`None` to use the
+            file name without the extension.
+        :return: :any:`SlackLog` -- The log.
+        """
+        if name is None:
+            name = self.name(changelog)
+        f = codecs.open(changelog, 'r', self.encoding)
+        try:
+            data = f.read()
+        finally:
+            f.close()
+        log = self.parser.reparse(data, self.logs.get(name))
+        self.logs[name] = log
+        return log
+
+    def load_all(self, directory, pattern='*.txt'):
+        """
+        Parse every ChangeLog in the directory, and keep them.
+
+        :param directory: Directory of ChangeLogs.
+        :param pattern: :py:class:`str` -- Shell-style pattern of the ChangeLog file names.
+        :return: :py:class:`dict` -- The loaded :any:`SlackLog` objects, keyed by name.
+        """
+        logs = {}
+        for filename in sorted(fnmatch.filter(os.listdir(directory), pattern)):
+            changelog = os.path.join(directory, filename)
+            name = self.name(changelog)
+            logs[name] = self.load(changelog, name)
+        return logs
+
+    def name(self, changelog):
+        """
+        Return the default name of a ChangeLog: the file name without the extension.
+
+        :param changelog: ChangeLog file name.
+        :return: :py:class:`unicode` -- Name, e.g. 'slackware64-current' for 'slackware64-current.txt'.
+        """
+        name = os.path.splitext(os.path.basename(changelog))[0]
+        if not isinstance(name, str):
+            name = name.decode('utf-8')
+        return name
+
+    def common(self, name, other):
+        """
+        Return the entries of a log that are also in another log.
+
+        The entries are compared by checksum, so this is linear in the number of entries.
+
+        :param name: :py:class:`unicode` name of the log.
+        :param other: :py:class:`unicode` name of the other log.
+        :return: [:any:`SlackLogEntry`] -- Entries of the first log, in the order they are in the log.
+        """
+        checksums = self.logs[other].index().checksums
+        return [entry for entry in self.logs[name].entries if entry.checksum in checksums]
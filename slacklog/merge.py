@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+SlackLog merge
+==============
+
+SlackLog merge combines the entries of many ChangeLogs, e.g. of every Slackware release, into one log, newest first,
+e.g. for a feed of the security fixes of all releases.
+
+The entries of each log are already newest first, so the logs are merged with a heap of their newest not yet merged
+entries.  Taking ``N`` entries from ``K`` logs takes ``O(K + N log K)`` steps, however long the logs are.
+
+The merged entries are not copied, and stay in their own logs.  Each log is labelled with the name of its release
+(see :py:attr:`SlackLog.release`), and the formatters label the merged entries with it.
+"""
+import calendar
+import heapq
+
+from slacklog.models import SlackLog
+
+
+def iter_merge(logs, predicate=None):
+    """
+    Return an iterator of the entries of the logs, newest first.
+
+    Entries with the same timestamp are in the order of the logs.
+
+    :param logs: [:any:`SlackLog`] -- The logs, each newest first.
+    :param predicate: Function that returns :py:const:`True` for the entries to include, e.g.
+        ``lambda entry: entry.security`` for the security fixes, or :py:const:`None` to include all entries.
+    :return: iterator of :any:`SlackLogEntry` -- The entries.
+    """
+    heap = []
+    for index, log in enumerate(logs):
+        assert(isinstance(log, SlackLog))
+        if log.entries:
+            heap.append((-calendar.timegm(log.entries[0].timestamp.utctimetuple()), index, 0))
+    heapq.heapify(heap)
+    while heap:
+        seconds, index, position = heap[0]
+        entries = logs[index].entries
+        entry = entries[position]
+        position += 1
+        if position < len(entries):
+            heapq.heapreplace(heap, (-calendar.timegm(entries[position].timestamp.utctimetuple()), index, position))
+        else:
+            heapq.heappop(heap)
+        if predicate is None or predicate(entry):
+            yield entry
+
+
+def merge(logs, max_entries=None, predicate=None):
+    """
+    Return a log of the newest entries of the logs.
+
+    :param logs: [:any:`SlackLog`] -- The logs, each newest first.
+    :param max_entries: If not :py:const:`None`, must be an :py:class:`int` representing how many entries to merge.
+    :param predicate: Function that returns :py:const:`True` for the entries to include, see :py:func:`iter_merge`.
+    :return: :any:`SlackLog` -- A new log, whose entries are the merged entries.  They are not moved to it.
+    """
+    merged = SlackLog()
+    for entry in iter_merge(logs, predicate):
+        if max_entries is not None and len(merged.entries) >= max_entries:
+            break
+        merged.entries.append(entry)
+    return merged
@@ -4,6 +4,8 @@ SlackLog models
 
 SlackLog models represent the ChangeLog.txt after parsing.
 """
+import re
+from bisect import bisect_left
 from datetime import datetime, tzinfo
 
 try:
@@ -11,10 +13,26 @@ try:
 except NameError:
     pass  # Forward compatibility with Py3k (unicode is not defined)
 
+PKG_ACTIONS = (u'other', u'upgraded', u'rebuilt', u'added', u'removed', u'patched', u'moved')
+"""The values of :py:attr:`SlackLogPkg.action`.  The position of an action is its numeric code."""
+
+action_re = re.compile(r'\s*(Upgraded|Updated|Rebuilt|Recompiled|Added|Removed|Patched|Fixed|Moved)\b')
+"""Matches the verb a package description starts with, e.g. 'Upgraded.'."""
+
+action_words = {u'Upgraded': u'upgraded', u'Updated': u'upgraded', u'Rebuilt': u'rebuilt', u'Recompiled': u'rebuilt',
+                u'Added': u'added', u'Removed': u'removed', u'Patched': u'patched', u'Fixed': u'patched',
+                u'Moved': u'moved'}
+
+SECURITY_FIX = u'(* Security fix *)'
+"""The mark of security fixes in the descriptions."""
+
 
 class SlackLog (object):
     """
     Little more than a list of :any:`SlackLogEntry` objects.
+
+    Entries can be looked up by identifier, by checksum, and by timestamp.  The lookups use indexes which are
+    built on first use, and rebuilt when the list of entries has changed (see :any:`SlackLogIndexes`).
     """
 
     def __init__(self):
@@ -36,6 +54,109 @@ class SlackLog (object):
         
         This defaults to :py:const:`False`.
         """
+        self.source = None
+        """The :py:class:`unicode` ChangeLog.txt content the log was parsed from, or :py:const:`None`.
+
+        This is kept only if the parser was asked to, see :py:attr:`slacklog.parsers.SlackLogParser.keep_spans`.
+        """
+        self.checksumVersion = 1
+        """Version of the checksums and identifiers of the entries, see
+        :py:attr:`slacklog.parsers.SlackLogParser.checksum_version`."""
+        self.indexes = None
+        """The :any:`SlackLogIndexes` of the entries, or :py:const:`None` if they have not been built yet."""
+        self.release = None
+        """:py:class:`unicode` name of the release of the log, e.g. 'slackware64-14.2', or :py:const:`None`.
+
+        The formatters label the entries of a merged log with the release of their own log, see
+        :py:func:`slacklog.merge.merge`.
+        """
+
+    def index(self):
+        """
+        Return the indexes of the entries, building them if the entries have changed.
+
+        :return: :any:`SlackLogIndexes` -- The indexes.
+        """
+        if self.indexes is None or not self.indexes.valid(self.entries):
+            self.indexes = SlackLogIndexes(self.entries)
+        return self.indexes
+
+    def find(self, identifier):
+        """
+        Return the entry with the identifier.
+
+        :param identifier: :py:class:`unicode` -- Entry identifier.
+        :return: :any:`SlackLogEntry` -- The entry, or :py:const:`None` if there is no such entry.
+        """
+        return self.index().identifiers.get(identifier)
+
+    def find_by_checksum(self, checksum):
+        """
+        Return the newest entry with the checksum.
+
+        :param checksum: :py:class:`unicode` -- Entry checksum.
+        :return: :any:`SlackLogEntry` -- The entry, or :py:const:`None` if there is no such entry.
+        """
+        return self.index().checksums.get(checksum)
+
+    def entries_between(self, start=None, end=None):
+        """
+        Return the entries with a timestamp between start (inclusive) and end (exclusive).
+
+        :param start: :py:class:`datetime.datetime` -- Timezone aware start time, or :py:const:`None` for no limit.
+        :param end: :py:class:`datetime.datetime` -- Timezone aware end time, or :py:const:`None` for no limit.
+        :return: [:any:`SlackLogEntry`] -- The entries, in the order they are in the log.
+        """
+        indexes = self.index()
+        lo = 0 if start is None else bisect_left(indexes.timestamps, start)
+        hi = len(indexes.timestamps) if end is None else bisect_left(indexes.timestamps, end)
+        if lo >= hi:
+            return []
+        return [self.entries[position] for position in sorted(indexes.positions[lo:hi])]
+
+
+class SlackLogIndexes (object):
+    """
+    Lookup indexes of the entries of a :any:`SlackLog`.
+
+    The indexes are considered out of date when the entry list is replaced, when its length changes, or when its
+    first or last entry changes.  That covers appending and prepending entries, which is how logs are updated.
+    Other in-place changes are not detected: set :py:attr:`SlackLog.indexes` to :py:const:`None` after them.
+    """
+
+    def __init__(self, entries):
+        self.key = self.key_of(entries)
+        """What the entries looked like when the indexes were built."""
+        self.identifiers = {}
+        """Entries keyed by identifier."""
+        self.checksums = {}
+        """The newest entry with each checksum, keyed by checksum."""
+        for entry in reversed(entries):
+            if entry.identifier is not None:
+                self.identifiers[entry.identifier] = entry
+            if entry.checksum is not None:
+                self.checksums[entry.checksum] = entry
+        order = sorted(range(len(entries)), key=lambda position: entries[position].timestamp)
+        self.timestamps = [entries[position].timestamp for position in order]
+        """Entry timestamps in ascending order."""
+        self.positions = order
+        """Positions of the entries in the log, in the order of :py:attr:`timestamps`."""
+
+    @staticmethod
+    def key_of(entries):
+        if not entries:
+            return (entries, 0, None, None)
+        return (entries, len(entries), entries[0], entries[-1])
+
+    def valid(self, entries):
+        """
+        Return :py:const:`True` if the indexes are up to date with the entries.
+
+        :param entries: [:any:`SlackLogEntry`] -- The entries of the log.
+        :return: :py:class:`bool` -- :py:const:`False` if the indexes should be rebuilt.
+        """
+        key = self.key_of(entries)
+        return key[0] is self.key[0] and key[1] == self.key[1] and key[2] is self.key[2] and key[3] is self.key[3]
 
 
 class SlackLogEntry (object):
@@ -57,31 +178,124 @@ class SlackLogEntry (object):
             assert(isinstance(parent, str))
         if timezone is not None:
             assert(isinstance(timezone, tzinfo))
+        self.pending = None
+        """:py:const:`None`, or what is needed to compute :py:attr:`checksum`, :py:attr:`identifier`, and
+        :py:attr:`parent` when they are first used: the parser, the unparsed entry, and the parent entry.
+
+        This is set by the parsers, see :py:attr:`slacklog.parsers.SlackLogParser.lazy`.
+        """
         self.timestamp = timestamp
         """A :py:class:`datetime.datetime` timestamp in UTC."""
         self.description = description
         """A unicode description which may be empty."""
         self.log = log
         """Reference to the :any:`SlackLog` that contains this entry."""
-        self.checksum = checksum
+        self._checksum = checksum
+        self._identifier = identifier
+        self._parent = parent
+        self.timezone = timezone
+        """The original timezone of the entry as :py:class:`datetime.tzinfo` or :py:const:`None`."""
+        self.twelveHourFormat = twelveHourFormat
+        """If this is :py:const:`True`, the original timestamp was in twelve hour format."""
+        self.pkgs = []
+        """The list of :any:`SlackLogPkg` objects. Empty by default."""
+        self.escapedDescription = None
+        """The :py:attr:`description` with HTML special characters escaped, or :py:const:`None`.
+
+        This is a cache filled in by the formatters, see :py:func:`slacklog.formatters.escape_entry`.
+        Reset it to :py:const:`None` if the description is changed.
+        """
+        self._span = None
+        self._spanned = None
+
+    @property
+    def span(self):
+        """The start and end of this entry in :py:attr:`SlackLog.source` of :py:attr:`log`, or :py:const:`None`.
+
+        The span is set by the parser, see :py:attr:`slacklog.parsers.SlackLogParser.keep_spans`.  The
+        :py:meth:`fields` of the entry are recorded with it, and the span is :py:const:`None` while they differ,
+        i.e. once the entry, or its packages, have been changed.
+        """
+        if self._span is not None and self._spanned != self.fields():
+            return None
+        return self._span
+
+    @span.setter
+    def span(self, span):
+        self._span = span
+        self._spanned = None if span is None else self.fields()
+
+    def fields(self):
+        """
+        Return the fields the text of the entry is made of.
+
+        :return: :py:class:`tuple` -- The timestamp, the original timezone and time format, the description, and
+            the name and description of each package.
+        """
+        return (self.timestamp, self.timezone, self.twelveHourFormat, self.description,
+                [(pkg.pkg, pkg.description) for pkg in self.pkgs])
+
+    @property
+    def security(self):
+        """:py:const:`True` if the :py:attr:`description`, or any of the packages, marks this a security fix (see
+        :py:attr:`SlackLogPkg.security`)."""
+        return SECURITY_FIX in self.description or any([pkg.security for pkg in self.pkgs])
+
+    @property
+    def checksum(self):
         """A unicode checksum or :py:const:`None`.
-        
+
         This should identify the entry by content.  Two different logs may have the same entry,
         but those entries have different parent.
         """
-        self.identifier = identifier
+        pending = self.pending
+        if self._checksum is None and pending is not None:
+            pending[0].resolve(self, True)
+        return self._checksum
+
+    @checksum.setter
+    def checksum(self, checksum):
+        self.resolve()
+        self._checksum = checksum
+
+    @property
+    def identifier(self):
         """A unicode identifier or :py:const:`None`.
-        
+
         This should identify the entry by content and parent.
         """
-        self.parent = parent
+        pending = self.pending
+        if pending is not None:
+            pending[0].resolve(self)
+        return self._identifier
+
+    @identifier.setter
+    def identifier(self, identifier):
+        self.resolve()
+        self._identifier = identifier
+
+    @property
+    def parent(self):
         """A unicode parent identifier or :py:const:`None`."""
-        self.timezone = timezone
-        """The original timezone of the entry as :py:class:`datetime.tzinfo` or :py:const:`None`."""
-        self.twelveHourFormat = twelveHourFormat
-        """If this is :py:const:`True`, the original timestamp was in twelve hour format."""
-        self.pkgs = []
-        """The list of :any:`SlackLogPkg` objects. Empty by default."""
+        pending = self.pending
+        if pending is not None:
+            pending[0].resolve(self)
+        return self._parent
+
+    @parent.setter
+    def parent(self, parent):
+        self.resolve()
+        self._parent = parent
+
+    def resolve(self):
+        """
+        Compute the pending :py:attr:`checksum`, :py:attr:`identifier`, and :py:attr:`parent` now, if any.
+
+        This is done before any of them is set, so that the pending computation never overwrites the new value.
+        """
+        pending = self.pending
+        if pending is not None:
+            pending[0].resolve(self)
 
 
 class SlackLogPkg (object):
@@ -99,3 +313,26 @@ class SlackLogPkg (object):
         """A unicode description."""
         self.entry = entry
         """Reference to the :any:`SlackLogEntry` that contains this package."""
+        self.escapedDescription = None
+        """The :py:attr:`description` with HTML special characters escaped, or :py:const:`None`.
+
+        This is a cache filled in by the formatters, see :py:func:`slacklog.formatters.escape_entry`.
+        Reset it to :py:const:`None` if the description is changed.
+        """
+
+    @property
+    def action(self):
+        """What was done to the package, one of :py:data:`PKG_ACTIONS`.
+
+        This is classified by the first word of the :py:attr:`description`, e.g. u'rebuilt' for 'Rebuilt.' and
+        'Recompiled.'.  Descriptions that do not start with a known verb are u'other'.
+        """
+        match = action_re.match(self.description)
+        if match is None:
+            return PKG_ACTIONS[0]
+        return action_words[match.group(1)]
+
+    @property
+    def security(self):
+        """:py:const:`True` if the :py:attr:`description` marks this a security fix."""
+        return SECURITY_FIX in self.description
@@ -11,9 +11,12 @@ from __future__ import print_function
 
 import re
 import hashlib
-from dateutil import parser
-from dateutil import tz
+import threading
+import weakref
+from datetime import datetime
+from timeit import default_timer
 from slacklog.models import SlackLog, SlackLogEntry, SlackLogPkg
+from binascii import unhexlify
 from codecs import encode
 
 try:
@@ -27,6 +30,9 @@ except NameError:
 # a file name.
 pkg_name_re = re.compile(r'\A[-a-zA-Z0-9_]+[/.][-a-zA-Z0-9_+/.]*[*]?:  ')
 
+# Entry separator, e.g. '+--------------------------+'
+separator_re = re.compile(r'\+-+\+')
+
 # A regex for checking if the timestamp had 12-hour or 24-hour format
 am_pm_re = re.compile(r' [AaPp][Mm]? ')
 
@@ -36,6 +42,98 @@ tzinfos = {
     'UTC': 0,
     }
 
+# A regex for the usual ChangeLog timestamp, e.g. 'Fri Feb  1 05:53:41 UTC 2019'
+timestamp_re = re.compile(r'\A[A-Z][a-z][a-z] ([A-Z][a-z][a-z]) ([ \d]?\d) (\d\d):(\d\d):(\d\d) ([A-Z]+) (\d{4})\s*\Z')
+
+months = {'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+          'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12}
+
+# Timezones of the usual timestamps, created on demand
+timezones = {}
+
+
+def parse_changelog_timestamp(data):
+    """
+    Parse the usual ChangeLog timestamp without dateutil parser.
+
+    Slackware ChangeLogs use the same timestamp format almost everywhere, and dateutil parser is both slow to import,
+    and slow to parse.  The result is the same as :py:func:`dateutil.parser.parse` would return with
+    :py:data:`tzinfos`.
+
+    :param data: :py:class:`unicode` -- Time string.
+    :return: :py:class:`datetime.datetime` -- Timestamp in the original timezone, or :py:const:`None` if the time
+        string was not in the usual format.
+    """
+    match = timestamp_re.match(data)
+    if match is None:
+        return None
+    month, day, hour, minute, second, tzname, year = match.groups()
+    if month not in months or tzname not in tzinfos:
+        return None
+    timezone = timezones.get(tzname)
+    if timezone is None:
+        from dateutil import tz
+        timezone = timezones.setdefault(tzname, tz.tzoffset(tzname, tzinfos[tzname]))
+    try:
+        return datetime(int(year), months[month], int(day), int(hour), int(minute), int(second), tzinfo=timezone)
+    except ValueError:
+        return None
+
+
+class SlackLogParserStats (object):
+    """
+    Cumulative wall time and call counts of the parsing phases.
+
+    Assign an instance to :py:attr:`SlackLogParser.stats` to collect the statistics.  Any object with a
+    :py:meth:`record` method can be used instead, e.g. to forward the timings elsewhere.
+    """
+
+    PHASES = ['split_log_to_entries',
+              'gen_entry_checksum',
+              'gen_entry_identifier',
+              'parse_entry_timestamp',
+              'parse_entry_description',
+              'split_entry_to_pkgs',
+              'parse_pkg']
+    """The phases that are timed, in the order they are reported."""
+
+    def __init__(self):
+        self.times = {}
+        """Cumulative time in seconds, keyed by phase name."""
+        self.calls = {}
+        """Number of calls, keyed by phase name."""
+        self.lock = threading.Lock()
+
+    def record(self, phase, seconds):
+        """
+        Record one call of a phase.
+
+        :param phase: :py:class:`str` -- Phase name, one of :py:attr:`PHASES`.
+        :param seconds: :py:class:`float` -- Wall time spent in the call.
+        """
+        with self.lock:
+            self.times[phase] = self.times.get(phase, 0.0) + seconds
+            self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    def report(self):
+        """
+        Return the statistics as a human readable table.
+
+        :return: :py:class:`unicode` -- The table, one line per phase.
+        """
+        total = sum(self.times.values())
+        lines = [u'%-24s %8s %10s %10s %6s\n' % (u'phase', u'calls', u'total ms', u'per call', u'share')]
+        for phase in self.PHASES:
+            calls = self.calls.get(phase, 0)
+            seconds = self.times.get(phase, 0.0)
+            lines.append(u'%-24s %8d %10.1f %8.1fus %5.1f%%\n'
+                         % (phase,
+                            calls,
+                            seconds * 1000,
+                            seconds * 1000000 / calls if calls else 0.0,
+                            seconds * 100 / total if total else 0.0))
+        return u''.join(lines)
+
 
 class SlackLogParser (object):
     """
@@ -47,10 +145,60 @@ class SlackLogParser (object):
         """If :py:const:`True`, warnings about date parsing are not printed."""
         self.min_date = None
         """If set to a :py:class:`datetime.datetime` object, older log entries are ignored (not parsed)."""
-        self.ENTRY = 0
-        """Counter of entries (for debugging)."""
-        self.PKG = 0
-        """Counter of packages (for debugging)."""
+        self.state = threading.local()
+        """The parsing state of each thread: the :py:attr:`ENTRY` and :py:attr:`PKG` counters.
+
+        The parser does not change its other attributes while parsing, so one parser can parse in many threads
+        at the same time.
+        """
+        self.stats = None
+        """If set to a :any:`SlackLogParserStats` object, the time spent in each parsing phase is recorded
+        in it."""
+        self.checksum_version = 1
+        """Version of the entry checksums and identifiers.
+
+        Version 1 (the default) is the SHA-512 of the UTF-8 encoded entry, and the identifiers are chained on the
+        hex digests.  Version 2 is the SHA-512 of the entry as it is in the ChangeLog file, and the identifiers are
+        chained on the binary digests; use it with :py:meth:`parse_bytes`, which does not encode the entries again.
+        The versions give different checksums and identifiers for the same entries, so logs parsed with different
+        versions should not be compared, or re-parsed one from the other.
+        """
+        self.encoding = 'iso8859-1'
+        """ChangeLog encoding, used for version 2 checksums of decoded entries."""
+        self.keep_spans = False
+        """If :py:const:`True`, the log keeps the ChangeLog it was parsed from (see :py:attr:`SlackLog.source`), and
+        each entry its position in it (see :py:attr:`SlackLogEntry.span`).  Only :py:meth:`parse` and
+        :py:meth:`reparse` keep them.
+
+        This lets :any:`SlackLogTxtFormatter` copy the entries instead of formatting them.
+        """
+        self.lazy = True
+        """If :py:const:`True`, the checksums and identifiers of the entries are computed when they are first used,
+        instead of when the entries are parsed.  Until then, each entry keeps its unparsed content.
+
+        Most feeds never use them, so they need not be computed.  Re-parsing (see :py:meth:`reparse`) and
+        :any:`SlackLogInterningParser` use them, and compute them as they go.
+        """
+        self.resolving = threading.RLock()
+        """Guards the computation of the pending checksums and identifiers, see :py:meth:`resolve`."""
+
+    @property
+    def ENTRY(self):
+        """Counter of entries parsed in this thread (for debugging)."""
+        return getattr(self.state, 'ENTRY', 0)
+
+    @ENTRY.setter
+    def ENTRY(self, value):
+        self.state.ENTRY = value
+
+    @property
+    def PKG(self):
+        """Counter of packages parsed in the current entry in this thread (for debugging)."""
+        return getattr(self.state, 'PKG', 0)
+
+    @PKG.setter
+    def PKG(self, value):
+        self.state.PKG = value
 
     def parse(self, data):
         """
@@ -60,9 +208,96 @@ class SlackLogParser (object):
         :returns: :any:`SlackLog` -- in-memory representation of data
         """
         assert(isinstance(data, str))
+        return self.reparse(data, None)
+
+    def reparse(self, data, previous):
+        """
+        Return the in-memory representation of the data, reusing the entries of an earlier representation.
+
+        ChangeLogs grow at the top, so when a ChangeLog is updated, most of its entries are the same as before.
+        Entries that have the same identifier as an entry in the previous log are copied from it (see
+        :py:meth:`copy_entry`), instead of being parsed again.
+
+        :param data: :py:class:`unicode` -- the ChangeLog.txt content.
+        :param previous: :any:`SlackLog` -- in-memory representation of an earlier version of the same ChangeLog,
+            parsed with the same settings, or :py:const:`None`.  It is not changed, so it can still be used, e.g.
+            formatted in another thread.
+        :returns: :any:`SlackLog` -- in-memory representation of data
+        """
+        assert(isinstance(data, str))
+        log, data = self.split_separators(data)
+        if self.keep_spans:
+            log.source = data
+            spans = self.timed('split_log_to_entries', self.split_log_to_spans, data)
+            return self.parse_entries(log, [(entry, None) for entry, start, end in spans], previous,
+                                      [(start, end) for entry, start, end in spans])
+        entries = self.timed('split_log_to_entries', self.split_log_to_entries, data)
+        return self.parse_entries(log, [(entry, None) for entry in entries], previous)
+
+    def parse_async(self, data, previous=None, executor=None, loop=None):
+        """
+        Return an :py:mod:`asyncio` future of the in-memory representation of the data.
+
+        The data is parsed by :py:meth:`reparse` in the executor, so the event loop is not blocked meanwhile.  The
+        parser can be shared between threads, so many ChangeLogs can be parsed at the same time.
+
+        Requires Python 3.4 or later.
+
+        :param data: :py:class:`unicode` -- the ChangeLog.txt content.
+        :param previous: :any:`SlackLog` -- in-memory representation of an earlier version of the same ChangeLog,
+            see :py:meth:`reparse`, or :py:const:`None`.
+        :param executor: :py:class:`concurrent.futures.Executor`, or :py:const:`None` for the default executor of
+            the event loop.
+        :param loop: The event loop, or :py:const:`None` for the current event loop.
+        :returns: :py:class:`asyncio.Future` -- the future :any:`SlackLog`.
+        """
+        assert(isinstance(data, str))
+        import asyncio
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        return loop.run_in_executor(executor, self.reparse, data, previous)
+
+    def parse_bytes(self, data, encoding=None, previous=None):
+        """
+        Return the in-memory representation of the undecoded data.
+
+        The ChangeLog is split into entries before decoding, and each entry is decoded on its own.  With
+        :py:attr:`checksum_version` 2, the checksums are computed from the undecoded entries, so the entries are
+        never encoded again.  With version 1, the result is the same as from :py:meth:`reparse` of the decoded data.
+
+        :param data: :py:class:`bytes` -- the ChangeLog.txt content.
+        :param encoding: :py:class:`str` -- ChangeLog encoding, or :py:const:`None` for :py:attr:`encoding`.
+        :param previous: :any:`SlackLog` -- in-memory representation of an earlier version of the same ChangeLog,
+            see :py:meth:`reparse`, or :py:const:`None`.
+        :returns: :any:`SlackLog` -- in-memory representation of data
+        """
+        assert(isinstance(data, bytes))
+        encoding = encoding or self.encoding
+        log, data = self.split_separators(data)
+        entries = []
+        for raw in self.timed('split_log_to_entries', self.split_log_to_entries, data):
+            # Unicode whitespace is a superset of ASCII whitespace
+            entry = raw.decode(encoding).lstrip()
+            if entry:
+                entries.append((entry, raw))
+        return self.parse_entries(log, entries, previous)
+
+    def split_separators(self, data):
+        """
+        Remove the entry separators from the start and the end of the ChangeLog.txt.
+
+        :param data: :py:class:`unicode` or :py:class:`bytes` -- the ChangeLog.txt content.
+        :return: [:any:`SlackLog`, :py:class:`unicode` or :py:class:`bytes`] -- a two element list: a new, empty,
+            log, and the rest of the data.
+        """
         log = SlackLog()
-        log.startsWithSeparator = re.match('\A(\+-+\+[\n]?)', data)
-        log.endsWithSeparator = re.search('[\n](\+-+\+[\n]?)\Z', data)
+        log.checksumVersion = self.checksum_version
+        if isinstance(data, str):
+            log.startsWithSeparator = re.match('\A(\+-+\+[\n]?)', data)
+            log.endsWithSeparator = re.search('[\n](\+-+\+[\n]?)\Z', data)
+        else:
+            log.startsWithSeparator = re.match(br'\A(\+-+\+[\n]?)', data)
+            log.endsWithSeparator = re.search(br'[\n](\+-+\+[\n]?)\Z', data)
         if log.startsWithSeparator:
             data = data[log.startsWithSeparator.start():]
             log.startsWithSeparator = True
@@ -73,67 +308,281 @@ class SlackLogParser (object):
             log.endsWithSeparator = True
         else:
             log.endsWithSeparator = False
+        return [log, data]
+
+    def parse_entries(self, log, entries, previous, spans=None):
+        """
+        Parse the entries into the log.
 
-        for entry_data in self.split_log_to_entries(data):
-            entry = self.parse_entry(entry_data, log)
+        :param log: :any:`SlackLog` -- in-memory representation that is being parsed.
+        :param entries: [(:py:class:`unicode`, :py:class:`bytes`)] -- unparsed entries, oldest first, and the
+            undecoded entries, or :py:const:`None` if the entries were not decoded by the parser.
+        :param previous: :any:`SlackLog` -- in-memory representation of an earlier version of the same ChangeLog,
+            see :py:meth:`reparse`, or :py:const:`None`.
+        :param spans: [(:py:class:`int`, :py:class:`int`)] -- start and end of each entry in
+            :py:attr:`SlackLog.source`, or :py:const:`None`.
+        :returns: :any:`SlackLog` -- the log.
+        """
+        reusable = {}
+        if previous is not None:
+            assert(isinstance(previous, SlackLog))
+            reusable = previous.index().identifiers
+        for index, (entry_data, raw) in enumerate(entries):
+            entry = None
+            if reusable:
+                entry = self.reuse_entry(entry_data, log, reusable, raw)
+            if entry is None:
+                entry = self.parse_entry(entry_data, log, raw)
             if entry:
+                entry.span = spans[index] if spans is not None else None
                 log.entries.insert(0, entry)
         return log
 
+    def reuse_entry(self, data, log, reusable, raw=None):
+        """
+        Return an already parsed ChangeLog entry, if one with the same identifier exists.
+
+        :param data: :py:class:`unicode` -- ChangeLog entry content.
+        :param log: :any:`SlackLog` -- in-memory representation that is being parsed.
+        :param reusable: :py:class:`dict` -- already parsed entries keyed by identifier.
+        :param raw: :py:class:`bytes` -- Undecoded ChangeLog entry content, or :py:const:`None`.
+        :return: :any:`SlackLogEntry` -- a copy of the earlier entry in this log, or :py:const:`None`.
+        """
+        checksum = self.timed('gen_entry_checksum', self.gen_entry_checksum, self.checksum_data(data, raw))
+        parent = None
+        if log.entries:
+            parent = log.entries[0].identifier
+        identifier = self.timed('gen_entry_identifier', self.gen_entry_identifier, data, checksum, parent)
+        entry = reusable.get(identifier)
+        if entry is not None:
+            entry = self.copy_entry(entry, log)
+        return entry
+
+    def copy_entry(self, entry, log):
+        """
+        Return a copy of an already parsed entry, in another log.
+
+        The copy shares the timestamp, the descriptions, and the package names with the entry, and has the same
+        checksum and identifiers.  The entry, and the log it is in, are not changed.
+
+        :param entry: :any:`SlackLogEntry` -- The entry to copy.
+        :param log: :any:`SlackLog` -- in-memory representation that is being parsed.
+        :return: :any:`SlackLogEntry` -- The copy, with copies of the packages.
+        """
+        copy = SlackLogEntry(entry.timestamp, entry.description, log, checksum=entry.checksum,
+                             identifier=entry.identifier, parent=entry.parent, timezone=entry.timezone,
+                             twelveHourFormat=entry.twelveHourFormat)
+        copy.escapedDescription = entry.escapedDescription
+        for pkg in entry.pkgs:
+            copy_pkg = SlackLogPkg(pkg.pkg, pkg.description, copy)
+            copy_pkg.escapedDescription = pkg.escapedDescription
+            copy.pkgs.append(copy_pkg)
+        return copy
+
     def split_log_to_entries(self, data):
         """
         Split the ChangeLog.txt into a list of unparsed entries.
 
-        :param data: :py:class:`unicode` --the ChangeLog.txt content.
-        :returns: [:py:class:`unicode`] -- list of unparsed entries, separators removed.
+        :param data: :py:class:`unicode` -- the ChangeLog.txt content, or :py:class:`bytes` if it was not decoded.
+        :returns: [:py:class:`unicode`] -- list of unparsed entries, separators removed.  :py:class:`bytes` if the
+            data was :py:class:`bytes`.
         """
-        assert(isinstance(data, str))
-        raw_entries = re.split('\+-+\+', data)
+        if isinstance(data, str):
+            raw_entries = re.split('\+-+\+', data)
+        else:
+            raw_entries = re.split(br'\+-+\+', data)
         entries = []
         for entry in raw_entries:
             entry = entry.lstrip()
-            if entry and entry != "":
+            if entry:
                 entries.append(entry)
         entries.reverse()
         return entries
 
-    def parse_entry(self, data, log):
+    def split_log_to_spans(self, data):
+        """
+        Split the ChangeLog.txt into a list of unparsed entries, and their positions.
+
+        The entries are the same as from :py:meth:`split_log_to_entries`.
+
+        :param data: :py:class:`unicode` --the ChangeLog.txt content.
+        :returns: [(:py:class:`unicode`, :py:class:`int`, :py:class:`int`)] -- list of unparsed entries, separators
+            removed, and the start and end of each entry in the data.
+        """
+        assert(isinstance(data, str))
+        entries = []
+        start = 0
+        for separator in separator_re.finditer(data):
+            entry = data[start:separator.start()].lstrip()
+            if entry:
+                entries.append((entry, separator.start() - len(entry), separator.start()))
+            start = separator.end()
+        entry = data[start:].lstrip()
+        if entry:
+            entries.append((entry, len(data) - len(entry), len(data)))
+        entries.reverse()
+        return entries
+
+    def parse_entry(self, data, log, raw=None):
         """
         Parse a single ChangeLog entry.
 
         :param data: :py:class:`unicode` -- ChangeLog entry content.
         :param log: :any:`SlackLog` -- in-memory representation that is being parsed.
+        :param raw: :py:class:`bytes` -- Undecoded ChangeLog entry content, or :py:const:`None`.
         :return: :any:`SlackLogEntry` -- in-memory representation of the ChangeLog entry.
         """
         assert(isinstance(data, str))
         assert(isinstance(log, SlackLog))
         self.ENTRY += 1
         self.PKG = 0
-        checksum = self.gen_entry_checksum(data)
         parent = None
         if log.entries:
-            parent = log.entries[0].identifier
-            identifier = self.gen_entry_identifier(data, checksum, parent)
-        else:
-            identifier = self.gen_entry_identifier(data, checksum, None)
-        timestamp, timezone, twelve_hour, data = self.parse_entry_timestamp(data)
+            parent = log.entries[0]
+        entry = self.parse_entry_content(data, log)
+        if entry is not None:
+            self.hash_entry(entry, data, raw, parent)
+        return entry
+
+    def parse_entry_content(self, data, log):
+        """
+        Parse the timestamp, description, and packages of a single ChangeLog entry.
+
+        :param data: :py:class:`unicode` -- ChangeLog entry content.
+        :param log: :any:`SlackLog` -- in-memory representation that is being parsed.
+        :return: :any:`SlackLogEntry` -- in-memory representation of the ChangeLog entry, without checksum or
+            identifier, or :py:const:`None` if it is older than :py:attr:`min_date`.
+        """
+        timestamp, timezone, twelve_hour, data = self.timed('parse_entry_timestamp', self.parse_entry_timestamp, data)
         if self.min_date and self.min_date > timestamp:
             return None
-        description, data = self.parse_entry_description(data)
-        entry = SlackLogEntry(timestamp, description, log, checksum=checksum, identifier=identifier, parent=parent,
-                                     timezone=timezone, twelveHourFormat=twelve_hour)
-        for pkg_data in self.split_entry_to_pkgs(data):
-            pkg = self.parse_pkg(pkg_data, entry)
+        description, data = self.timed('parse_entry_description', self.parse_entry_description, data)
+        entry = SlackLogEntry(timestamp, description, log, timezone=timezone, twelveHourFormat=twelve_hour)
+        for pkg_data in self.timed('split_entry_to_pkgs', self.split_entry_to_pkgs, data):
+            pkg = self.timed('parse_pkg', self.parse_pkg, pkg_data, entry)
             entry.pkgs.append(pkg)
         return entry
 
+    def hash_entry(self, entry, data, raw, parent):
+        """
+        Set the checksum, identifier, and parent identifier of a parsed entry.
+
+        If :py:attr:`lazy` is :py:const:`True`, they are only computed when they are first used (see
+        :py:meth:`resolve`).  A checksum that is already set is kept.
+
+        :param entry: :any:`SlackLogEntry` -- in-memory representation of the ChangeLog entry.
+        :param data: :py:class:`unicode` -- ChangeLog entry content.
+        :param raw: :py:class:`bytes` -- Undecoded ChangeLog entry content, or :py:const:`None`.
+        :param parent: :any:`SlackLogEntry` -- The entry below this one in the log, or :py:const:`None`.
+        """
+        if self.lazy:
+            entry.pending = [self, data, raw, parent]
+        else:
+            self.compute_hashes(entry, data, raw, parent)
+
+    def compute_hashes(self, entry, data, raw, parent):
+        """
+        Compute the checksum, identifier, and parent identifier of a parsed entry.
+
+        :param entry: :any:`SlackLogEntry` -- in-memory representation of the ChangeLog entry.
+        :param data: :py:class:`unicode` -- ChangeLog entry content.
+        :param raw: :py:class:`bytes` -- Undecoded ChangeLog entry content, or :py:const:`None`.
+        :param parent: :any:`SlackLogEntry` -- The entry below this one in the log, or :py:const:`None`.
+        """
+        # The private fields, because the properties would resolve a pending entry again
+        checksum = entry._checksum
+        if checksum is None:
+            checksum = self.timed('gen_entry_checksum', self.gen_entry_checksum, self.checksum_data(data, raw))
+            entry._checksum = checksum
+        parent_identifier = None
+        if parent is not None:
+            parent_identifier = parent.identifier
+        entry._parent = parent_identifier
+        entry._identifier = self.timed('gen_entry_identifier', self.gen_entry_identifier, data, checksum,
+                                       parent_identifier)
+
+    def resolve(self, entry, checksum_only=False):
+        """
+        Compute the pending checksum and identifier of an entry that was parsed lazily.
+
+        The identifier depends on the identifier of the parent entry, so the parent entries are walked until one
+        with a known identifier is found, and then the identifiers are computed back up.  Each entry on the way
+        gets its identifier, so no entry is hashed twice.
+
+        The entries of a log may be used in many threads, so the computation is done under a lock, and an entry
+        that another thread has resolved meanwhile is left as it is.
+
+        This method is called by :any:`SlackLogEntry`, and is not meant for subclassing.
+
+        :param entry: :any:`SlackLogEntry` -- An entry with :py:attr:`SlackLogEntry.pending` set by this parser.
+        :param checksum_only: :py:class:`bool` -- If :py:const:`True`, compute only the checksum of the entry.
+        """
+        with self.resolving:
+            pending = entry.pending
+            if pending is None:
+                return
+            if checksum_only:
+                parser, data, raw, parent = pending
+                entry._checksum = self.timed('gen_entry_checksum', self.gen_entry_checksum,
+                                             self.checksum_data(data, raw))
+                return
+            chain = []
+            while pending is not None:
+                chain.append((entry, pending))
+                entry = pending[3]
+                pending = entry.pending if entry is not None else None
+            for entry, pending in reversed(chain):
+                parser, data, raw, parent = pending
+                parser.compute_hashes(entry, data, raw, parent)
+                # Only now, so that other threads never see an entry without pending hashes, or identifier
+                entry.pending = None
+
+    def timed(self, phase, method, *args):
+        """
+        Call the method, and record the time spent in it if :py:attr:`stats` is set.
+
+        This method is not meant for subclassing.
+
+        :param phase: :py:class:`str` -- Phase name, see :py:attr:`SlackLogParserStats.PHASES`.
+        :param method: The method to call.
+        :param args: Arguments for the method.
+        :return: The return value of the method.
+        """
+        stats = self.stats
+        if stats is None:
+            return method(*args)
+        start = default_timer()
+        try:
+            return method(*args)
+        finally:
+            stats.record(phase, default_timer() - start)
+
+    def checksum_data(self, data, raw):
+        """
+        Return the data that the entry checksum is computed from.
+
+        :param data: :py:class:`unicode` -- ChangeLog entry content.
+        :param raw: :py:class:`bytes` -- Undecoded ChangeLog entry content, or :py:const:`None`.
+        :return: The entry content for :py:meth:`gen_entry_checksum`.
+        """
+        if raw is not None and self.checksum_version >= 2:
+            return raw
+        return data
+
     def gen_entry_checksum(self, data):
         """
         Generate ChangeLog entry checksum from data.
 
-        :param data: :py:class:`unicode` -- ChangeLog entry content.
+        Version 1 checksums are computed from the UTF-8 encoded entry.  Version 2 checksums are computed from the
+        entry as it is in the ChangeLog file, i.e. encoded with :py:attr:`encoding`.
+
+        :param data: :py:class:`unicode` -- ChangeLog entry content, or :py:class:`bytes` if it was not decoded.
         :return: :py:class:`unicode` -- Entry checksum.
         """
+        if self.checksum_version >= 2:
+            if isinstance(data, str):
+                data = encode(data, self.encoding)
+            return u'%s' % hashlib.sha512(data).hexdigest()
         assert(isinstance(data, str))
         return u'%s' % hashlib.sha512(encode(data, 'utf-8')).hexdigest()
 
@@ -141,11 +590,18 @@ class SlackLogParser (object):
         """
         Generate ChangeLog entry identifier from data, checksum, and/or parent identifier.
 
+        Version 1 identifiers are computed from the UTF-8 encoded hex digests.  Version 2 identifiers are computed
+        from the binary digests.
+
         :param data: :py:class:`unicode` -- ChangeLog entry content.
         :param checksum: :py:class:`unicode` -- ChangeLog entry checksum.
         :param parent: :py:class:`unicode` -- Parent entry identifier or :py:const:`None`
         :return: :py:class:`unicode` -- Entry identifier.
         """
+        if self.checksum_version >= 2:
+            if parent is not None:
+                return u'%s' % hashlib.sha512(unhexlify(parent) + unhexlify(checksum)).hexdigest()
+            return u'%s' % hashlib.sha512(unhexlify(checksum)).hexdigest()
         if parent is not None:
             return u'%s' % hashlib.sha512(encode(parent + checksum, 'utf-8')).hexdigest()
         return u'%s' % hashlib.sha512(encode(checksum, 'utf-8')).hexdigest()
@@ -285,13 +741,17 @@ class SlackLogParser (object):
         if data is None:
             return None
         assert(isinstance(data, str))
-        timestamp = parser.parse(data, tzinfos=tzinfos)
+        timestamp = parse_changelog_timestamp(data)
+        if timestamp is None:
+            from dateutil import parser
+            timestamp = parser.parse(data, tzinfos=tzinfos)
         timezone = timestamp.tzinfo
         if timezone is None:
             # Timestamp was ambiguous, assume UTC
             if not self.quiet:
                 from sys import stderr
                 stderr.write("Warning: Assuming UTC, input was '%s'" % data)
+            from dateutil import tz
             timestamp = timestamp.replace(tzinfo=tz.tzutc())
         elif timestamp.tzinfo.utcoffset(timestamp).total_seconds() != 0:
             # Timestamp was in some local timezone,
@@ -300,5 +760,115 @@ class SlackLogParser (object):
             if not self.quiet and tzname not in tzinfos:
                 from sys import stderr
                 stderr.write("Warning: Converting '%s' to UTC" % tzname)
+            from dateutil import tz
             timestamp = timestamp.astimezone(tz.tzutc())
         return [timestamp, timezone]
+
+
+class SlackLogInterningParser (SlackLogParser):
+    """
+    Parser that shares identical entries between the logs it parses.
+
+    Slackware ChangeLogs repeat themselves: some entries appear unchanged in several ChangeLogs, and the 32-bit and
+    64-bit ChangeLogs of a release describe most updates in the same words.  Entries with the same content have the
+    same checksum, so this parser remembers each entry it parses, keyed by the checksum.  An entry that has been seen
+    before is not parsed again: it is copied from the remembered entry, and shares its timestamp, description, and
+    package strings with it.  The :py:attr:`SlackLogEntry.identifier`, :py:attr:`SlackLogEntry.parent`, and
+    :py:attr:`SlackLogEntry.log` of each entry are its own.
+
+    The entry and package descriptions are interned too, so e.g. every '  Rebuilt.' is the same string.
+
+    Use the same parser for every log that should share entries.  The entries are remembered only as long as a log
+    has them: the remembered entries are weak references, and after each parse the interned descriptions are pruned
+    to those of the remembered entries (see :py:meth:`prune`).  So a long running program that re-parses updated
+    ChangeLogs does not keep the old versions in memory.  The parser can be shared between threads.
+    """
+
+    def __init__(self):
+        SlackLogParser.__init__(self)
+        self.entries = weakref.WeakValueDictionary()
+        """An entry with each checksum, keyed by checksum, for as long as some log has it."""
+        self.strings = {}
+        """Interned descriptions."""
+        self.shared = 0
+        """Counter of entries that were created from remembered content, instead of parsed."""
+        self.lock = threading.Lock()
+        """Guards :py:attr:`entries`, :py:attr:`strings`, and :py:attr:`shared`."""
+        # The checksums are needed anyway, and the logs are meant to be kept in memory, where the unparsed entries
+        # kept by lazy parsing would take as much memory as the parsed ones
+        self.lazy = False
+
+    def clear(self):
+        """
+        Forget the remembered entries and descriptions.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.strings.clear()
+
+    def prune(self, log):
+        """
+        Remember the entries of a parsed log, and forget the descriptions that no remembered entry has.
+
+        Called after each parse.  The entries of the logs that are gone are already forgotten.  The entries of the
+        parsed log replace the remembered ones, since the log it re-parsed may soon be gone.
+
+        :param log: :any:`SlackLog` -- The parsed log.
+        """
+        with self.lock:
+            for entry in log.entries:
+                self.entries[entry.checksum] = entry
+            strings = {}
+            for entry in self.entries.values():
+                strings[entry.description] = entry.description
+                for pkg in entry.pkgs:
+                    strings[pkg.description] = pkg.description
+            self.strings = strings
+
+    def intern(self, s):
+        """
+        Return the interned copy of the string.
+
+        :param s: :py:class:`unicode` -- String.
+        :return: :py:class:`unicode` -- An equal string, the same object for all equal strings.
+        """
+        with self.lock:
+            return self.strings.setdefault(s, s)
+
+    def parse_entries(self, log, entries, previous, spans=None):
+        log = SlackLogParser.parse_entries(self, log, entries, previous, spans)
+        self.prune(log)
+        return log
+
+    def parse_entry(self, data, log, raw=None):
+        assert(isinstance(data, str))
+        assert(isinstance(log, SlackLog))
+        self.ENTRY += 1
+        self.PKG = 0
+        checksum = self.timed('gen_entry_checksum', self.gen_entry_checksum, self.checksum_data(data, raw))
+        with self.lock:
+            seen = self.entries.get(checksum)
+        if seen is None:
+            entry = self.parse_entry_content(data, log)
+            if entry is None:
+                return None
+            entry.checksum = checksum
+            entry.description = self.intern(entry.description)
+            for pkg in entry.pkgs:
+                pkg.description = self.intern(pkg.description)
+            with self.lock:
+                self.entries.setdefault(checksum, entry)
+        else:
+            if self.min_date and self.min_date > seen.timestamp:
+                return None
+            with self.lock:
+                self.shared += 1
+            entry = SlackLogEntry(seen.timestamp, seen.description, log, checksum=seen.checksum,
+                                  timezone=seen.timezone, twelveHourFormat=seen.twelveHourFormat)
+            for pkg in seen.pkgs:
+                entry.pkgs.append(SlackLogPkg(pkg.pkg, pkg.description, entry))
+        parent = None
+        if log.entries:
+            parent = log.entries[0]
+        self.hash_entry(entry, data, raw, parent)
+        return entry
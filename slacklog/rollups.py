@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+SlackLog rollups
+================
+
+SlackLog rollups are per-week and per-month statistics of a ChangeLog, kept in a JSON file next to the ChangeLog,
+e.g. ``slackware64-current.rollup.json`` for ``slackware64-current.txt``.
+
+Each week and month has the number of entries, the number of entries that are security fixes, the number of package
+changes, and the number of package changes of each action (see :py:attr:`SlackLogPkg.action`).
+
+The rollups are updated incrementally: when the ChangeLog has grown, only its new entries are counted.  The file
+remembers the identifier of the newest counted entry; if that entry is no longer in the ChangeLog, e.g. because an
+older entry was edited, the ChangeLog is counted again from scratch.
+"""
+import codecs
+import json
+import os
+
+from slacklog.files import replace_file
+from slacklog.models import PKG_ACTIONS
+
+try:
+    str = unicode
+except NameError:
+    pass  # Forward compatibility with Py3k (unicode is not defined)
+
+
+def rollup_file(changelog):
+    """
+    Return the default rollup file name of a ChangeLog.
+
+    :param changelog: ChangeLog file name.
+    :return: :py:class:`str` -- File name, e.g. 'slackware64-current.rollup.json' for 'slackware64-current.txt'.
+    """
+    return '%s.rollup.json' % os.path.splitext(changelog)[0]
+
+
+def week_of(timestamp):
+    """
+    Return the ISO week of the timestamp.
+
+    :param timestamp: :py:class:`datetime.datetime` -- Timestamp in UTC.
+    :return: :py:class:`unicode` -- Week, e.g. '2019-W05'.
+    """
+    year, week, day = timestamp.isocalendar()
+    return u'%04d-W%02d' % (year, week)
+
+
+def month_of(timestamp):
+    """
+    Return the month of the timestamp.
+
+    :param timestamp: :py:class:`datetime.datetime` -- Timestamp in UTC.
+    :return: :py:class:`unicode` -- Month, e.g. '2019-02'.
+    """
+    return u'%04d-%02d' % (timestamp.year, timestamp.month)
+
+
+class SlackLogRollup (object):
+    """
+    Per-week and per-month statistics of a ChangeLog, stored in a file.
+    """
+
+    version = 1
+    """Version of the file format."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        """File name of the rollup."""
+        self.head = None
+        """Identifier of the newest counted entry, or :py:const:`None`."""
+        self.stamp = [None, None]
+        """Modification time and size of the ChangeLog file when it was counted."""
+        self.weeks = {}
+        """Counts of each week (see :py:func:`week_of`): a :py:class:`dict` of 'entries', 'security', 'pkgs', and
+        each action in :py:data:`slacklog.models.PKG_ACTIONS`."""
+        self.months = {}
+        """Counts of each month (see :py:func:`month_of`), like :py:attr:`weeks`."""
+        if os.path.exists(filename):
+            self.load()
+
+    def load(self):
+        """
+        Read the rollup from the file.  A file of another version is ignored.
+        """
+        with codecs.open(self.filename, 'r', 'utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != self.version:
+            return
+        self.head = data['head']
+        self.stamp = data['stamp']
+        self.weeks = data['weeks']
+        self.months = data['months']
+
+    def save(self):
+        """
+        Write the rollup to the file.
+        """
+        data = json.dumps({'version': self.version, 'head': self.head, 'stamp': self.stamp,
+                           'weeks': self.weeks, 'months': self.months}, indent=4, sort_keys=True)
+        replace_file(self.filename, data.encode('utf-8'))
+
+    def update_changelog(self, changelog, encoding='iso8859-1', parser=None):
+        """
+        Count the new entries of the ChangeLog file, and save the rollup, if the file has changed since it was
+        last counted.
+
+        :param changelog: ChangeLog file name.
+        :param encoding: ChangeLog encoding.
+        :param parser: :any:`SlackLogParser` to parse the ChangeLog with, or :py:const:`None` for the default.
+        :return: :py:class:`int` -- Number of counted entries, or :py:const:`None` if the file has not changed.
+        """
+        st = os.stat(changelog)
+        stamp = [st.st_mtime, st.st_size]
+        if self.head is not None and self.stamp == stamp:
+            return None
+        if parser is None:
+            from slacklog.parsers import SlackLogParser
+            parser = SlackLogParser()
+        f = codecs.open(changelog, 'r', encoding)
+        try:
+            data = f.read()
+        finally:
+            f.close()
+        counted = self.update(parser.parse(data), stamp)
+        self.save()
+        return counted
+
+    def update(self, log, stamp=None):
+        """
+        Count the entries of the log that are newer than the newest counted entry.
+
+        If the newest counted entry is no longer in the log, all entries are counted again.
+
+        :param log: :any:`SlackLog` -- in-memory representation of the ChangeLog.
+        :param stamp: Modification time and size of the ChangeLog, see :py:meth:`update_changelog`.
+        :return: :py:class:`int` -- Number of counted entries.
+        """
+        entries = log.entries
+        head = None
+        if self.head is not None:
+            head = log.find(self.head)
+        if head is not None:
+            entries = entries[:entries.index(head)]
+        else:
+            self.weeks = {}
+            self.months = {}
+        self.add(entries)
+        self.head = log.entries[0].identifier if log.entries else None
+        self.stamp = list(stamp or (None, None))
+        return len(entries)
+
+    def add(self, entries):
+        """
+        Count the entries.
+
+        :param entries: [:any:`SlackLogEntry`] -- The entries.
+        """
+        for entry in entries:
+            for counts in [self.counts(self.weeks, week_of(entry.timestamp)),
+                           self.counts(self.months, month_of(entry.timestamp))]:
+                counts['entries'] += 1
+                if entry.security:
+                    counts['security'] += 1
+                for pkg in entry.pkgs:
+                    counts['pkgs'] += 1
+                    counts[pkg.action] += 1
+
+    def counts(self, periods, period):
+        """
+        Return the counts of the period, adding zero counts if needed.
+
+        :param periods: :py:attr:`weeks` or :py:attr:`months`.
+        :param period: :py:class:`unicode` -- The week or the month.
+        :return: :py:class:`dict` -- The counts.
+        """
+        counts = periods.get(period)
+        if counts is None:
+            counts = dict([(name, 0) for name in (u'entries', u'security', u'pkgs') + PKG_ACTIONS])
+            periods[period] = counts
+        return counts
@@ -8,12 +8,14 @@ SlackLog scripts provides CLI (command line interface) for the SlackLog parsers
 from __future__ import print_function
 
 import codecs
+import fnmatch
 import locale
+import os
+import sys
 from optparse import OptionParser
+from timeit import default_timer
 import slacklog
-from slacklog.parsers import SlackLogParser
-from slacklog.formatters import SlackLogAtomFormatter, SlackLogRssFormatter, SlackLogTxtFormatter, \
-    SlackLogPyblosxomFormatter, SlackLogJsonFormatter
+from slacklog.parsers import SlackLogParser, SlackLogInterningParser, SlackLogParserStats
 
 try:
     str = unicode
@@ -45,6 +47,16 @@ def i(s):
     return None
 
 
+def echo(line):
+    """Prints a unicode line to stdout.
+
+    :param line: Unicode text.
+    """
+    if sys.version_info[0] < 3:
+        line = codecs.encode(line, locale.getpreferredencoding() or 'utf-8', 'replace')
+    print(line)
+
+
 def read(changelog, encoding):
     """Reads the ChangeLog.txt.
 
@@ -68,13 +80,33 @@ def read(changelog, encoding):
     return txt
 
 
-def write(out, data):
-    """Writes the unicode data to a file using UTF-8 encoding.
+def read_bytes(changelog):
+    """Reads the ChangeLog.txt without decoding it.
+
+    Exits on errors.
+
+    :param changelog: File name.
+    :return: Bytes from the file.
+    """
+    try:
+        f = open(changelog, 'rb')
+    except IOError as e:
+        print("%s: %s" % (e.filename, e.strerror))
+        exit(e.errno)
+    try:
+        return f.read()
+    finally:
+        f.close()
+
+
+def write(out, data, encoding='utf-8'):
+    """Writes the unicode data to a file.
     
     :param out: File name.
     :param data: Unicode data.    
+    :param encoding: File encoding, UTF-8 by default.
     """
-    f = codecs.open(out, 'w', 'utf-8')
+    f = codecs.open(out, 'w', encoding)
     try:
         f.write(data)
     except UnicodeEncodeError as e:
@@ -83,6 +115,216 @@ def write(out, data):
     f.close()
 
 
+class Timings (object):
+    """Wall time, and the amount of data processed, in each phase of a command.
+
+    The phases are recorded in order, each as a :py:class:`dict` with the phase name, the time in seconds,
+    and any of the following counts: ``bytes_in`` and ``bytes_out`` for file input and output, ``chars_in``
+    and ``chars_out`` for the unicode text handled in memory, and ``entries`` and ``pkgs`` for the log
+    entries and packages processed.
+    """
+
+    def __init__(self, command, changelog):
+        self.command = command
+        """Name of the command."""
+        self.changelog = changelog
+        """The ChangeLog file name."""
+        self.phases = []
+        """List of recorded phases."""
+
+    def add(self, phase, seconds, **counts):
+        """Records one phase.
+
+        :param phase: Phase name.
+        :param seconds: Wall time spent in the phase.
+        :param counts: Amounts of data processed, see the class documentation.
+        """
+        record = {'phase': phase, 'seconds': seconds}
+        record.update(counts)
+        self.phases.append(record)
+
+    def report(self):
+        """Returns the timings as a human readable table.
+
+        :return: One line per phase, followed by the total.
+        """
+        lines = ['%-8s %10s %12s %12s %8s %8s %16s\n'
+                 % ('phase', 'time ms', 'in', 'out', 'entries', 'pkgs', 'throughput')]
+        total = 0.0
+        for record in self.phases:
+            seconds = record['seconds']
+            total += seconds
+            size_in = record.get('bytes_in', record.get('chars_in'))
+            size_out = record.get('bytes_out', record.get('chars_out'))
+            if 'entries' in record:
+                throughput = '%.0f entries/s' % (record['entries'] / seconds) if seconds else '-'
+            else:
+                size = size_in if size_in is not None else size_out
+                throughput = '%.1f MB/s' % (size / seconds / 1000000) if seconds and size is not None else '-'
+            lines.append('%-8s %10.1f %12s %12s %8s %8s %16s\n'
+                         % (record['phase'],
+                            seconds * 1000,
+                            '-' if size_in is None else size_in,
+                            '-' if size_out is None else size_out,
+                            record.get('entries', '-'),
+                            record.get('pkgs', '-'),
+                            throughput))
+        lines.append('%-8s %10.1f\n' % ('total', total * 1000))
+        return ''.join(lines)
+
+    def json(self):
+        """Returns the timings as a single line of JSON.
+
+        :return: JSON object with the command, the ChangeLog, the phases, and the total time.
+        """
+        import json
+        return json.dumps({'command': self.command,
+                           'changelog': self.changelog,
+                           'phases': self.phases,
+                           'seconds': sum([record['seconds'] for record in self.phases])},
+                          sort_keys=True)
+
+
+def common_options(options):
+    """Adds the options that are common to all conversion commands.
+
+    :param options: Options of the command.
+    :return: The same options.
+    """
+    options.update({
+        'quiet': {'help': 'Do not print warnings',
+                  'action': 'store_true'},
+        'stats': {'help': 'Print parser statistics to stderr',
+                  'action': 'store_true'},
+        'timings': {'help': 'Print time and throughput of each phase to stderr',
+                    'action': 'store_true'},
+        'timings-json': {'help': 'Print time and throughput of each phase to stderr as a line of JSON',
+                         'action': 'store_true'},
+        'checksum-version': {'help': 'Version of the entry checksums and identifiers: 1, or 2 for checksums of the '
+                                     'undecoded ChangeLog [default: %default]',
+                             'metavar': 'VERSION', 'choices': ['1', '2'], 'default': '1'},
+    })
+    return options
+
+
+def merge_options(options):
+    """Adds the options of the conversion commands that can merge ChangeLogs.
+
+    :param options: Options of the command.
+    :return: The same options.
+    """
+    options.update({
+        'merge': {'help': 'Merge the entries of FILE, labelled as release NAME, e.g. '
+                          'slackware64-14.2=ChangeLog.txt, newest first (can be repeated)',
+                  'metavar': 'NAME=FILE', 'action': 'append'},
+        'release': {'help': 'Label the entries of the ChangeLog as release NAME when merging '
+                            '[default: the file name without the extension]',
+                    'metavar': 'NAME'},
+        'security': {'help': 'Include only the entries that are security fixes',
+                     'action': 'store_true'},
+    })
+    return options
+
+
+def load(changelog, opts, parser, timings):
+    """Reads the ChangeLog and parses it.
+
+    :param changelog: ChangeLog file name.
+    :param opts: Command line options.
+    :param parser: The parser.
+    :param timings: The :any:`Timings` to record the phases in.
+    :return: The log.
+    """
+    if parser.checksum_version >= 2:
+        #
+        #   Decode the entries while parsing them, and compute the checksums from the undecoded entries
+        #
+        start = default_timer()
+        raw = read_bytes(changelog)
+        timings.add('read', default_timer() - start, bytes_in=len(raw), bytes_out=len(raw))
+
+        start = default_timer()
+        try:
+            log = parser.parse_bytes(raw, opts.encoding)
+        except UnicodeDecodeError as e:
+            print("%s: %s: %s" % (changelog, e.encoding, e.reason))
+            exit(-1)
+        timings.add('parse', default_timer() - start, bytes_in=len(raw), entries=len(log.entries),
+                    pkgs=sum([len(entry.pkgs) for entry in log.entries]))
+    else:
+        start = default_timer()
+        txt = read(changelog, opts.encoding)
+        timings.add('read', default_timer() - start, bytes_in=os.path.getsize(changelog), chars_out=len(txt))
+
+        start = default_timer()
+        log = parser.parse(txt)
+        timings.add('parse', default_timer() - start, chars_in=len(txt), entries=len(log.entries),
+                    pkgs=sum([len(entry.pkgs) for entry in log.entries]))
+    return log
+
+
+def convert(command, opts, parser, formatter, out=None, out_encoding='utf-8', format=None):
+    """Reads the ChangeLog, parses it, formats it, and writes the result.
+
+    If the command has the options of :py:func:`merge_options`, and they are given, the ChangeLogs are merged
+    before formatting.  If the formatter is an archived Atom formatter, its new archive pages are written next to
+    the output first (see :py:func:`slacklog.builder.write_archive`).  Prints the parser statistics and the timings,
+    if requested.
+
+    :param command: Name of the command.
+    :param opts: Command line options.
+    :param parser: The parser.
+    :param formatter: The formatter.
+    :param out: Output file name or :py:const:`None` if the formatter writes the output itself.
+    :param out_encoding: Output file encoding.
+    :param format: Function that formats the log, or :py:const:`None` for :py:meth:`formatter.format`.
+    """
+    timings = Timings(command, opts.changelog)
+
+    log = load(opts.changelog, opts, parser, timings)
+
+    if getattr(opts, 'merge', None) or getattr(opts, 'security', False):
+        #
+        #   Merge the newest entries of every ChangeLog, labelled with their release
+        #
+        from slacklog.merge import merge
+        log.release = u(opts.release) or named_changelogs([opts.changelog])[0][0]
+        logs = [log]
+        for name, changelog in named_changelogs(opts.merge or []):
+            other = load(changelog, opts, parser, timings)
+            other.release = name
+            logs.append(other)
+
+        start = default_timer()
+        log = merge(logs, formatter.max_entries, (lambda entry: entry.security) if opts.security else None)
+        timings.add('merge', default_timer() - start, entries=len(log.entries),
+                    pkgs=sum([len(entry.pkgs) for entry in log.entries]))
+
+    start = default_timer()
+    data = (format or formatter.format)(log)
+    entries = log.entries[:formatter.max_entries] if formatter.max_entries else log.entries
+    pkgs = [len(entry.pkgs[:formatter.max_pkgs] if formatter.max_pkgs else entry.pkgs) for entry in entries]
+    timings.add('format', default_timer() - start, chars_out=len(data), entries=len(entries), pkgs=sum(pkgs))
+
+    if getattr(formatter, 'archiveSize', None):
+        from slacklog.builder import write_archive
+        start = default_timer()
+        pages = write_archive(formatter, log, out)
+        timings.add('archive', default_timer() - start, bytes_out=sum([os.path.getsize(page) for page in pages]))
+
+    if out is not None:
+        start = default_timer()
+        write(out, data, out_encoding)
+        timings.add('write', default_timer() - start, chars_in=len(data), bytes_out=os.path.getsize(out))
+
+    if parser.stats is not None:
+        sys.stderr.write(parser.stats.report())
+    if opts.timings:
+        sys.stderr.write(timings.report())
+    if opts.timings_json:
+        sys.stderr.write(timings.json() + '\n')
+
+
 def main(**kwargs):
     kwargs['usage'] = ''
     kwargs['version'] = '%%prog %s' % slacklog.__version__
@@ -91,6 +333,7 @@ def main(**kwargs):
 
     options = kwargs['options']
     del kwargs['options']
+    arguments = kwargs.pop('arguments', '')
 
     mandatory = []
 
@@ -100,7 +343,7 @@ def main(**kwargs):
                 kwargs['usage'] = '%s --%s %s' % (kwargs['usage'], option, options[option]['metavar'])
                 mandatory.append(option)
             del options[option]['mandatory']
-    kwargs['usage'] = 'USAGE: %%prog [options]%s' % kwargs['usage']
+    kwargs['usage'] = 'USAGE: %%prog [options]%s%s' % (kwargs['usage'], arguments)
 
     optionParser = OptionParser(**kwargs)
 
@@ -126,7 +369,7 @@ def slacklog2atom():
     #
     (opts, args) = main(
         description='Convert Slackware ChangeLog to Atom',
-        options={
+        options=merge_options(common_options({
             'changelog': {'help': 'Read input from FILE',
                           'metavar': 'FILE', 'mandatory': True},
             'encoding': {'help': 'ChangeLog encoding [default: %default]',
@@ -135,8 +378,6 @@ def slacklog2atom():
                          'metavar': 'DATE'},
             'out': {'help': 'Write output to FILE',
                     'metavar': 'FILE', 'mandatory': True},
-            'quiet': {'help': 'Do not print warnings',
-                      'action': 'store_true'},
             'max-entries': {'help': 'Max number of Atom entries [default: infinity]',
                             'metavar': 'NUM'},
             'slackware': {'help': 'Slackware version [default: %default].',
@@ -150,16 +391,24 @@ def slacklog2atom():
             'email': {'help': 'EMAIL of the feed author',
                       'metavar': 'EMAIL'},
             'updated': {'help': 'Timestamp when this feed was last generated.',
-                        'metavar': 'DATE'}
-        })
+                        'metavar': 'DATE'},
+            'archive-size': {'help': 'Write the older entries to archive pages of NUM entries next to the output '
+                                     '(RFC 5005) [default: do not archive]',
+                             'metavar': 'NUM'}
+        })))
 
     #
     #   Apply options to parser and formatter
     #
     parser = SlackLogParser()
     parser.quiet = opts.quiet
+    if opts.stats:
+        parser.stats = SlackLogParserStats()
     parser.min_date = parser.parse_date(u(opts.min_date))
+    parser.checksum_version = i(opts.checksum_version)
+    parser.encoding = opts.encoding
 
+    from slacklog.formatters import SlackLogAtomFormatter
     formatter = SlackLogAtomFormatter()
     formatter.max_entries = i(opts.max_entries)
     formatter.slackware = u(opts.slackware)
@@ -168,21 +417,12 @@ def slacklog2atom():
     formatter.name = u(opts.name)
     formatter.email = u(opts.email)
     formatter.updated = parser.parse_date(u(opts.updated))
+    formatter.archiveSize = i(opts.archive_size)
 
     #
-    #   Read input
+    #   Read, parse, format, and write
     #
-    txt = read(opts.changelog, opts.encoding)
-
-    #
-    #   Format output
-    #
-    atom = formatter.format(parser.parse(txt))
-
-    #
-    #   Write output
-    #
-    write(opts.out, atom)
+    convert('slacklog2atom', opts, parser, formatter, opts.out)
 
 
 def slacklog2pyblosxom():
@@ -191,7 +431,7 @@ def slacklog2pyblosxom():
     #
     (opts, args) = main(
         description='Convert Slackware ChangeLog to PyBlosxom blog entries',
-        options={
+        options=common_options({
             'changelog': {'help': 'Read input from FILE',
                           'metavar': 'FILE', 'mandatory': True},
             'encoding': {'help': 'ChangeLog encoding [default: %default]',
@@ -200,8 +440,6 @@ def slacklog2pyblosxom():
                          'metavar': 'DATE'},
             'datadir': {'help': 'PyBlosxom blog datadir',
                         'metavar': 'DATADIR', 'mandatory': True},
-            'quiet': {'help': 'Do not print warnings',
-                      'action': 'store_true'},
             'max-entries': {'help': 'Max number of blog entries [default: infinity]',
                             'metavar': 'NUM'},
             'slackware': {'help': 'Slackware version [default: %default].',
@@ -219,16 +457,21 @@ def slacklog2pyblosxom():
             'overwrite': {'help': 'Overwrite entries that exist',
                           'action': 'store_true'},
             'no-backup': {'help': 'Make a backup before overwriting',
-                          'action': 'store_true'},
-        })
+                          'action': 'store_true'}
+        }))
 
     #
     #   Apply options to parser and formatter
     #
     parser = SlackLogParser()
     parser.quiet = opts.quiet
+    if opts.stats:
+        parser.stats = SlackLogParserStats()
     parser.min_date = parser.parse_date(u(opts.min_date))
+    parser.checksum_version = i(opts.checksum_version)
+    parser.encoding = opts.encoding
 
+    from slacklog.formatters import SlackLogPyblosxomFormatter
     formatter = SlackLogPyblosxomFormatter()
     formatter.max_entries = i(opts.max_entries)
     formatter.quiet = opts.quiet
@@ -243,14 +486,9 @@ def slacklog2pyblosxom():
     formatter.pyfilemtime = opts.pyfilemtime
 
     #
-    #   Read input
+    #   Read, parse, and format (output goes to files, no need to write the result)
     #
-    txt = read(opts.changelog, opts.encoding)
-
-    #
-    #   Format output (output goes to files, no need to capture the result)
-    #
-    formatter.format(parser.parse(txt))
+    convert('slacklog2pyblosxom', opts, parser, formatter)
 
 
 def slacklog2rss():
@@ -259,7 +497,7 @@ def slacklog2rss():
     #
     (opts, args) = main(
         description='Convert Slackware ChangeLog to RSS',
-        options={
+        options=merge_options(common_options({
             'changelog': {'help': 'Read input from FILE',
                           'metavar': 'FILE', 'mandatory': True},
             'encoding': {'help': 'ChangeLog encoding [default: %default]',
@@ -268,8 +506,6 @@ def slacklog2rss():
                          'metavar': 'DATE'},
             'out': {'help': 'Write output to FILE',
                     'metavar': 'FILE', 'mandatory': True},
-            'quiet': {'help': 'Do not print warnings',
-                      'action': 'store_true'},
             'max-entries': {'help': 'Max number of RSS entries [default: infinity]',
                             'metavar': 'NUM'},
             'slackware': {'help': 'Slackware version [default: %default].',
@@ -288,15 +524,20 @@ def slacklog2rss():
                           'metavar': 'EMAIL (NAME)'},
             'lastBuildDate': {'help': 'Timestamp when this feed was last generated.',
                               'metavar': 'DATE'}
-        })
+        })))
 
     #
     #   Apply options to parser and formatter
     #
     parser = SlackLogParser()
     parser.quiet = opts.quiet
+    if opts.stats:
+        parser.stats = SlackLogParserStats()
     parser.min_date = parser.parse_date(u(opts.min_date))
+    parser.checksum_version = i(opts.checksum_version)
+    parser.encoding = opts.encoding
 
+    from slacklog.formatters import SlackLogRssFormatter
     formatter = SlackLogRssFormatter()
     formatter.max_entries = i(opts.max_entries)
     formatter.slackware = u(opts.slackware)
@@ -309,103 +550,572 @@ def slacklog2rss():
     formatter.lastBuildDate = parser.parse_date(u(opts.lastBuildDate))
 
     #
-    #   Read input
+    #   Read, parse, format, and write
     #
-    txt = read(opts.changelog, opts.encoding)
+    convert('slacklog2rss', opts, parser, formatter, opts.out)
+
+
+def slacklog2txt():
+    #
+    #   Define and handle command line options
+    #
+    (opts, args) = main(
+        description='Convert Slackware ChangeLog to RSS',
+        options=merge_options(common_options({
+            'changelog': {'help': 'Read input from FILE',
+                          'metavar': 'FILE', 'mandatory': True},
+            'encoding': {'help': 'ChangeLog encoding [default: %default]',
+                         'default': 'iso8859-1'},
+            'out': {'help': 'Write output to FILE',
+                    'metavar': 'FILE', 'mandatory': True},
+        })))
 
     #
-    #   Format output
+    #   Apply options to parser and formatter
     #
-    rss = formatter.format(parser.parse(txt))
+    parser = SlackLogParser()
+    parser.quiet = opts.quiet
+    if opts.stats:
+        parser.stats = SlackLogParserStats()
+    parser.checksum_version = i(opts.checksum_version)
+    parser.encoding = opts.encoding
+
+    parser.keep_spans = True
+
+    from slacklog.formatters import SlackLogTxtFormatter
+    formatter = SlackLogTxtFormatter()
 
     #
-    #   Write output
+    #   Read, parse, format, and write (in the original encoding)
     #
-    write(opts.out, rss)
+    convert('slacklog2txt', opts, parser, formatter, opts.out, opts.encoding)
 
 
-def slacklog2txt():
+def slacklog2json():
     #
     #   Define and handle command line options
     #
     (opts, args) = main(
-        description='Convert Slackware ChangeLog to RSS',
-        options={
+        description='Convert Slackware ChangeLog to JSON',
+        options=merge_options(common_options({
             'changelog': {'help': 'Read input from FILE',
                           'metavar': 'FILE', 'mandatory': True},
             'encoding': {'help': 'ChangeLog encoding [default: %default]',
                          'default': 'iso8859-1'},
             'out': {'help': 'Write output to FILE',
                     'metavar': 'FILE', 'mandatory': True},
-            'quiet': {'help': 'Do not print warnings',
-                      'action': 'store_true'}
-        })
+            'indent': {'help': 'Number of spaces to use for indent',
+                       'metavar': 'NUM'}
+        })))
 
     #
     #   Apply options to parser and formatter
     #
     parser = SlackLogParser()
     parser.quiet = opts.quiet
+    if opts.stats:
+        parser.stats = SlackLogParserStats()
+    parser.checksum_version = i(opts.checksum_version)
+    parser.encoding = opts.encoding
 
-    formatter = SlackLogTxtFormatter()
+    from slacklog.formatters import SlackLogJsonFormatter
+    formatter = SlackLogJsonFormatter()
+    formatter.indent = i(opts.indent)
 
     #
-    #   Read input
+    #   Read, parse, format, and write
     #
-    orig = read(opts.changelog, opts.encoding)
+    convert('slacklog2json', opts, parser, formatter, opts.out)
+
 
+def slacklog2sqlite():
     #
-    #   Format output
+    #   Define and handle command line options
     #
-    text = formatter.format(parser.parse(orig))
+    (opts, args) = main(
+        description='Store Slackware ChangeLog in an SQLite database',
+        options=common_options({
+            'changelog': {'help': 'Read input from FILE',
+                          'metavar': 'FILE', 'mandatory': True},
+            'encoding': {'help': 'ChangeLog encoding [default: %default]',
+                         'default': 'iso8859-1'},
+            'min-date': {'help': 'Last date to store [default: store all]',
+                         'metavar': 'DATE'},
+            'max-entries': {'help': 'Max number of entries to store [default: infinity]',
+                            'metavar': 'NUM'},
+            'database': {'help': 'Store the log in database FILE, created if it does not exist',
+                         'metavar': 'FILE', 'mandatory': True},
+            'slackware': {'help': 'Name of the log in the database [default: ChangeLog file name without the '
+                                  'extension]',
+                          'metavar': 'NAME'}
+        }))
 
     #
-    #   Write output
+    #   Apply options to parser and formatter
     #
-    f = codecs.open(opts.out, 'w', opts.encoding)
-    f.write(text)
-    f.close()
+    parser = SlackLogParser()
+    parser.quiet = opts.quiet
+    if opts.stats:
+        parser.stats = SlackLogParserStats()
+    parser.min_date = parser.parse_date(u(opts.min_date))
+    parser.checksum_version = i(opts.checksum_version)
+    parser.encoding = opts.encoding
 
+    from slacklog.formatters import SlackLogSqliteFormatter
+    formatter = SlackLogSqliteFormatter()
+    formatter.max_entries = i(opts.max_entries)
+    formatter.database = opts.database
+    formatter.slackware = u(opts.slackware) or named_changelogs([opts.changelog])[0][0]
 
-def slacklog2json():
+    #
+    #   Read, parse, and store
+    #
+    counts = []
+
+    def store(log):
+        counts.extend(formatter.store(log))
+        return u''
+
+    convert('slacklog2sqlite', opts, parser, formatter, format=store)
+    if not opts.quiet:
+        print('%s: %d entries inserted, %d deleted' % (opts.database, counts[0], counts[1]))
+
+
+def named_changelogs(specs):
+    """Parses NAME=FILE command line option arguments.
+
+    If the name is left out, the file name without the extension is used as the name.
+
+    :param specs: List of option arguments.
+    :return: List of (name, file name) pairs.
+    """
+    changelogs = []
+    for spec in specs:
+        if '=' in spec:
+            name, changelog = spec.split('=', 1)
+        else:
+            changelog = spec
+            name = os.path.splitext(os.path.basename(spec))[0]
+        changelogs.append((u(name), changelog))
+    return changelogs
+
+
+def slacklog_serve():
     #
     #   Define and handle command line options
     #
     (opts, args) = main(
-        description='Convert Slackware ChangeLog to JSON',
+        description='Serve Slackware ChangeLogs as RSS, Atom, JSON, and text over HTTP',
         options={
-            'changelog': {'help': 'Read input from FILE',
-                          'metavar': 'FILE', 'mandatory': True},
+            'changelog': {'help': 'Serve FILE as NAME, e.g. slackware64-current=ChangeLog.txt (can be repeated)',
+                          'metavar': 'NAME=FILE', 'mandatory': True, 'action': 'append'},
             'encoding': {'help': 'ChangeLog encoding [default: %default]',
                          'default': 'iso8859-1'},
-            'out': {'help': 'Write output to FILE',
-                    'metavar': 'FILE', 'mandatory': True},
-            'indent': {'help': 'Number of spaces to use for indent',
-                       'metavar': 'NUM'},
-            'quiet': {'help': 'Do not print warnings',
+            'min-date': {'help': 'Last date to include [default: include all]',
+                         'metavar': 'DATE'},
+            'max-entries': {'help': 'Max number of entries to serve [default: infinity]',
+                            'metavar': 'NUM'},
+            'host': {'help': 'Listen on HOST [default: %default]',
+                     'default': 'localhost'},
+            'port': {'help': 'Listen on PORT [default: %default]',
+                     'default': '8080'},
+            'base-url': {'help': 'Full URL of the server, used in feed links [default: http://HOST:PORT]',
+                         'metavar': 'URL'},
+            'interval': {'help': 'Check the ChangeLogs for changes every SECONDS [default: %default]',
+                         'metavar': 'SECONDS', 'default': '5'},
+            'cache-size': {'help': 'Max number of rendered feeds to keep in memory [default: %default]',
+                           'metavar': 'NUM', 'default': '64'},
+            'quiet': {'help': 'Do not print warnings or requests',
                       'action': 'store_true'}
         })
 
+    from slacklog.server import SlackLogFeed, SlackLogServer
+
     #
-    #   Apply options to parser and formatter
+    #   Apply options to parser and feeds
     #
-    parser = SlackLogParser()
+    parser = SlackLogInterningParser()
     parser.quiet = opts.quiet
+    parser.min_date = parser.parse_date(u(opts.min_date))
 
-    formatter = SlackLogJsonFormatter()
-    formatter.indent = i(opts.indent)
+    feeds = [SlackLogFeed(name, changelog, opts.encoding, parser)
+             for name, changelog in named_changelogs(opts.changelog)]
+
+    server = SlackLogServer((opts.host, i(opts.port)), feeds,
+                            base_url=u(opts.base_url),
+                            max_entries=i(opts.max_entries),
+                            interval=float(opts.interval),
+                            quiet=opts.quiet,
+                            cache_size=i(opts.cache_size))
+
+    #
+    #   Parse the ChangeLogs, and serve until interrupted
+    #
+    server.refresh()
+    server.start_polling()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def slacklog_watch():
+    #
+    #   Define and handle command line options
+    #
+    (opts, args) = main(
+        description='Watch a directory of Slackware ChangeLogs, and rebuild the feeds of those that change',
+        options={
+            'dir': {'help': 'Watch ChangeLogs in DIR',
+                    'metavar': 'DIR', 'mandatory': True},
+            'out': {'help': 'Write the feeds to DIR',
+                    'metavar': 'DIR', 'mandatory': True},
+            'pattern': {'help': 'Watch the files matching PATTERN [default: %default]',
+                        'default': '*.txt'},
+            'format': {'help': 'Write FORMAT: rss, atom, json, or txt (can be repeated) [default: rss, atom, json]',
+                       'action': 'append', 'choices': ['rss', 'atom', 'json', 'txt']},
+            'base-url': {'help': 'URL of the output directory, used in feed links [default: file URL of DIR]',
+                         'metavar': 'URL'},
+            'encoding': {'help': 'ChangeLog encoding [default: %default]',
+                         'default': 'iso8859-1'},
+            'min-date': {'help': 'Last date to include [default: include all]',
+                         'metavar': 'DATE'},
+            'max-entries': {'help': 'Max number of entries to write [default: infinity]',
+                            'metavar': 'NUM'},
+            'archive-size': {'help': 'Write the older Atom entries to archive pages of NUM entries (RFC 5005) '
+                                     '[default: do not archive]',
+                             'metavar': 'NUM'},
+            'debounce': {'help': 'Rebuild once the directory has been quiet for SECONDS [default: %default]',
+                         'metavar': 'SECONDS', 'default': '1'},
+            'interval': {'help': 'Without inotify, check the directory every SECONDS [default: %default]',
+                         'metavar': 'SECONDS', 'default': '1'},
+            'polling': {'help': 'Do not use inotify, check the directory every --interval instead',
+                        'action': 'store_true'},
+            'once': {'help': 'Build the changed feeds once, and exit',
+                     'action': 'store_true'},
+            'quiet': {'help': 'Do not print warnings or rebuilt files',
+                      'action': 'store_true'}
+        })
+
+    from slacklog.builder import SlackLogBuilder
+    from slacklog.watch import SlackLogWatcher
+
+    #
+    #   Apply options to parser and builder
+    #
+    parser = SlackLogInterningParser()
+    parser.quiet = opts.quiet
+    parser.min_date = parser.parse_date(u(opts.min_date))
+
+    builder = SlackLogBuilder(opts.out,
+                              formats=opts.format or ['rss', 'atom', 'json'],
+                              base_url=u(opts.base_url),
+                              encoding=opts.encoding,
+                              parser=parser,
+                              max_entries=i(opts.max_entries),
+                              archive_size=i(opts.archive_size))
+
+    def build(changelogs, startup=False):
+        for changelog in changelogs:
+            try:
+                written = builder.build(changelog, startup=startup)
+            except (IOError, OSError, ValueError) as e:
+                if not opts.quiet:
+                    sys.stderr.write('%s: %s\n' % (changelog, e))
+                continue
+            if not opts.quiet:
+                for out in written:
+                    print('Wrote %s' % out)
 
     #
-    #   Read input
+    #   Build everything that is out of date, then rebuild as the ChangeLogs change
+    #
+    watcher = None if opts.once else SlackLogWatcher(opts.dir, opts.pattern, float(opts.debounce),
+                                                     float(opts.interval), opts.polling)
+    build([os.path.join(opts.dir, name) for name in sorted(fnmatch.filter(os.listdir(opts.dir), opts.pattern))],
+          startup=True)
+    if watcher is None:
+        return
+    try:
+        while True:
+            build(watcher.wait())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def slacklog_fetch():
     #
-    orig = read(opts.changelog, opts.encoding)
+    #   Define and handle command line options
+    #
+    (opts, args) = main(
+        description='Download Slackware ChangeLogs concurrently, and build the feeds of those that changed',
+        options={
+            'dir': {'help': 'Download the ChangeLogs to DIR',
+                    'metavar': 'DIR', 'mandatory': True},
+            'mirror': {'help': 'Download from the Slackware mirror at URL [default: %default]',
+                       'metavar': 'URL', 'default': 'http://ftp.osuosl.org/pub/slackware'},
+            'release': {'help': 'Download the ChangeLog of RELEASE, e.g. slackware64-current (can be repeated) '
+                                '[default: all releases]',
+                        'action': 'append'},
+            'timeout': {'help': 'Give up a download after SECONDS [default: %default]',
+                        'metavar': 'SECONDS', 'default': '60'},
+            'out': {'help': 'Write the feeds of the changed ChangeLogs to DIR [default: do not write feeds]',
+                    'metavar': 'DIR'},
+            'format': {'help': 'Write FORMAT: rss, atom, json, or txt (can be repeated) [default: rss, atom, json]',
+                       'action': 'append', 'choices': ['rss', 'atom', 'json', 'txt']},
+            'base-url': {'help': 'URL of the output directory, used in feed links [default: file URL of DIR]',
+                         'metavar': 'URL'},
+            'encoding': {'help': 'ChangeLog encoding [default: %default]',
+                         'default': 'iso8859-1'},
+            'min-date': {'help': 'Last date to include [default: include all]',
+                         'metavar': 'DATE'},
+            'max-entries': {'help': 'Max number of entries to write [default: infinity]',
+                            'metavar': 'NUM'},
+            'archive-size': {'help': 'Write the older Atom entries to archive pages of NUM entries (RFC 5005) '
+                                     '[default: do not archive]',
+                             'metavar': 'NUM'},
+            'quiet': {'help': 'Do not print warnings or progress',
+                      'action': 'store_true'}
+        })
+
+    from slacklog.fetch import SlackLogFetcher, RELEASES
+
+    fetcher = SlackLogFetcher(opts.dir, opts.mirror, timeout=float(opts.timeout))
 
     #
-    #   Format output
+    #   Build the feeds of each changed ChangeLog as soon as it is downloaded
     #
-    json = formatter.format(parser.parse(orig))
+    callback = None
+    if opts.out:
+        from slacklog.builder import SlackLogBuilder
+
+        parser = SlackLogInterningParser()
+        parser.quiet = opts.quiet
+        parser.min_date = parser.parse_date(u(opts.min_date))
+
+        builder = SlackLogBuilder(opts.out,
+                                  formats=opts.format or ['rss', 'atom', 'json'],
+                                  base_url=u(opts.base_url),
+                                  encoding=opts.encoding,
+                                  parser=parser,
+                                  max_entries=i(opts.max_entries),
+                                  archive_size=i(opts.archive_size))
+
+        def callback(name, changelog):
+            builder.build(changelog, force=True)
+
+    results = fetcher.fetch_all(opts.release or RELEASES, callback)
 
+    failed = False
+    for name in opts.release or RELEASES:
+        result = results[name]
+        if result is None and opts.out and os.path.exists(fetcher.path(name)):
+            #
+            #   Unchanged, but the feeds may be missing or older than the ChangeLog
+            #
+            try:
+                builder.build(fetcher.path(name), startup=True)
+            except (IOError, OSError, ValueError) as e:
+                result = e
+        if isinstance(result, Exception):
+            failed = True
+            sys.stderr.write('%s: %s\n' % (fetcher.url(name), result))
+        elif not opts.quiet:
+            print('%s: %s' % (name, 'OK' if result else 'UP-TO-DATE'))
+    if failed:
+        sys.exit(1)
+
+
+def slacklog_pkg_history():
     #
-    #   Write output
+    #   Define and handle command line options
     #
-    write(opts.out, json)
+    (opts, args) = main(
+        description='Show when packages were changed in Slackware ChangeLogs',
+        arguments=' PKG...',
+        options={
+            'index': {'help': 'Package index FILE, created if it does not exist',
+                      'metavar': 'FILE', 'mandatory': True},
+            'changelog': {'help': 'Index FILE as release NAME first, e.g. slackware64-current=ChangeLog.txt, '
+                                  'if it has changed (can be repeated)',
+                          'metavar': 'NAME=FILE', 'action': 'append'},
+            'encoding': {'help': 'ChangeLog encoding [default: %default]',
+                         'default': 'iso8859-1'},
+            'release': {'help': 'Show only the changes in RELEASE (can be repeated) [default: all releases]',
+                        'action': 'append'},
+            'max-changes': {'help': 'Max number of changes to show per package [default: infinity]',
+                            'metavar': 'NUM'},
+            'quiet': {'help': 'Do not print warnings',
+                      'action': 'store_true'}
+        })
+
+    from slacklog.indexes import SlackLogPkgIndex
+
+    index = SlackLogPkgIndex(opts.index)
+    try:
+        #
+        #   Update the index, then query it
+        #
+        if opts.changelog:
+            parser = SlackLogInterningParser()
+            parser.quiet = opts.quiet
+            for name, changelog in named_changelogs(opts.changelog):
+                index.update_changelog(name, changelog, opts.encoding, parser)
+
+        releases = [u(release) for release in opts.release] if opts.release else None
+        max_changes = i(opts.max_changes)
+        for name in args:
+            changes = index.history(u(name), releases)
+            if max_changes is not None:
+                changes = changes[:max_changes]
+            for change in changes:
+                description = change.description.strip().split(u'\n', 1)[0]
+                echo(u'%s  %s  %s:  %s' % (change.timestamp.strftime('%Y-%m-%d %H:%M:%S UTC'), change.release,
+                                          change.pkg.strip(), description))
+    finally:
+        index.close()
+
+
+def slacklog_search():
+    #
+    #   Define and handle command line options
+    #
+    (opts, args) = main(
+        description='Search the descriptions in Slackware ChangeLogs',
+        arguments=' WORD...',
+        options={
+            'index': {'help': 'Search index FILE, created if it does not exist',
+                      'metavar': 'FILE', 'mandatory': True},
+            'changelog': {'help': 'Index FILE as release NAME first, e.g. slackware64-current=ChangeLog.txt, '
+                                  'if it has changed (can be repeated)',
+                          'metavar': 'NAME=FILE', 'action': 'append'},
+            'encoding': {'help': 'ChangeLog encoding [default: %default]',
+                         'default': 'iso8859-1'},
+            'release': {'help': 'Search only in RELEASE (can be repeated) [default: all releases]',
+                        'action': 'append'},
+            'max-results': {'help': 'Max number of results to show [default: infinity]',
+                            'metavar': 'NUM'},
+            'quiet': {'help': 'Do not print warnings',
+                      'action': 'store_true'}
+        })
+
+    from slacklog.indexes import SlackLogSearchIndex
+
+    index = SlackLogSearchIndex(opts.index)
+    try:
+        #
+        #   Update the index, then query it
+        #
+        if opts.changelog:
+            parser = SlackLogInterningParser()
+            parser.quiet = opts.quiet
+            for name, changelog in named_changelogs(opts.changelog):
+                index.update_changelog(name, changelog, opts.encoding, parser)
+
+        releases = [u(release) for release in opts.release] if opts.release else None
+        hits = index.search(u(' '.join(args)) or u'', releases, i(opts.max_results))
+        for hit in hits:
+            description = hit.description.strip().split(u'\n', 1)[0]
+            if hit.pkg is not None:
+                description = u'%s:  %s' % (hit.pkg.strip(), description)
+            echo(u'%s  %s  %s' % (hit.timestamp.strftime('%Y-%m-%d %H:%M:%S UTC'), hit.release, description))
+    finally:
+        index.close()
+
+
+def slacklog_diff():
+    #
+    #   Define and handle command line options
+    #
+    (opts, args) = main(
+        description='Show what changed between two versions of a Slackware ChangeLog',
+        options={
+            'old': {'help': 'Read the old version from FILE',
+                    'metavar': 'FILE', 'mandatory': True},
+            'new': {'help': 'Read the new version from FILE',
+                    'metavar': 'FILE', 'mandatory': True},
+            'encoding': {'help': 'ChangeLog encoding [default: %default]',
+                         'default': 'iso8859-1'},
+            'quiet': {'help': 'Do not print warnings or changes, only set the exit status',
+                      'action': 'store_true'}
+        })
+
+    from slacklog.diff import diff
+
+    #
+    #   Parse both versions, the entries they have in common only once
+    #
+    parser = SlackLogInterningParser()
+    parser.quiet = opts.quiet
+    old = parser.parse(read(opts.old, opts.encoding))
+    new = parser.parse(read(opts.new, opts.encoding))
+
+    changes = diff(old, new)
+    if not opts.quiet:
+        def first_line(text):
+            return text.strip().split(u'\n', 1)[0]
+
+        def show(mark, entry, pkgs):
+            echo(u'%s %s' % (mark, entry.timestamp.strftime('%Y-%m-%d %H:%M:%S UTC')))
+            if mark != u'~' and entry.description.strip():
+                echo(u'    %s' % first_line(entry.description))
+            for pkg_mark, pkg in pkgs:
+                echo(u'  %s %s:  %s' % (pkg_mark, pkg.pkg.strip(), first_line(pkg.description)))
+
+        for entry in changes.added:
+            show(u'+', entry, [(u'+', pkg) for pkg in entry.pkgs])
+        for entry_diff in changes.modified:
+            pkgs = [(u'+', pkg) for pkg in entry_diff.added] + \
+                   [(u'-', pkg) for pkg in entry_diff.removed] + \
+                   [(u'~', new_pkg) for old_pkg, new_pkg in entry_diff.modified]
+            show(u'~', entry_diff.new, pkgs)
+            if entry_diff.description:
+                echo(u'    %s' % first_line(entry_diff.new.description))
+        for entry in changes.removed:
+            show(u'-', entry, [(u'-', pkg) for pkg in entry.pkgs])
+    if changes:
+        sys.exit(1)
+
+
+def slacklog_rollup():
+    #
+    #   Define and handle command line options
+    #
+    (opts, args) = main(
+        description='Show per-week or per-month statistics of a Slackware ChangeLog',
+        options={
+            'changelog': {'help': 'Read input from FILE',
+                          'metavar': 'FILE', 'mandatory': True},
+            'rollup': {'help': 'Rollup FILE, updated with the new entries of the ChangeLog '
+                               '[default: CHANGELOG without the extension, plus .rollup.json]',
+                       'metavar': 'FILE'},
+            'encoding': {'help': 'ChangeLog encoding [default: %default]',
+                         'default': 'iso8859-1'},
+            'period': {'help': 'Show the counts of each week or month [default: %default]',
+                       'type': 'choice', 'choices': ['week', 'month'], 'default': 'month'},
+            'max-periods': {'help': 'Max number of periods to show [default: infinity]',
+                            'metavar': 'NUM'},
+            'quiet': {'help': 'Do not print warnings',
+                      'action': 'store_true'}
+        })
+
+    from slacklog.models import PKG_ACTIONS
+    from slacklog.rollups import SlackLogRollup, rollup_file
+
+    #
+    #   Count the new entries, then show the counts, newest first
+    #
+    parser = SlackLogParser()
+    parser.quiet = opts.quiet
+    rollup = SlackLogRollup(opts.rollup or rollup_file(opts.changelog))
+    rollup.update_changelog(opts.changelog, opts.encoding, parser)
+
+    periods = rollup.weeks if opts.period == 'week' else rollup.months
+    columns = (u'entries', u'security', u'pkgs') + PKG_ACTIONS
+    echo(u'%-8s %s' % (opts.period, u' '.join([u'%8s' % column for column in columns])))
+    for period in sorted(periods, reverse=True)[:i(opts.max_periods)]:
+        echo(u'%-8s %s' % (period, u' '.join([u'%8d' % periods[period][column] for column in columns])))
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+"""
+SlackLog server
+===============
+
+SlackLog server keeps parsed ChangeLogs in memory, and serves them over HTTP as RSS, Atom, JSON, or text.
+
+The ChangeLog files are polled for changes, and re-parsed incrementally (see :py:meth:`SlackLogParser.reparse`).
+The rendered feeds are cached (see :any:`SlackLogFeedCache`), so a feed is formatted only once after each change.
+Every response carries ``ETag`` and ``Last-Modified`` headers, and conditional requests are answered with
+``304 Not Modified``.  A conditional request is answered without formatting the feed, unless it has an
+``If-None-Match`` header and the feed is not in the cache; a ``304`` without formatting has no ``ETag``, unless the
+feed is in the cache.
+
+The feeds are served at ``/NAME.rss``, ``/NAME.atom``, ``/NAME.json``, and ``/NAME.txt``, where ``NAME`` is the
+name given to the ChangeLog.
+"""
+from __future__ import print_function
+
+import calendar
+import codecs
+import os
+import sys
+import threading
+from datetime import datetime
+from email.utils import formatdate, parsedate_tz, mktime_tz
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+import slacklog
+from slacklog.cache import SlackLogFeedCache
+from slacklog.parsers import SlackLogParser
+
+try:
+    str = unicode
+except NameError:
+    pass  # Forward compatibility with Py3k (unicode is not defined)
+
+
+class SlackLogFeed (object):
+    """
+    A ChangeLog kept in memory.
+    """
+
+    def __init__(self, name, changelog, encoding='iso8859-1', parser=None):
+        self.name = name
+        """:py:class:`unicode` name of the feed, used in the URLs.  E.g. 'slackware64-current'."""
+        self.title = name.replace(u'-', u' ', 1)
+        """:py:class:`unicode` description of the distro version.  E.g. 'slackware64 current'."""
+        self.changelog = changelog
+        """ChangeLog file name."""
+        self.encoding = encoding
+        """ChangeLog encoding."""
+        self.parser = parser or SlackLogParser()
+        """The :any:`SlackLogParser` used for (re-)parsing the ChangeLog."""
+        self.log = None
+        """The :any:`SlackLog`, or :py:const:`None` if the ChangeLog has not been parsed yet."""
+        self.modified = None
+        """:py:class:`datetime.datetime` modification time of the ChangeLog file in UTC."""
+        self.stamp = None
+        """Modification time and size of the ChangeLog file when it was parsed."""
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        """
+        Re-parse the ChangeLog, if the file has changed since it was last parsed.
+
+        The previous log is not changed (see :py:meth:`SlackLogParser.reparse`), so the requests that are still
+        formatting it are not disturbed.
+
+        :return: :py:class:`bool` -- :py:const:`True` if the ChangeLog was re-parsed.
+        """
+        st = os.stat(self.changelog)
+        stamp = (st.st_mtime, st.st_size)
+        if stamp == self.stamp:
+            return False
+        with self.lock:
+            if stamp == self.stamp:
+                return False
+            f = codecs.open(self.changelog, 'r', self.encoding)
+            try:
+                data = f.read()
+            finally:
+                f.close()
+            from dateutil import tz
+            self.log = self.parser.reparse(data, self.log)
+            self.modified = datetime.fromtimestamp(int(st.st_mtime), tz.tzutc())
+            self.stamp = stamp
+        return True
+
+    def snapshot(self):
+        """
+        Return the current log and its modification time.
+
+        :return: [:any:`SlackLog`, :py:class:`datetime.datetime`] -- a two element list: the log, and the
+            modification time of the ChangeLog file.
+        """
+        with self.lock:
+            return [self.log, self.modified]
+
+    def formatter(self, fmt, url, modified, max_entries=None):
+        """
+        Return a formatter for this feed.
+
+        :param fmt: :py:class:`str` -- Format: 'rss', 'atom', 'json', or 'txt'.
+        :param url: :py:class:`unicode` -- URL of the formatted feed.
+        :param modified: :py:class:`datetime.datetime` -- Modification time of the ChangeLog.
+        :param max_entries: If not :py:const:`None`, must be an :py:class:`int` representing how many entries are
+            formatted.
+        :return: :any:`SlackLogFormatter` -- A configured, frozen, formatter.
+        """
+        from slacklog import formatters
+        if fmt == 'rss':
+            formatter = formatters.SlackLogRssFormatter()
+            formatter.slackware = self.title
+            formatter.rssLink = url
+            formatter.description = u'Recent changes in %s' % self.title
+            formatter.language = u'en'
+            formatter.lastBuildDate = modified
+        elif fmt == 'atom':
+            formatter = formatters.SlackLogAtomFormatter()
+            formatter.slackware = self.title
+            formatter.link = url
+            formatter.updated = modified
+        elif fmt == 'json':
+            formatter = formatters.SlackLogJsonFormatter()
+        elif fmt == 'txt':
+            formatter = formatters.SlackLogTxtFormatter()
+        else:
+            raise ValueError('Unknown format: %s' % fmt)
+        formatter.max_entries = max_entries
+        return formatter.freeze()
+
+
+class SlackLogServer (ThreadingMixIn, HTTPServer):
+    """
+    HTTP server for a set of :any:`SlackLogFeed` objects.
+    """
+
+    daemon_threads = True
+
+    content_types = {
+        'rss': 'application/rss+xml; charset=utf-8',
+        'atom': 'application/atom+xml; charset=utf-8',
+        'json': 'application/json; charset=utf-8',
+        'txt': 'text/plain; charset=utf-8',
+    }
+    """Content type of each format, keyed by the file name extension."""
+
+    def __init__(self, address, feeds, base_url=None, max_entries=None, interval=5.0, quiet=False, cache_size=64):
+        HTTPServer.__init__(self, address, SlackLogRequestHandler)
+        self.feeds = dict([(feed.name, feed) for feed in feeds])
+        """The :any:`SlackLogFeed` objects, keyed by name."""
+        self.base_url = base_url or u'http://%s:%d' % self.server_address[:2]
+        """:py:class:`unicode` URL of the server, used for the links in the feeds."""
+        self.max_entries = max_entries
+        """If not :py:const:`None`, must be an :py:class:`int` representing how many entries are served."""
+        self.interval = interval
+        """How often, in seconds, the ChangeLog files are checked for changes."""
+        self.quiet = quiet
+        """If :py:const:`True`, requests and errors are not logged."""
+        self.cache = SlackLogFeedCache(cache_size)
+        """The :any:`SlackLogFeedCache` of rendered feeds."""
+        self.formatters = {}
+        """The modification time of the ChangeLog, and the frozen formatter, keyed by the feed name and the format.
+
+        The formatters are shared by all the requests for the same feed, until the ChangeLog changes."""
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def refresh(self):
+        """
+        Re-parse the ChangeLogs that have changed.
+        """
+        for feed in self.feeds.values():
+            try:
+                feed.refresh()
+            except (IOError, OSError, ValueError) as e:
+                if not self.quiet:
+                    sys.stderr.write('%s: %s\n' % (feed.changelog, e))
+
+    def poll(self):
+        """
+        Re-parse the changed ChangeLogs every :py:attr:`interval` seconds, until the server is shut down.
+        """
+        while not self.stopped.wait(self.interval):
+            self.refresh()
+
+    def start_polling(self):
+        """
+        Start polling the ChangeLog files in a background thread.
+        """
+        thread = threading.Thread(target=self.poll)
+        thread.daemon = True
+        thread.start()
+
+    def shutdown(self):
+        self.stopped.set()
+        HTTPServer.shutdown(self)
+
+    def formatter(self, feed, modified, fmt):
+        """
+        Return a formatter for the feed.
+
+        :param feed: :any:`SlackLogFeed` -- The feed.
+        :param modified: :py:class:`datetime.datetime` -- Modification time of the ChangeLog.
+        :param fmt: :py:class:`str` -- Format, one of the keys of :py:attr:`content_types`.
+        :return: :any:`SlackLogFormatter` -- A configured, frozen, formatter.
+        """
+        key = (feed.name, fmt)
+        with self.lock:
+            formatter_modified, formatter = self.formatters.get(key, (None, None))
+        if formatter is None or formatter_modified != modified:
+            formatter = feed.formatter(fmt, u'%s/%s.%s' % (self.base_url, feed.name, fmt), modified,
+                                       self.max_entries)
+            with self.lock:
+                self.formatters[key] = (modified, formatter)
+        return formatter
+
+    def render(self, feed, log, modified, fmt):
+        """
+        Return the feed in the given format, and its ETag.
+
+        :param feed: :any:`SlackLogFeed` -- The feed.
+        :param log: :any:`SlackLog` -- The log of the feed.
+        :param modified: :py:class:`datetime.datetime` -- Modification time of the ChangeLog.
+        :param fmt: :py:class:`str` -- Format, one of the keys of :py:attr:`content_types`.
+        :return: [:py:class:`bytes`, :py:class:`str`] -- a two element list: UTF-8 encoded feed, and its quoted ETag.
+        """
+        return self.cache.get(log, self.formatter(feed, modified, fmt))
+
+    def etag(self, feed, log, modified, fmt):
+        """
+        Return the ETag of the feed in the given format, if it has been rendered, without rendering it.
+
+        :param feed: :any:`SlackLogFeed` -- The feed.
+        :param log: :any:`SlackLog` -- The log of the feed.
+        :param modified: :py:class:`datetime.datetime` -- Modification time of the ChangeLog.
+        :param fmt: :py:class:`str` -- Format, one of the keys of :py:attr:`content_types`.
+        :return: :py:class:`str` -- The quoted ETag, or :py:const:`None` if the feed is not in the cache.
+        """
+        return self.cache.etag(log, self.formatter(feed, modified, fmt))
+
+
+class SlackLogRequestHandler (BaseHTTPRequestHandler):
+    """
+    Request handler of :any:`SlackLogServer`.
+    """
+
+    server_version = 'SlackLog/%s' % slacklog.__version__
+
+    def do_GET(self):
+        self.respond(True)
+
+    def do_HEAD(self):
+        self.respond(False)
+
+    def respond(self, send_body):
+        """
+        Respond with the requested feed, or with 304 if the client already has it.
+
+        :param send_body: :py:class:`bool` -- :py:const:`False` for HEAD requests.
+        """
+        path = self.path.split('?', 1)[0].lstrip('/')
+        name, dot, fmt = path.rpartition('.')
+        feed = self.server.feeds.get(name)
+        if not dot or feed is None or fmt not in self.server.content_types:
+            self.send_error(404)
+            return
+        log, modified = feed.snapshot()
+        if log is None:
+            self.send_error(503)
+            return
+
+        # The feed is rendered only if the response needs it, or if its ETag is needed but not cached
+        data = None
+        etag = self.server.etag(feed, log, modified, fmt)
+        if etag is None and self.headers.get('If-None-Match') is not None:
+            data, etag = self.server.render(feed, log, modified, fmt)
+        last_modified = formatdate(calendar.timegm(modified.utctimetuple()), usegmt=True)
+        if self.not_modified(etag, modified):
+            self.send_response(304)
+            if etag is not None:
+                self.send_header('ETag', etag)
+            self.send_header('Last-Modified', last_modified)
+            self.end_headers()
+            return
+
+        if data is None:
+            data, etag = self.server.render(feed, log, modified, fmt)
+        self.send_response(200)
+        self.send_header('Content-Type', self.server.content_types[fmt])
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(data)
+
+    def not_modified(self, etag, modified):
+        """
+        Return :py:const:`True` if the conditional request headers match the current feed.
+
+        :param etag: :py:class:`str` -- Current ETag, or :py:const:`None` if it is not known.
+        :param modified: :py:class:`datetime.datetime` -- Current modification time.
+        :return: :py:class:`bool` -- :py:const:`True` if 304 should be sent.
+        """
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            etags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in etags or etag in etags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since is not None:
+            since = parsedate_tz(if_modified_since)
+            if since is not None:
+                return calendar.timegm(modified.utctimetuple()) <= mktime_tz(since)
+        return False
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
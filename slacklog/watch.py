@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+SlackLog watch
+==============
+
+SlackLog watch waits for ChangeLog files to change in a directory.
+
+On Linux, the changes are reported by inotify.  Elsewhere, or if inotify is not available, the modification times
+and sizes of the files are polled.
+
+The changes are debounced: once a file changes, the watcher waits until the directory has been quiet for a while,
+and then reports all the files that changed.  That way, a batch of downloads causes one rebuild, not one per file,
+and a half-written file is not picked up.
+"""
+import ctypes
+import ctypes.util
+import errno
+import fnmatch
+import os
+import select
+import struct
+import sys
+import time
+
+
+class SlackLogPollingBackend (object):
+    """
+    Reports changes by comparing the modification times and sizes of the files.
+    """
+
+    def __init__(self, directory, interval=1.0):
+        self.directory = directory
+        """Watched directory."""
+        self.interval = interval
+        """How often, in seconds, the directory is scanned."""
+        self.stamps = self.scan()
+
+    def scan(self):
+        """
+        Return the modification time and size of each file in the directory.
+
+        :return: :py:class:`dict` -- File name to (mtime, size).
+        """
+        stamps = {}
+        for name in os.listdir(self.directory):
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue  # Removed in between
+            stamps[name] = (st.st_mtime, st.st_size)
+        return stamps
+
+    def read(self, timeout=None):
+        """
+        Wait for changes.
+
+        :param timeout: :py:class:`float` -- Seconds to wait, or :py:const:`None` to wait until something changes.
+        :return: [:py:class:`str`] -- Names of the files that were changed or added.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            stamps = self.scan()
+            changed = [name for name, stamp in stamps.items() if self.stamps.get(name) != stamp]
+            self.stamps = stamps
+            if changed:
+                return changed
+            if deadline is None:
+                time.sleep(self.interval)
+            else:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return []
+                time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+
+class SlackLogInotifyBackend (object):
+    """
+    Reports changes with Linux inotify.
+
+    Files written in place are reported when they are closed, files moved into the directory when they are moved,
+    and files touched (e.g. ``curl -R``) when their attributes change.
+    """
+
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_NONBLOCK = 0x00000800
+    IN_CLOEXEC = 0x00080000
+
+    event = struct.Struct('iIII')
+
+    def __init__(self, directory):
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, 'inotify is only available on Linux')
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError(errno.ENOSYS, 'inotify is not available')
+        self.directory = directory
+        """Watched directory."""
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            e = ctypes.get_errno()
+            raise OSError(e, os.strerror(e))
+        path = directory if isinstance(directory, bytes) else directory.encode(sys.getfilesystemencoding())
+        if libc.inotify_add_watch(self.fd, path, self.IN_ATTRIB | self.IN_CLOSE_WRITE | self.IN_MOVED_TO) < 0:
+            e = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(e, os.strerror(e), directory)
+
+    def read(self, timeout=None):
+        """
+        Wait for changes.
+
+        :param timeout: :py:class:`float` -- Seconds to wait, or :py:const:`None` to wait until something changes.
+        :return: [:py:class:`str`] -- Names of the files that were changed or added.
+        """
+        ready = select.select([self.fd], [], [], timeout)[0]
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 65536)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return []
+            raise
+        changed = []
+        offset = 0
+        while offset + self.event.size <= len(data):
+            wd, mask, cookie, length = self.event.unpack_from(data, offset)
+            offset += self.event.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name:
+                changed.append(name.decode(sys.getfilesystemencoding()))
+        return changed
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class SlackLogWatcher (object):
+    """
+    Waits for files matching a pattern to change in a directory.
+    """
+
+    def __init__(self, directory, pattern='*.txt', debounce=1.0, interval=1.0, polling=False):
+        self.directory = directory
+        """Watched directory."""
+        self.pattern = pattern
+        """Shell-style pattern of the watched file names."""
+        self.debounce = debounce
+        """How long, in seconds, the directory has to be quiet before the changes are reported."""
+        self.backend = None
+        """:any:`SlackLogInotifyBackend`, or :any:`SlackLogPollingBackend` if inotify is not available."""
+        if not polling:
+            try:
+                self.backend = SlackLogInotifyBackend(directory)
+            except (OSError, AttributeError):
+                pass
+        if self.backend is None:
+            self.backend = SlackLogPollingBackend(directory, interval)
+
+    def wait(self, timeout=None):
+        """
+        Wait for files to change.
+
+        Returns once at least one matching file has changed and no further changes were seen for
+        :py:attr:`debounce` seconds, or when the timeout expires.  Changes of the other files in the directory are
+        ignored.
+
+        :param timeout: :py:class:`float` -- Seconds to wait for the first change, or :py:const:`None` to wait
+            forever.
+        :return: [:py:class:`str`] -- Sorted paths of the changed files, or an empty list on timeout.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.time())
+            changed = set(self.matching(self.backend.read(remaining)))
+            if changed:
+                break
+            if deadline is not None and time.time() >= deadline:
+                return []
+        while True:
+            more = self.backend.read(self.debounce)
+            if not more:
+                break
+            changed.update(self.matching(more))
+        return sorted([os.path.join(self.directory, name) for name in changed])
+
+    def matching(self, names):
+        return [name for name in names if fnmatch.fnmatch(name, self.pattern)]
+
+    def close(self):
+        """
+        Stop watching.
+        """
+        self.backend.close()
@@ -0,0 +1,58 @@
+# coding=utf-8
+# encoding: utf-8
+import unittest
+from slacklog.models import PKG_ACTIONS
+from slacklog.parsers import SlackLogParser
+from slacklog.scripts import read
+
+try:
+    import numpy
+    from slacklog.arrays import SlackLogArrays
+except ImportError:
+    numpy = None
+
+
+@unittest.skipUnless(numpy is not None, 'NumPy is not installed')
+class ArraysTest (unittest.TestCase):
+
+    def setUp(self):
+        parser = SlackLogParser()
+        self.log = parser.parse(read('./test/changelogs/slackware64-14.2.txt', 'iso8859-1'))
+        self.other = parser.parse(read('./test/changelogs/slackware-14.2.txt', 'iso8859-1'))
+        self.arrays = SlackLogArrays()
+
+    def test_entries(self):
+        entries = self.arrays.entries(self.log)
+        self.assertEqual(len(self.log.entries), len(entries))
+        entry = self.log.entries[7]
+        self.assertEqual(7, entries['entry'][7])
+        self.assertEqual(numpy.datetime64(entry.timestamp.strftime('%Y-%m-%dT%H:%M:%S')), entries['timestamp'][7])
+        self.assertEqual(len(entry.pkgs), entries['pkgs'][7])
+        self.assertEqual(sum([len(e.pkgs) for e in self.log.entries]), entries['pkgs'].sum())
+        security = [e for e in self.log.entries if u'(* Security fix *)' in e.description
+                    or any([u'(* Security fix *)' in pkg.description for pkg in e.pkgs])]
+        self.assertEqual(len(security), entries['security'].sum())
+
+    def test_pkgs(self):
+        pkgs = self.arrays.pkgs(self.log)
+        timestamps = self.arrays.entries(self.log)['timestamp']
+        expected = [pkg for entry in self.log.entries for pkg in entry.pkgs]
+        self.assertEqual(len(expected), len(pkgs))
+        for position in [0, 100, len(expected) - 1]:
+            pkg = expected[position]
+            self.assertEqual(self.log.entries.index(pkg.entry), pkgs['entry'][position])
+            self.assertEqual(timestamps[pkgs['entry'][position]], pkgs['timestamp'][position])
+            self.assertEqual(pkg.action, PKG_ACTIONS[pkgs['action'][position]])
+            self.assertEqual(pkg.security, pkgs['security'][position])
+        self.assertEqual(len([pkg for pkg in expected if pkg.action == u'upgraded']),
+                         (pkgs['action'] == PKG_ACTIONS.index(u'upgraded')).sum())
+
+    def test_names(self):
+        pkgs64 = self.arrays.pkgs(self.log)
+        pkgs32 = self.arrays.pkgs(self.other)
+        # The same package has the same number in both logs
+        glibc = self.arrays.numbers[u'glibc']
+        self.assertEqual(u'glibc', self.arrays.names[glibc])
+        self.assertTrue((pkgs64['name'] == glibc).any())
+        self.assertTrue((pkgs32['name'] == glibc).any())
+        self.assertEqual(len(self.arrays.names), len(set(pkgs64['name']) | set(pkgs32['name'])))
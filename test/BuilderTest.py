@@ -0,0 +1,109 @@
+# coding=utf-8
+# encoding: utf-8
+import unittest
+import os
+import shutil
+import tempfile
+from slacklog.builder import SlackLogBuilder, write_archive
+from slacklog.formatters import SlackLogAtomFormatter
+
+
+class BuilderTest (unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.src = os.path.join(self.tmp, 'changelogs')
+        self.out = os.path.join(self.tmp, 'feeds')
+        os.mkdir(self.src)
+        os.mkdir(self.out)
+        for name in ('slackware-14.2.txt', 'slackware64-14.2.txt'):
+            shutil.copy('./test/changelogs/%s' % name, self.src)
+        self.builder = SlackLogBuilder(self.out, formats=['rss', 'json'], base_url=u'http://localhost')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, True)
+
+    def test_build(self):
+        written = self.builder.build_all(self.src)
+        self.assertEqual(['slackware-14.2.rss', 'slackware-14.2.json', 'slackware64-14.2.rss',
+                          'slackware64-14.2.json'], [os.path.basename(out) for out in written])
+        with open(os.path.join(self.out, 'slackware64-14.2.rss'), 'rb') as f:
+            self.assertIn(b'<link>http://localhost/slackware64-14.2.rss</link>', f.read())
+
+        # Nothing changed
+        self.assertEqual([], self.builder.build_all(self.src))
+        # Nothing changed since the last run
+        self.assertEqual([], SlackLogBuilder(self.out, formats=['rss', 'json']).build_all(self.src, startup=True))
+
+        # Only the feeds of the changed ChangeLog are written, and old entries are reused
+        changelog = os.path.join(self.src, 'slackware64-14.2.txt')
+        entries = list(self.builder.feeds[changelog].log.entries)
+        with open(changelog, 'rb') as f:
+            data = f.read()
+        with open(changelog, 'wb') as f:
+            f.write(b'Sat Jan  1 00:00:00 UTC 2050\na/aaa_base-14.2-x86_64-9.txz:  Rebuilt.\n'
+                    b'+--------------------------+\n')
+            f.write(data)
+        os.utime(changelog, (2524608000, 2524608000))
+        written = self.builder.build_all(self.src)
+        self.assertEqual(['slackware64-14.2.rss', 'slackware64-14.2.json'],
+                         [os.path.basename(out) for out in written])
+        self.assertTrue(self.builder.feeds[changelog].log.entries[1].description is entries[0].description)
+        with open(os.path.join(self.out, 'slackware64-14.2.rss'), 'rb') as f:
+            self.assertIn(b'a/aaa_base-14.2-x86_64-9.txz', f.read())
+        self.assertEqual(sorted(['slackware-14.2.rss', 'slackware-14.2.json', 'slackware64-14.2.rss',
+                                 'slackware64-14.2.json']), sorted(os.listdir(self.out)))
+
+    def test_older_changelog(self):
+        changelog = os.path.join(self.src, 'slackware64-14.2.txt')
+        self.builder.build(changelog)
+        out = os.path.join(self.out, 'slackware64-14.2.rss')
+        mtime = os.path.getmtime(out)
+
+        # A new process, and a new ChangeLog that kept the older modification time of the mirror
+        builder = SlackLogBuilder(self.out, formats=['rss', 'json'], base_url=u'http://localhost')
+        self.assertEqual([], builder.build(changelog, startup=True))
+        with open(changelog, 'rb') as f:
+            data = f.read()
+        with open(changelog, 'wb') as f:
+            f.write(b'Sat Jan  1 00:00:00 UTC 2050\na/aaa_base-14.2-x86_64-9.txz:  Rebuilt.\n'
+                    b'+--------------------------+\n')
+            f.write(data)
+        os.utime(changelog, (mtime - 3600, mtime - 3600))
+        written = builder.build(changelog)
+        self.assertEqual(['slackware64-14.2.rss', 'slackware64-14.2.json'],
+                         [os.path.basename(out) for out in written])
+        with open(out, 'rb') as f:
+            self.assertIn(b'a/aaa_base-14.2-x86_64-9.txz', f.read())
+
+    def test_archive(self):
+        builder = SlackLogBuilder(self.out, formats=['atom'], base_url=u'http://localhost', archive_size=100)
+        changelog = os.path.join(self.src, 'slackware64-14.2.txt')
+        written = [os.path.basename(out) for out in builder.build(changelog)]
+        entries = len(builder.feeds[changelog].log.entries)
+        pages = (entries - 1) // 100
+        self.assertEqual(['slackware64-14.2-%d.atom' % page for page in range(1, pages + 1)] +
+                         ['slackware64-14.2.atom'], written)
+        with open(os.path.join(self.out, 'slackware64-14.2.atom'), 'rb') as f:
+            data = f.read()
+        self.assertEqual(entries - pages * 100, data.count(b'<entry>'))
+        self.assertIn(('<link href="http://localhost/slackware64-14.2-%d.atom" rel="prev-archive" />'
+                       % pages).encode('ascii'), data)
+        with open(os.path.join(self.out, 'slackware64-14.2-2.atom'), 'rb') as f:
+            data = f.read()
+        self.assertEqual(100, data.count(b'<entry>'))
+        self.assertIn(b'<fh:archive />', data)
+        self.assertIn(b'<link href="http://localhost/slackware64-14.2.atom" rel="current" />', data)
+        self.assertIn(b'<link href="http://localhost/slackware64-14.2-1.atom" rel="prev-archive" />', data)
+        # The entries keep the ids they had in the current feed
+        self.assertIn(b'<id>http://localhost/slackware64-14.2.atom#', data)
+
+        # The archive pages are written only once
+        written = builder.build(changelog, force=True)
+        self.assertEqual(['slackware64-14.2.atom'], [os.path.basename(out) for out in written])
+
+        # The file name is checked before anything is written
+        formatter = SlackLogAtomFormatter()
+        formatter.archiveSize = 100
+        formatter.link = u'http://localhost/slackware64-14.2.atom'
+        self.assertRaises(ValueError, write_archive, formatter, builder.feeds[changelog].log, None)
@@ -0,0 +1,67 @@
+# coding=utf-8
+# encoding: utf-8
+import unittest
+import codecs
+from slacklog.cache import SlackLogFeedCache
+from slacklog.formatters import SlackLogRssFormatter, SlackLogTxtFormatter
+from slacklog.parsers import SlackLogParser
+
+
+class CacheTest (unittest.TestCase):
+
+    def setUp(self):
+        with codecs.open('./test/changelogs/slackware64-14.2.txt', 'r', 'iso8859-1') as f:
+            self.data = f.read()
+        self.log = SlackLogParser().parse(self.data)
+        self.cache = SlackLogFeedCache(max_size=2)
+
+    def rss(self, max_entries=None):
+        formatter = SlackLogRssFormatter()
+        formatter.slackware = u'slackware64 14.2'
+        formatter.rssLink = u'http://localhost/slackware64-14.2.rss'
+        formatter.max_entries = max_entries
+        return formatter
+
+    def test_hits(self):
+        data, etag = self.cache.get(self.log, self.rss())
+        self.assertEqual(self.rss().format(self.log).encode('utf-8'), data)
+        self.assertEqual([data, etag], self.cache.get(self.log, self.rss()))
+        self.assertEqual(1, self.cache.hits)
+        self.assertEqual(1, self.cache.misses)
+
+        # Different options, different feed
+        other, other_etag = self.cache.get(self.log, self.rss(max_entries=5))
+        self.assertNotEqual(etag, other_etag)
+        self.assertEqual(2, self.cache.misses)
+
+        # Equal log parsed again, same feed
+        log = SlackLogParser().parse(self.data)
+        self.assertEqual([data, etag], self.cache.get(log, self.rss()))
+        self.assertEqual(2, self.cache.hits)
+
+        # Changed log, new feed
+        log = SlackLogParser().parse(u'Sat Jan  1 00:00:00 UTC 2050\na/aaa_base-14.2-x86_64-9.txz:  Rebuilt.\n'
+                                     u'+--------------------------+\n' + self.data)
+        self.assertNotEqual(etag, self.cache.get(log, self.rss())[1])
+        self.assertEqual(3, self.cache.misses)
+
+    def test_etag(self):
+        self.assertEqual(None, self.cache.etag(self.log, self.rss()))
+        data, etag = self.cache.get(self.log, self.rss())
+        self.assertEqual(etag, self.cache.etag(self.log, self.rss()))
+        self.assertEqual(None, self.cache.etag(self.log, self.rss(max_entries=5)))
+        self.assertEqual(0, self.cache.hits)
+        self.assertEqual(1, self.cache.misses)
+
+    def test_eviction(self):
+        self.cache.get(self.log, self.rss())
+        self.cache.get(self.log, SlackLogTxtFormatter())
+        self.cache.get(self.log, self.rss())  # rss is now the most recently used
+        self.cache.get(self.log, self.rss(max_entries=5))  # evicts txt
+        self.assertEqual(2, len(self.cache.feeds))
+        self.cache.get(self.log, self.rss())
+        self.assertEqual(2, self.cache.hits)
+        self.cache.get(self.log, SlackLogTxtFormatter())
+        self.assertEqual(4, self.cache.misses)
+        self.cache.clear()
+        self.assertEqual(0, len(self.cache.feeds))
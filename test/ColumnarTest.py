@@ -0,0 +1,91 @@
+# coding=utf-8
+# encoding: utf-8
+import unittest
+from datetime import datetime
+from dateutil import tz
+from slacklog.columnar import SlackLogColumns
+from slacklog.parsers import SlackLogParser
+from slacklog.scripts import read
+
+
+def entry_fields(entry):
+    return (entry.timestamp, entry.timezone, entry.twelveHourFormat, entry.description, entry.checksum,
+            entry.identifier, entry.parent, [(pkg.pkg, pkg.description) for pkg in entry.pkgs])
+
+
+class ColumnarTest (unittest.TestCase):
+
+    def setUp(self):
+        parser = SlackLogParser()
+        self.log = parser.parse(read('./test/changelogs/slackware64-14.2.txt', 'iso8859-1'))
+        self.other = parser.parse(read('./test/changelogs/slackware-13.37.txt', 'iso8859-1'))
+        self.columns = SlackLogColumns(self.log)
+
+    def test_entries(self):
+        self.assertEqual(len(self.log.entries), len(self.columns))
+        log = self.columns.log()
+        self.assertEqual(self.log.checksumVersion, log.checksumVersion)
+        self.assertEqual(len(self.log.entries), len(log.entries))
+        for expected, entry in zip(self.log.entries, log.entries):
+            self.assertTrue(entry.log is log)
+            self.assertEqual(entry_fields(expected), entry_fields(entry))
+        self.assertEqual(self.log.entries[5].pkgs[0].pkg, self.columns.pkgs(5)[0][0])
+
+    def test_extend(self):
+        self.columns.extend(self.other)
+        self.assertEqual(len(self.log.entries) + len(self.other.entries), len(self.columns))
+        entries = self.log.entries + self.other.entries
+        for position in [0, len(self.log.entries) - 1, len(self.log.entries), len(entries) - 1]:
+            self.assertEqual(entry_fields(entries[position]), entry_fields(self.columns.entry(position)))
+
+    def test_search(self):
+        expected = [position for position, entry in enumerate(self.log.entries)
+                    if u'CVE-2016-0800' in entry.description
+                    or any(u'CVE-2016-0800' in pkg.description for pkg in entry.pkgs)]
+        self.assertTrue(expected)
+        self.assertEqual(expected, self.columns.search(u'CVE-2016-0800'))
+        expected = [position for position, entry in enumerate(self.log.entries)
+                    if any(pkg.pkg.startswith(u'n/openssl-') for pkg in entry.pkgs)]
+        self.assertEqual(expected, self.columns.search(u'n/openssl-'))
+        self.assertEqual([], self.columns.search(u'no such text'))
+
+    def test_between(self):
+        start = datetime(2017, 1, 1, tzinfo=tz.tzutc())
+        end = datetime(2018, 1, 1, tzinfo=tz.tzutc())
+        expected = [self.log.entries.index(entry) for entry in self.log.entries_between(start, end)]
+        self.assertTrue(expected)
+        self.assertEqual(expected, self.columns.between(start, end))
+        self.assertEqual(list(range(len(self.columns))), self.columns.between())
+        self.assertEqual([], self.columns.between(end, start))
+        for limits in [(start, None), (None, end)]:
+            self.assertEqual([self.log.entries.index(entry) for entry in self.log.entries_between(*limits)],
+                             self.columns.between(*limits))
+
+        # Appending an older log keeps the order, appending a newer one does not
+        newer = self.columns.log(range(100))
+        older = self.columns.log(range(100, len(self.columns)))
+        ordered = SlackLogColumns(newer)
+        ordered.extend(older)
+        self.assertTrue(ordered.ordered)
+        unordered = SlackLogColumns(older)
+        unordered.extend(newer)
+        self.assertFalse(unordered.ordered)
+        start = self.log.entries[150].timestamp
+        end = self.log.entries[50].timestamp
+        for columns, entries in [(ordered, newer.entries + older.entries), (unordered, older.entries + newer.entries)]:
+            expected = [position for position, entry in enumerate(entries) if start <= entry.timestamp < end]
+            self.assertTrue(expected)
+            self.assertEqual(expected, columns.between(start, end))
+
+    def test_digests(self):
+        self.assertEqual(len(self.log.entries) * 64, len(self.columns.checksums))
+        self.assertEqual(self.log.entries[3].checksum, self.columns.checksum(3))
+        self.assertEqual(self.log.entries[3].identifier, self.columns.identifier(3))
+        # Values that are not hex digests are kept as they are
+        entry = self.log.entries[0]
+        entry.checksum = None
+        entry.identifier = u'not a digest'
+        columns = SlackLogColumns(self.log)
+        self.assertEqual(None, columns.checksum(0))
+        self.assertEqual(u'not a digest', columns.identifier(0))
+        self.assertEqual(entry_fields(self.log.entries[1]), entry_fields(columns.entry(1)))
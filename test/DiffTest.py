@@ -0,0 +1,77 @@
+# coding=utf-8
+# encoding: utf-8
+import unittest
+import codecs
+from slacklog.diff import diff, common_ancestor
+from slacklog.parsers import SlackLogParser
+
+SEPARATOR = u'+--------------------------+\n'
+
+
+class DiffTest (unittest.TestCase):
+
+    def setUp(self):
+        with codecs.open('./test/changelogs/slackware64-14.2.txt', 'r', 'iso8859-1') as f:
+            self.data = f.read()
+        self.chunks = self.data.split(SEPARATOR)
+        self.parser = SlackLogParser()
+        self.new = self.parser.parse(self.data)
+
+    def test_same(self):
+        changes = diff(self.parser.parse(self.data), self.new)
+        self.assertFalse(changes)
+        self.assertTrue(changes.ancestor is self.new.entries[0])
+
+    def test_added(self):
+        old = self.parser.parse(SEPARATOR.join(self.chunks[3:]))
+        self.assertEqual([0, 3], common_ancestor(old, self.new))
+        changes = diff(old, self.new)
+        self.assertTrue(changes)
+        self.assertEqual(self.new.entries[:3], changes.added)
+        self.assertEqual([], changes.removed)
+        self.assertEqual([], changes.modified)
+        self.assertTrue(changes.ancestor is self.new.entries[3])
+
+    def test_removed(self):
+        changes = diff(self.new, self.parser.parse(SEPARATOR.join(self.chunks[2:])))
+        self.assertEqual(self.new.entries[:2], changes.removed)
+        self.assertEqual([], changes.added)
+
+    def test_modified(self):
+        chunks = list(self.chunks)
+        # Edit the description of one package, add one package, and add an entry on top
+        chunks[1] = chunks[1].replace(u'  This update provides the latest CA certificates',
+                                      u'  This update provides the newest CA certificates')
+        chunks[3] = chunks[3] + u'patches/packages/foo-1.0-x86_64-1_slack14.2.txz:  Added.\n'
+        old = self.new
+        new = self.parser.parse(u'Wed Mar 13 12:00:00 UTC 2019\na/bar-1.0-x86_64-1.txz:  Rebuilt.\n' + SEPARATOR +
+                                SEPARATOR.join(chunks))
+        self.assertEqual([4, 5], common_ancestor(old, new))
+
+        changes = diff(old, new)
+        self.assertEqual([new.entries[0]], changes.added)
+        self.assertEqual([], changes.removed)
+        self.assertEqual([new.entries[2], new.entries[4]], [entry_diff.new for entry_diff in changes.modified])
+        self.assertEqual([old.entries[1], old.entries[3]], [entry_diff.old for entry_diff in changes.modified])
+
+        ca, python = changes.modified
+        self.assertFalse(ca.description)
+        self.assertEqual([], ca.added)
+        self.assertEqual([], ca.removed)
+        self.assertEqual([(old.entries[1].pkgs[0], new.entries[2].pkgs[0])], ca.modified)
+        self.assertEqual([new.entries[4].pkgs[-1]], python.added)
+        self.assertEqual(u'patches/packages/foo-1.0-x86_64-1_slack14.2.txz', python.added[0].pkg)
+        self.assertEqual([], python.modified)
+
+    def test_unrelated(self):
+        with codecs.open('./test/changelogs/slackware64-14.1.txt', 'r', 'iso8859-1') as f:
+            old = self.parser.parse(f.read())
+        self.assertEqual([len(old.entries), len(self.new.entries)], common_ancestor(old, self.new))
+        changes = diff(old, self.new)
+        self.assertTrue(changes.ancestor is None)
+        # Patches of both releases were announced at the same times, so some entries pair up as edited
+        self.assertTrue(changes.modified)
+        # and the entries that are in both ChangeLogs are not changes at all
+        common = set([entry.checksum for entry in old.entries]) & set([entry.checksum for entry in self.new.entries])
+        self.assertEqual(len(self.new.entries), len(changes.added) + len(changes.modified) + len(common))
+        self.assertEqual(len(old.entries), len(changes.removed) + len(changes.modified) + len(common))
@@ -0,0 +1,103 @@
+# coding=utf-8
+# encoding: utf-8
+import unittest
+import os
+import shutil
+import tempfile
+import threading
+from email.utils import formatdate
+from slacklog import fetch
+from slacklog.fetch import SlackLogFetcher
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+
+class MirrorServer (ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class MirrorHandler (BaseHTTPRequestHandler):
+    """Serves ChangeLogs from memory, with ETags, like a Slackware mirror."""
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        changelog = self.server.changelogs.get(self.path)
+        if changelog is None:
+            self.send_error(404)
+            return
+        data, mtime = changelog
+        etag = '"%d-%d"' % (len(data), mtime)
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Last-Modified', formatdate(mtime, usegmt=True))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FetchTest (unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.server = MirrorServer(('localhost', 0), MirrorHandler)
+        self.server.requests = []
+        self.server.changelogs = {}
+        for name in ('slackware-14.2', 'slackware64-14.2'):
+            with open('./test/changelogs/%s.txt' % name, 'rb') as f:
+                self.server.changelogs['/%s/ChangeLog.txt' % name] = (f.read(), 1500000000)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.fetcher = SlackLogFetcher(self.tmp, 'http://localhost:%d/' % self.server.server_address[1])
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        shutil.rmtree(self.tmp, True)
+
+    def test_fetch(self):
+        names = ['slackware-14.2', 'slackware64-14.2', 'slackware-15.0']
+        fetched = []
+        results = self.fetcher.fetch_all(names, lambda name, path: fetched.append(name))
+        self.assertEqual(os.path.join(self.tmp, 'slackware64-14.2.txt'), results['slackware64-14.2'])
+        self.assertEqual(404, results['slackware-15.0'].code)
+        self.assertEqual(['slackware-14.2', 'slackware64-14.2'], sorted(fetched))
+        self.assertEqual(1500000000, os.path.getmtime(results['slackware64-14.2']))
+        with open('./test/changelogs/slackware64-14.2.txt', 'rb') as f:
+            with open(results['slackware64-14.2'], 'rb') as g:
+                self.assertEqual(f.read(), g.read())
+
+        # Nothing changed
+        fetched = []
+        results = self.fetcher.fetch_all(names[:2], lambda name, path: fetched.append(name))
+        self.assertEqual({'slackware-14.2': None, 'slackware64-14.2': None}, results)
+        self.assertEqual([], fetched)
+
+        # One ChangeLog changed
+        data, mtime = self.server.changelogs['/slackware64-14.2/ChangeLog.txt']
+        self.server.changelogs['/slackware64-14.2/ChangeLog.txt'] = (
+            b'Sat Jan  1 00:00:00 UTC 2050\na/aaa_base-14.2-x86_64-9.txz:  Rebuilt.\n'
+            b'+--------------------------+\n' + data, mtime + 60)
+        results = self.fetcher.fetch_all(names[:2], lambda name, path: fetched.append(name))
+        self.assertEqual(None, results['slackware-14.2'])
+        self.assertEqual(['slackware64-14.2'], fetched)
+
+    def test_fetch_in_threads(self):
+        asyncio = fetch.asyncio
+        fetch.asyncio = None
+        try:
+            self.test_fetch()
+        finally:
+            fetch.asyncio = asyncio
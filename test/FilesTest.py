@@ -0,0 +1,34 @@
+# coding=utf-8
+# encoding: utf-8
+import unittest
+import os
+import shutil
+import tempfile
+from slacklog.files import replace_file
+
+
+class FilesTest (unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, True)
+
+    def test_replace_file(self):
+        path = os.path.join(self.tmp, 'feeds', 'slackware64-current.rss')
+        replace_file(path, b'old')
+        replace_file(path, b'new', 1234567890)
+        with open(path, 'rb') as f:
+            self.assertEqual(b'new', f.read())
+        self.assertEqual(1234567890, int(os.path.getmtime(path)))
+        self.assertEqual(['slackware64-current.rss'], os.listdir(os.path.dirname(path)))
+
+    def test_failure(self):
+        path = os.path.join(self.tmp, 'slackware64-current.rss')
+        replace_file(path, b'old')
+        self.assertRaises(TypeError, replace_file, path, None)
+        # The old file is intact, and the temporary file is gone
+        with open(path, 'rb') as f:
+            self.assertEqual(b'old', f.read())
+        self.assertEqual(['slackware64-current.rss'], os.listdir(self.tmp))
@@ -1,10 +1,12 @@
 # coding=utf-8
 # encoding: utf-8
+import sys
 import unittest
 from datetime import datetime
 from dateutil import tz
 from slacklog.models import SlackLog
-from slacklog.formatters import SlackLogRssFormatter, SlackLogJsonFormatter
+from slacklog.formatters import SlackLogRssFormatter, SlackLogJsonFormatter, SlackLogTxtFormatter, SlackLogAtomFormatter
+from slacklog.scripts import read
 from slacklog.parsers import SlackLogParser
 
 
@@ -44,3 +46,101 @@ Enjoy!  -P.
 ''')
         json = SlackLogJsonFormatter().format(log)
         self.assertIn('"timezone":"CDT"', json)
+
+    def test_rss_escapes_descriptions(self):
+        log = SlackLogParser().parse(u'''Wed Jun 25 22:13:11 UTC 2008
+Fixed K&R <code> in the description.
+a/sysvinit-scripts-1.2-noarch-2.tgz:  Added an '&&' in the /tmp cleanup.
+''')
+        fmt = SlackLogRssFormatter()
+        fmt.slackware = u'Slackware 12.1'
+        data = fmt.format(log)
+        self.assertIn(u'Fixed K&amp;R &lt;code> in the description.', data)
+        self.assertIn(u"Added an '&amp;&amp;' in the /tmp cleanup.", data)
+        # Escaped forms are cached on the model for other formatters
+        e = log.entries[0]
+        self.assertEqual(e.escapedDescription, u'Fixed K&amp;R &lt;code> in the description.\n')
+        self.assertEqual(e.pkgs[0].escapedDescription, u"  Added an '&amp;&amp;' in the /tmp cleanup.\n")
+        self.assertEqual(e.description, u'Fixed K&R <code> in the description.\n')
+
+    def test_freeze(self):
+        fmt = SlackLogRssFormatter()
+        fmt.slackware = u'slackware64 current'
+        self.assertTrue(fmt.freeze() is fmt)
+        self.assertTrue((u'slackware', u'slackware64 current') in fmt.options())
+        self.assertRaises(AttributeError, setattr, fmt, 'slackware', u'slackware64 14.2')
+
+        other = fmt.replace(slackware=u'slackware64 14.2', max_entries=5)
+        self.assertEqual(u'slackware64 current', fmt.slackware)
+        self.assertEqual(u'slackware64 14.2', other.slackware)
+        self.assertEqual(5, other.max_entries)
+        self.assertRaises(AttributeError, setattr, other, 'max_entries', 6)
+        self.assertRaises(TypeError, fmt.replace, nonexistent=1)
+
+    def test_iter_format(self):
+        log = SlackLogParser().parse(read('./test/changelogs/slackware64-14.2.txt', 'iso8859-1'))
+        rss = SlackLogRssFormatter()
+        rss.slackware = u'slackware64 14.2'
+        for fmt in [SlackLogTxtFormatter(), rss, SlackLogJsonFormatter()]:
+            self.assertEqual(fmt.format(log), u''.join(fmt.iter_format(log)))
+        fmt = SlackLogTxtFormatter()
+        fmt.max_entries = 3
+        # Preamble, entries, and postamble
+        self.assertEqual(5, len(list(fmt.iter_format(log))))
+
+    def test_atom_archive(self):
+        log = SlackLogParser().parse(read('./test/changelogs/slackware64-14.2.txt', 'iso8859-1'))
+        log.entries = log.entries[:30]
+        fmt = SlackLogAtomFormatter()
+        fmt.archiveSize = 10
+        # The link is needed for the archive page links
+        self.assertRaises(ValueError, fmt.archive_pages, log)
+        self.assertRaises(ValueError, fmt.format, log)
+        fmt.link = u'http://localhost/slackware64-14.2.atom'
+        fmt.freeze()
+
+        # The newest page stays in the feed, even if it is full
+        self.assertEqual([1, 2], fmt.archive_pages(log))
+        data = fmt.format(log)
+        self.assertEqual(10, data.count(u'<entry>'))
+        self.assertIn(u'<link href="http://localhost/slackware64-14.2-2.atom" rel="prev-archive" />', data)
+        self.assertEqual(data, u''.join(fmt.iter_format(log)))
+        page = fmt.format_archive(log, 1)
+        self.assertEqual(10, page.count(u'<entry>'))
+        self.assertIn(u'<link href="http://localhost/slackware64-14.2.atom" rel="current" />', page)
+        self.assertNotIn(u'rel="prev-archive"', page)
+        self.assertRaises(ValueError, fmt.format_archive, log, 3)
+
+        log.entries = log.entries[:11]
+        self.assertEqual([1], fmt.archive_pages(log))
+        self.assertEqual(1, fmt.format(log).count(u'<entry>'))
+        log.entries = []
+        self.assertEqual([], fmt.archive_pages(log))
+
+    @unittest.skipUnless(sys.version_info >= (3, 5), 'async for requires Python 3.5')
+    def test_iter_format_async(self):
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+        log = SlackLogParser().parse(read('./test/changelogs/slackware64-14.2.txt', 'iso8859-1'))
+        fmt = SlackLogRssFormatter()
+        fmt.slackware = u'slackware64 14.2'
+        fmt.lastBuildDate = datetime(2000, 1, 1, 0, 0, 0, 0, tz.tzutc())
+        loop = asyncio.new_event_loop()
+        executor = ThreadPoolExecutor(1)
+
+        def collect(parts):
+            data = []
+            while True:
+                try:
+                    data.append(loop.run_until_complete(parts.__anext__()))
+                except StopAsyncIteration:
+                    return data
+
+        try:
+            data = collect(fmt.iter_format_async(log, 10))
+            self.assertEqual(fmt.format(log), u''.join(data))
+            self.assertEqual((len(log.entries) + 2 + 9) // 10, len(data))
+            self.assertEqual(data, collect(fmt.iter_format_async(log, 10, executor, loop)))
+        finally:
+            executor.shutdown()
+            loop.close()
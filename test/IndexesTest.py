@@ -0,0 +1,135 @@
+# coding=utf-8
+# encoding: utf-8
+import unittest
+import codecs
+import os
+import shutil
+import tempfile
+from slacklog.indexes import SlackLogPkgIndex, SlackLogSearchIndex, pkg_base_name, pkg_short_name, tokenize
+from slacklog.parsers import SlackLogParser
+
+
+class PkgIndexTest (unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.index = SlackLogPkgIndex(os.path.join(self.tmp, 'pkgs.db'))
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.tmp, True)
+
+    def parse(self, name, prepend=u''):
+        with codecs.open('./test/changelogs/%s.txt' % name, 'r', 'iso8859-1') as f:
+            return SlackLogParser().parse(prepend + f.read())
+
+    def test_names(self):
+        self.assertEqual(u'a/glibc', pkg_base_name(u'a/glibc-2.29-x86_64-1.txz'))
+        self.assertEqual(u'x/xf86-video-intel',
+                         pkg_base_name(u'x/xf86-video-intel-git_20161117_169c74fa-x86_64-1.txz'))
+        self.assertEqual(u'isolinux/initrd.img', pkg_base_name(u'isolinux/initrd.img'))
+        self.assertEqual(u'openssl', pkg_short_name(u'patches/packages/openssl-1.0.2r-x86_64-1_slack14.2.txz'))
+
+    def test_history(self):
+        current = self.parse('slackware64-current')
+        stable = self.parse('slackware64-14.2')
+        self.assertEqual(len(current.entries), self.index.update(u'slackware64-current', current))
+        self.assertEqual(len(stable.entries), self.index.update(u'slackware64-14.2', stable))
+
+        expected = [(entry.timestamp, pkg.pkg) for entry in current.entries for pkg in entry.pkgs
+                    if pkg_base_name(pkg.pkg) == u'n/openssl']
+        changes = self.index.history(u'n/openssl', [u'slackware64-current'])
+        self.assertEqual(expected, [(change.timestamp, change.pkg) for change in changes])
+
+        changes = self.index.history(u'n/openssl')
+        self.assertEqual(set([u'slackware64-current', u'slackware64-14.2']),
+                         set([change.release for change in changes]))
+        self.assertIn(u'patches/packages/openssl', [pkg_base_name(change.pkg) for change in changes])
+        timestamps = [change.timestamp for change in changes]
+        self.assertEqual(sorted(timestamps, reverse=True), timestamps)
+        self.assertTrue(len(self.index.history(u'openssl')) >= len(changes))
+        # Patches to stable releases match any directory
+        self.assertEqual(set([u'patches/packages/openssl']),
+                         set([pkg_base_name(change.pkg) for change in self.index.history(u'a/openssl')]))
+
+        # Only the new entries are added
+        entry = u'Sat Jan  1 00:00:00 UTC 2050\nn/openssl-9.9.9-x86_64-1.txz:  Upgraded.\n+--------------------------+\n'
+        self.assertEqual(1, self.index.update(u'slackware64-14.2', self.parse('slackware64-14.2', entry)))
+        change = self.index.history(u'n/openssl')[0]
+        self.assertEqual(u'n/openssl-9.9.9-x86_64-1.txz', change.pkg)
+        self.assertEqual(u'Upgraded.', change.description.strip())
+        self.assertEqual(len(changes) + 1, len(self.index.history(u'n/openssl')))
+
+        # The release is indexed again, if the log does not contain the newest indexed entry
+        self.assertEqual(len(stable.entries), self.index.update(u'slackware64-14.2', stable))
+        self.assertEqual(len(changes), len(self.index.history(u'n/openssl')))
+
+        self.index.remove(u'slackware64-14.2')
+        self.assertEqual([u'slackware64-current'], list(self.index.releases().keys()))
+
+    def test_update_changelog(self):
+        changelog = './test/changelogs/slackware64-14.2.txt'
+        self.assertTrue(self.index.update_changelog(u'slackware64-14.2', changelog))
+        self.assertEqual(None, self.index.update_changelog(u'slackware64-14.2', changelog))
+
+
+class SearchIndexTest (unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.index = SlackLogSearchIndex(os.path.join(self.tmp, 'search.db'))
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.tmp, True)
+
+    def parse(self, name, prepend=u''):
+        with codecs.open('./test/changelogs/%s.txt' % name, 'r', 'iso8859-1') as f:
+            return SlackLogParser().parse(prepend + f.read())
+
+    def test_tokenize(self):
+        self.assertEqual(set([u'fixed', u'cve-2019-1559', u'cve', u'2019', u'1559']),
+                         tokenize(u'Fixed CVE-2019-1559.'))
+
+    def test_search(self):
+        log = self.parse('slackware64-14.2')
+        self.index.update(u'slackware64-14.2', log)
+        self.index.update(u'slackware-14.2', self.parse('slackware-14.2'))
+
+        expected = [(entry.timestamp, pkg.pkg) for entry in log.entries for pkg in entry.pkgs
+                    if u'CVE-2019-1559' in pkg.description]
+        self.assertTrue(expected)
+        hits = self.index.search(u'cve-2019-1559', [u'slackware64-14.2'])
+        self.assertEqual(expected, [(hit.timestamp, hit.pkg) for hit in hits])
+        self.assertEqual(2 * len(expected), len(self.index.search(u'CVE-2019-1559')))
+
+        # All words must match
+        hits = self.index.search(u'glibc CVE-2015-7547', [u'slackware64-14.2'])
+        self.assertTrue(hits)
+        for hit in hits:
+            self.assertIn(u'glibc', hit.pkg)
+            self.assertIn(u'CVE-2015-7547', hit.description)
+
+        # Prefixes
+        hits = self.index.search(u'CVE-2019-*', [u'slackware64-14.2'])
+        self.assertTrue(len(hits) > len(expected))
+        for hit in hits:
+            self.assertIn(u'CVE-2019-', hit.description)
+        self.assertEqual(3, len(self.index.search(u'CVE-2019-*', limit=3)))
+        self.assertEqual([], self.index.search(u'nonexistentword'))
+        self.assertEqual([], self.index.search(u''))
+
+        # Entry descriptions are searched, too
+        hits = self.index.search(u'slackware 14.2 released', [u'slackware64-14.2'])
+        self.assertTrue([hit for hit in hits if hit.pkg is None])
+
+        # Only the new entries are added
+        entry = (u'Sat Jan  1 00:00:00 UTC 2050\nn/openssl-9.9.9-x86_64-1.txz:  Upgraded.\n'
+                 u'  This update fixes CVE-2050-0001.\n+--------------------------+\n')
+        self.assertEqual(1, self.index.update(u'slackware64-14.2', self.parse('slackware64-14.2', entry)))
+        hits = self.index.search(u'CVE-2050-0001')
+        self.assertEqual([u'n/openssl-9.9.9-x86_64-1.txz'], [hit.pkg for hit in hits])
+
+        self.index.remove(u'slackware64-14.2')
+        self.assertEqual([], self.index.search(u'CVE-2050-0001'))
+        self.assertEqual(len(expected), len(self.index.search(u'CVE-2019-1559')))
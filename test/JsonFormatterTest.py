@@ -3,6 +3,7 @@
 import unittest
 import os
 import filecmp
+import json
 import shutil
 from slacklog.scripts import read, write
 from slacklog.parsers import SlackLogParser
@@ -52,6 +53,13 @@ class JsonFormatterTest (unittest.TestCase):
         self.assertEqual(0, len(mismatch))
         self.assertEqual(0, len(error))
 
+    def test_encoder(self):
+        slacklog = self.parser.parse(read("%sslackware-12.0.txt" % self.input, self.encoding))
+        self.assertEqual(self.formatter.format(slacklog),
+                         json.dumps(slacklog, ensure_ascii=False, allow_nan=False, sort_keys=True,
+                                    separators=(',', ':'), cls=SlackLogJsonFormatter.SlackLogEncoder))
+        self.assertRaises(TypeError, json.dumps, object(), cls=SlackLogJsonFormatter.SlackLogEncoder)
+
     def update_json(self, slackware, version):
         self.formatter.indent = 4
 
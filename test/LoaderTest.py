@@ -0,0 +1,109 @@
+# coding=utf-8
+# encoding: utf-8
+import unittest
+import codecs
+import gc
+import os
+import shutil
+import tempfile
+import threading
+from slacklog.loaders import SlackLogLoader
+from slacklog.parsers import SlackLogParser, SlackLogInterningParser
+
+
+class LoaderTest (unittest.TestCase):
+
+    def setUp(self):
+        self.loader = SlackLogLoader()
+        self.log32 = self.loader.load('./test/changelogs/slackware-14.2.txt')
+        self.log64 = self.loader.load('./test/changelogs/slackware64-14.2.txt')
+
+    def test_same_as_parser(self):
+        with codecs.open('./test/changelogs/slackware64-14.2.txt', 'r', 'iso8859-1') as f:
+            log = SlackLogParser().parse(f.read())
+        self.assertEqual(len(log.entries), len(self.log64.entries))
+        for expected, entry in zip(log.entries, self.log64.entries):
+            self.assertTrue(entry.log is self.log64)
+            self.assertEqual(expected.timestamp, entry.timestamp)
+            self.assertEqual(expected.description, entry.description)
+            self.assertEqual(expected.checksum, entry.checksum)
+            self.assertEqual(expected.identifier, entry.identifier)
+            self.assertEqual(expected.parent, entry.parent)
+            self.assertEqual([(pkg.pkg, pkg.description) for pkg in expected.pkgs],
+                             [(pkg.pkg, pkg.description) for pkg in entry.pkgs])
+            for pkg in entry.pkgs:
+                self.assertTrue(pkg.entry is entry)
+
+    def test_shared(self):
+        self.assertTrue(self.loader.parser.shared > 0)
+        common = self.loader.common(u'slackware64-14.2', u'slackware-14.2')
+        self.assertEqual(self.loader.parser.shared, len(common))
+        for entry in common:
+            other = self.log32.find_by_checksum(entry.checksum)
+            self.assertFalse(other is entry)
+            self.assertTrue(other.log is self.log32)
+            self.assertTrue(other.description is entry.description)
+            self.assertEqual(len(other.pkgs), len(entry.pkgs))
+            for a, b in zip(other.pkgs, entry.pkgs):
+                self.assertTrue(a.description is b.description)
+
+        # Equal package descriptions are the same string, also in different entries
+        rebuilt = set([id(pkg.description) for entry in self.log64.entries for pkg in entry.pkgs
+                       if pkg.description == u'  Rebuilt.\n'])
+        self.assertEqual(1, len(rebuilt))
+
+    def test_reload(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            changelog = os.path.join(tmp, 'slackware64-14.2.txt')
+            shutil.copy('./test/changelogs/slackware64-14.2.txt', changelog)
+            log = self.loader.load(changelog)
+            self.assertTrue(log is self.loader.logs[u'slackware64-14.2'])
+            self.assertTrue(log.entries[0].description is self.log64.entries[0].description)
+            self.assertEqual(log.entries[0].identifier, self.log64.entries[0].identifier)
+            self.assertEqual([u'slackware64-14.2'], list(self.loader.load_all(tmp).keys()))
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_forget(self):
+        parser = SlackLogInterningParser()
+        with codecs.open('./test/changelogs/slackware64-14.2.txt', 'r', 'iso8859-1') as f:
+            data = f.read()
+        log = parser.parse(data)
+        self.assertEqual(len(set([entry.checksum for entry in log.entries])), len(parser.entries))
+        for entry in parser.entries.values():
+            self.assertTrue(entry.log is log)
+
+        # The entries of a log that is gone are forgotten, and so are their descriptions
+        edited = parser.reparse(data.replace(u'Rebuilt.', u'Recompiled.'), log)
+        del log, entry
+        gc.collect()
+        self.assertEqual(len(set([entry.checksum for entry in edited.entries])), len(parser.entries))
+        for entry in parser.entries.values():
+            self.assertTrue(entry.log is edited)
+        # The descriptions are pruned with the next parse
+        parser.prune(edited)
+        self.assertFalse(u'  Rebuilt.\n' in parser.strings)
+        self.assertTrue(u'  Recompiled.\n' in parser.strings)
+
+    def test_threads(self):
+        parser = SlackLogInterningParser()
+        names = ['slackware-14.2', 'slackware64-14.2', 'slackware-current', 'slackware64-current']
+        data = {}
+        for name in names:
+            with codecs.open('./test/changelogs/%s.txt' % name, 'r', 'iso8859-1') as f:
+                data[name] = f.read()
+        logs = {}
+
+        def parse(name):
+            logs[name] = parser.parse(data[name])
+
+        threads = [threading.Thread(target=parse, args=(name,)) for name in names]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for name in names:
+            expected = SlackLogParser().parse(data[name])
+            self.assertEqual([(e.identifier, e.description) for e in expected.entries],
+                             [(e.identifier, e.description) for e in logs[name].entries])
@@ -0,0 +1,51 @@
+# coding=utf-8
+# encoding: utf-8
+import unittest
+from slacklog.formatters import SlackLogAtomFormatter, SlackLogJsonFormatter
+from slacklog.merge import merge, iter_merge
+from slacklog.parsers import SlackLogParser
+from slacklog.scripts import read
+
+
+class MergeTest (unittest.TestCase):
+
+    def setUp(self):
+        parser = SlackLogParser()
+        self.logs = []
+        for name in ['slackware64-14.2', 'slackware64-current', 'slackware-14.1']:
+            log = parser.parse(read('./test/changelogs/%s.txt' % name, 'iso8859-1'))
+            log.release = name
+            self.logs.append(log)
+
+    def test_merge(self):
+        entries = [entry for log in self.logs for entry in log.entries]
+        expected = sorted(entries, key=lambda entry: entry.timestamp, reverse=True)
+        self.assertEqual(expected, list(iter_merge(self.logs)))
+        merged = merge(self.logs, 20)
+        self.assertEqual(expected[:20], merged.entries)
+        # The entries stay in their own logs
+        self.assertEqual(set([log.release for log in self.logs]), set([entry.log.release for entry in merged.entries]))
+        self.assertTrue(all([entry in entry.log.entries for entry in merged.entries]))
+        self.assertEqual([], merge([]).entries)
+
+    def test_security(self):
+        merged = merge(self.logs, 10, lambda entry: entry.security)
+        self.assertEqual(10, len(merged.entries))
+        self.assertTrue(all([u'(* Security fix *)' in entry.description
+                             or any([u'(* Security fix *)' in pkg.description for pkg in entry.pkgs])
+                             for entry in merged.entries]))
+
+    def test_labels(self):
+        merged = merge(self.logs, 10)
+        fmt = SlackLogAtomFormatter()
+        fmt.slackware = u'All Slackware'
+        fmt.link = u'http://example.com/all.atom'
+        data = fmt.format(merged)
+        self.assertIn(u'<title>All Slackware ChangeLog</title>', data)
+        for entry in merged.entries:
+            self.assertIn(u'<id>http://example.com/all.atom#%s-%s</id>'
+                          % (entry.log.release, entry.timestamp.strftime('%Y%m%dT%H%M%SZ')), data)
+        self.assertIn(u'"release":"slackware64-current"', SlackLogJsonFormatter().format(merged))
+        # Logs without a release are not labelled
+        self.logs[0].release = None
+        self.assertNotIn(u'"release"', SlackLogJsonFormatter().format(self.logs[0]))
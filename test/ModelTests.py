@@ -0,0 +1,74 @@
+# coding=utf-8
+# encoding: utf-8
+import unittest
+import codecs
+from datetime import datetime
+from dateutil import tz
+from slacklog.models import SlackLog, SlackLogEntry, SlackLogPkg
+from slacklog.parsers import SlackLogParser
+
+
+class ModelTests (unittest.TestCase):
+
+    def setUp(self):
+        with codecs.open('./test/changelogs/slackware64-14.2.txt', 'r', 'iso8859-1') as f:
+            self.data = f.read()
+        self.log = SlackLogParser().parse(self.data)
+
+    def test_find(self):
+        for entry in self.log.entries:
+            self.assertTrue(self.log.find(entry.identifier) is entry)
+        self.assertEqual(None, self.log.find(u'nonexistent'))
+        entry = self.log.entries[10]
+        self.assertTrue(self.log.find_by_checksum(entry.checksum) is entry)
+
+    def test_entries_between(self):
+        utc = tz.tzutc()
+        start = datetime(2018, 1, 1, tzinfo=utc)
+        end = datetime(2019, 1, 1, tzinfo=utc)
+        expected = [entry for entry in self.log.entries if start <= entry.timestamp < end]
+        self.assertTrue(expected)
+        self.assertEqual(expected, self.log.entries_between(start, end))
+        self.assertEqual([entry for entry in self.log.entries if entry.timestamp < end],
+                         self.log.entries_between(None, end))
+        self.assertEqual(self.log.entries, self.log.entries_between())
+        self.assertEqual([], self.log.entries_between(end, start))
+
+        # Entry timestamps are inclusive at the start, and exclusive at the end
+        entry = expected[0]
+        self.assertEqual([entry], [e for e in self.log.entries_between(entry.timestamp, end) if e is entry])
+        self.assertEqual([], [e for e in self.log.entries_between(start, entry.timestamp) if e is entry])
+
+    def test_invalidation(self):
+        indexes = self.log.index()
+        self.assertTrue(self.log.index() is indexes)
+        log = SlackLogParser().reparse(u'Sat Jan  1 00:00:00 UTC 2050\na/aaa_base-14.2-x86_64-9.txz:  Rebuilt.\n'
+                                       u'+--------------------------+\n' + self.data, self.log)
+        entry = log.entries.pop(0)
+        self.log.entries.insert(0, entry)
+        self.assertTrue(self.log.find(entry.identifier) is entry)
+        self.assertFalse(self.log.index() is indexes)
+        self.log.entries.pop()
+        self.assertEqual(len(self.log.entries), len(self.log.entries_between()))
+
+    def test_pkg_action(self):
+        entry = SlackLogEntry(datetime(2019, 1, 1, tzinfo=tz.tzutc()), u'', SlackLog())
+
+        def pkg(description):
+            return SlackLogPkg(u'a/glibc-2.29-x86_64-1.txz', description, entry)
+
+        self.assertEqual(u'upgraded', pkg(u'  Upgraded.\n').action)
+        self.assertEqual(u'rebuilt', pkg(u'  Recompiled.\n').action)
+        self.assertEqual(u'added', pkg(u'  Added.\n').action)
+        self.assertEqual(u'removed', pkg(u'  Removed.\n').action)
+        self.assertEqual(u'patched', pkg(u'  Patched to fix a crash.\n').action)
+        self.assertEqual(u'moved', pkg(u'  Moved from /extra.\n').action)
+        self.assertEqual(u'other', pkg(u'  Upgradedness.\n').action)
+        self.assertFalse(pkg(u'  Upgraded.\n').security)
+        self.assertTrue(pkg(u'  Upgraded.\n  (* Security fix *)\n').security)
+        self.assertFalse(entry.security)
+        entry.pkgs.append(pkg(u'  Upgraded.\n  (* Security fix *)\n'))
+        self.assertTrue(entry.security)
+        entry = SlackLogEntry(datetime(2019, 1, 1, tzinfo=tz.tzutc()), u'Fixed a hole.  (* Security fix *)\n',
+                              SlackLog())
+        self.assertTrue(entry.security)
@@ -1,8 +1,10 @@
 # coding=utf-8
 # encoding: utf-8
+import sys
+import threading
 import unittest
 from slacklog.scripts import read
-from slacklog.parsers import SlackLogParser
+from slacklog.parsers import SlackLogParser, SlackLogParserStats
 from datetime import datetime
 from dateutil import tz
 
@@ -80,6 +82,199 @@ l/gtk+3-3.22.14-i586-1.txz:  Upgraded.
         check(u'Thu May 11 18:09:15 UTC 2017\n+-+\nThu May 11 18:09:15 UTC 2017', False, False)
         check(u'+-+\nThu May 11 18:09:15 UTC 2017\n+-+\nThu May 11 18:09:15 UTC 2017\n+-+', True, True)
 
+    def test_stats(self):
+        p = SlackLogParser()
+        p.stats = SlackLogParserStats()
+        log = p.parse(read('./test/slackware-leet-rc3-entry.txt', 'iso8859-1'))
+        # Checksums are computed on first use
+        self.assertFalse('gen_entry_checksum' in p.stats.calls)
+        self.assertTrue(log.entries[0].identifier is not None)
+        self.assertEqual(1, p.stats.calls['split_log_to_entries'])
+        self.assertEqual(1, p.stats.calls['gen_entry_checksum'])
+        self.assertEqual(1, p.stats.calls['parse_entry_timestamp'])
+        self.assertEqual(len(log.entries[0].pkgs), p.stats.calls['parse_pkg'])
+        self.assertTrue(p.stats.times['parse_pkg'] > 0)
+        report = p.stats.report()
+        for phase in SlackLogParserStats.PHASES:
+            self.assertIn(phase, report)
+
+    def test_reparse(self):
+        p = SlackLogParser()
+        old = p.parse(read('./test/good-11-slackware-13.0.txt', 'iso8859-1'))
+        entries = list(old.entries)
+        data = u'''Fri Dec  2 18:12:04 UTC 2011
+a/glibc-2.11.1-i486-3.txz:  Rebuilt.
++--------------------------+
+''' + read('./test/good-11-slackware-13.0.txt', 'iso8859-1')
+        new = p.reparse(data, old)
+        self.assertEqual(len(entries) + 1, len(new.entries))
+        self.assertEqual(u'a/glibc-2.11.1-i486-3.txz', new.entries[0].pkgs[0].pkg)
+        self.assertEqual(entries[0].identifier, new.entries[0].parent)
+        # Old entries were copied, and the old log is intact
+        self.assertEqual(entries, old.entries)
+        for old_entry, new_entry in zip(entries, new.entries[1:]):
+            self.assertFalse(old_entry is new_entry)
+            self.assertTrue(old_entry.log is old)
+            self.assertTrue(new_entry.log is new)
+            self.assertTrue(old_entry.description is new_entry.description)
+            self.assertEqual(old_entry.identifier, new_entry.identifier)
+            self.assertEqual([pkg.pkg for pkg in old_entry.pkgs], [pkg.pkg for pkg in new_entry.pkgs])
+            for pkg in new_entry.pkgs:
+                self.assertTrue(pkg.entry is new_entry)
+        fresh = p.parse(data)
+        self.assertEqual([e.identifier for e in fresh.entries], [e.identifier for e in new.entries])
+
+    def test_parse_bytes(self):
+        with open('./test/changelogs/slackware64-14.2.txt', 'rb') as f:
+            raw = f.read()
+        expected = SlackLogParser().parse(read('./test/changelogs/slackware64-14.2.txt', 'iso8859-1'))
+
+        # Version 1: the same log as from the decoded data
+        log = SlackLogParser().parse_bytes(raw, 'iso8859-1')
+        self.assertEqual(1, log.checksumVersion)
+        self.assertEqual(len(expected.entries), len(log.entries))
+        for e, entry in zip(expected.entries, log.entries):
+            self.assertEqual(e.checksum, entry.checksum)
+            self.assertEqual(e.identifier, entry.identifier)
+            self.assertEqual(e.description, entry.description)
+            self.assertEqual([(pkg.pkg, pkg.description) for pkg in e.pkgs],
+                             [(pkg.pkg, pkg.description) for pkg in entry.pkgs])
+
+        # Version 2: other identifiers, but the same from the decoded and the undecoded data
+        p = SlackLogParser()
+        p.checksum_version = 2
+        log = p.parse_bytes(raw)
+        self.assertEqual(2, log.checksumVersion)
+        self.assertNotEqual(expected.entries[0].identifier, log.entries[0].identifier)
+        self.assertEqual(log.entries[1].identifier, log.entries[0].parent)
+        decoded = p.parse(read('./test/changelogs/slackware64-14.2.txt', 'iso8859-1'))
+        self.assertEqual([e.identifier for e in decoded.entries], [e.identifier for e in log.entries])
+        self.assertEqual([e.description for e in expected.entries], [e.description for e in log.entries])
+
+        # Incremental re-parse works on the undecoded data
+        new = p.parse_bytes(b'Wed Mar 13 12:00:00 UTC 2019\na/bar-1.0-x86_64-1.txz:  Rebuilt.\n'
+                            b'+--------------------------+\n' + raw, previous=log)
+        self.assertEqual(len(log.entries) + 1, len(new.entries))
+        self.assertTrue(new.entries[1].description is log.entries[0].description)
+        self.assertEqual(log.entries[0].identifier, new.entries[0].parent)
+
+    def test_parse_bytes_utf8(self):
+        data = u'Thu May 11 18:09:15 UTC 2017\nThanks to J\xf6rg.\n+-+\nWed May 10 18:09:15 UTC 2017\nFirst.\n'
+        p = SlackLogParser()
+        p.checksum_version = 2
+        p.encoding = 'utf-8'
+        log = p.parse_bytes(data.encode('utf-8'))
+        self.assertEqual(u'Thanks to J\xf6rg.\n', log.entries[0].description)
+        self.assertEqual([e.identifier for e in p.parse(data).entries], [e.identifier for e in log.entries])
+
+    def test_lazy(self):
+        data = read('./test/changelogs/slackware64-current.txt', 'iso8859-1')
+        p = SlackLogParser()
+        p.lazy = False
+        expected = p.parse(data)
+        p = SlackLogParser()
+        p.stats = SlackLogParserStats()
+        log = p.parse(data)
+        self.assertEqual({}, dict([(phase, calls) for phase, calls in p.stats.calls.items() if phase.startswith('gen_')]))
 
+        # Only the checksum is computed, if only the checksum is used
+        self.assertEqual(expected.entries[5].checksum, log.entries[5].checksum)
+        self.assertEqual(1, p.stats.calls['gen_entry_checksum'])
+        self.assertFalse('gen_entry_identifier' in p.stats.calls)
 
+        # The identifier of the newest entry depends on all the entries, but each entry is hashed only once
+        self.assertEqual(expected.entries[0].identifier, log.entries[0].identifier)
+        self.assertEqual(len(log.entries), p.stats.calls['gen_entry_checksum'])
+        self.assertEqual(len(log.entries), p.stats.calls['gen_entry_identifier'])
+        for e, entry in zip(expected.entries, log.entries):
+            self.assertTrue(entry.pending is None)
+            self.assertEqual(e.checksum, entry.checksum)
+            self.assertEqual(e.identifier, entry.identifier)
+            self.assertEqual(e.parent, entry.parent)
 
+        # Entries older than min_date are never hashed
+        p = SlackLogParser()
+        p.stats = SlackLogParserStats()
+        p.min_date = log.entries[10].timestamp
+        log = p.parse(data)
+        self.assertEqual(None, log.entries[-1].parent)
+        self.assertEqual(log.entries[-1].identifier, log.entries[-2].parent)
+        self.assertTrue(log.entries[0].identifier is not None)
+        self.assertEqual(11, len(log.entries))
+        self.assertEqual(11, p.stats.calls['gen_entry_checksum'])
+
+    def test_lazy_assign(self):
+        data = read('./test/changelogs/slackware64-14.2.txt', 'iso8859-1')
+        expected = SlackLogParser().parse(data)
+        for field in ['checksum', 'identifier', 'parent']:
+            log = SlackLogParser().parse(data)
+            entry = log.entries[0]
+            self.assertTrue(entry.pending is not None)
+            setattr(entry, field, u'custom')
+            self.assertTrue(entry.pending is None)
+            self.assertEqual(u'custom', getattr(entry, field))
+            # The other fields are computed as before
+            for other in ['checksum', 'identifier', 'parent']:
+                if other != field:
+                    self.assertEqual(getattr(expected.entries[0], other), getattr(entry, other))
+
+    def test_threads(self):
+        data = [read('./test/changelogs/%s.txt' % name, 'iso8859-1')
+                for name in ['slackware64-14.2', 'slackware64-current', 'slackware-14.1', 'slackware-13.37']]
+        p = SlackLogParser()
+        expected = [[e.identifier for e in p.parse(d).entries] for d in data]
+        results = {}
+
+        def parse(index):
+            log = p.parse(data[index % len(data)])
+            results[index] = ([e.identifier for e in log.entries], p.ENTRY)
+
+        threads = [threading.Thread(target=parse, args=(index,)) for index in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for index in range(8):
+            identifiers, entries = results[index]
+            self.assertEqual(expected[index % len(data)], identifiers)
+            # The counters are per thread
+            self.assertEqual(len(identifiers), entries)
+
+    def test_threads_shared_log(self):
+        data = read('./test/changelogs/slackware64-current.txt', 'iso8859-1')
+        expected = SlackLogParser().parse(data)
+        p = SlackLogParser()
+        for attempt in range(10):
+            log = p.parse(data)
+            results = []
+            errors = []
+
+            def resolve(position):
+                try:
+                    entry = log.entries[position]
+                    results.append((position, entry.identifier, entry.parent, entry.checksum))
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=resolve, args=(index % 2,)) for index in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual([], errors)
+            self.assertEqual(8, len(results))
+            for position, identifier, parent, checksum in results:
+                e = expected.entries[position]
+                self.assertEqual((e.identifier, e.parent, e.checksum), (identifier, parent, checksum))
+
+    @unittest.skipUnless(sys.version_info >= (3, 4), 'asyncio requires Python 3.4')
+    def test_parse_async(self):
+        import asyncio
+        data = read('./test/changelogs/slackware64-14.2.txt', 'iso8859-1')
+        p = SlackLogParser()
+        loop = asyncio.new_event_loop()
+        try:
+            log = loop.run_until_complete(p.parse_async(data, loop=loop))
+        finally:
+            loop.close()
+        self.assertEqual([e.identifier for e in p.parse(data).entries], [e.identifier for e in log.entries])
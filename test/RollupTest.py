@@ -0,0 +1,67 @@
+# coding=utf-8
+# encoding: utf-8
+import unittest
+import codecs
+import os
+import shutil
+import tempfile
+from slacklog.parsers import SlackLogParser
+from slacklog.rollups import SlackLogRollup, rollup_file
+from slacklog.scripts import read
+
+
+class RollupTest (unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data = read('./test/changelogs/slackware64-14.2.txt', 'iso8859-1')
+        self.changelog = os.path.join(self.directory, 'slackware64-14.2.txt')
+        self.log = SlackLogParser().parse(self.data)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, True)
+
+    def write(self, data):
+        with codecs.open(self.changelog, 'w', 'iso8859-1') as f:
+            f.write(data)
+        # Make sure the modification time changes
+        st = os.stat(self.changelog)
+        os.utime(self.changelog, (st.st_atime + 1, st.st_mtime + 1))
+
+    def test_counts(self):
+        rollup = SlackLogRollup(rollup_file(self.changelog))
+        self.assertEqual(len(self.log.entries), rollup.update(self.log))
+        entries = [entry for entry in self.log.entries if entry.timestamp.strftime('%Y-%m') == '2018-06']
+        self.assertTrue(entries)
+        counts = rollup.months[u'2018-06']
+        self.assertEqual(len(entries), counts[u'entries'])
+        self.assertEqual(sum([len(entry.pkgs) for entry in entries]), counts[u'pkgs'])
+        self.assertEqual(len([pkg for entry in entries for pkg in entry.pkgs if pkg.action == u'upgraded']),
+                         counts[u'upgraded'])
+        self.assertEqual(len(self.log.entries), sum([counts[u'entries'] for counts in rollup.weeks.values()]))
+        self.assertEqual(len(self.log.entries), sum([counts[u'entries'] for counts in rollup.months.values()]))
+
+    def test_update_changelog(self):
+        filename = rollup_file(self.changelog)
+        self.assertEqual(os.path.join(self.directory, 'slackware64-14.2.rollup.json'), filename)
+
+        # An older version of the ChangeLog, without the ten newest entries
+        separator = u'+--------------------------+\n'
+        self.write(self.data.split(separator, 10)[10])
+        rollup = SlackLogRollup(filename)
+        self.assertEqual(len(self.log.entries) - 10, rollup.update_changelog(self.changelog))
+        self.assertEqual(None, rollup.update_changelog(self.changelog))
+
+        # Only the new entries are counted, and the result is the same as counting from scratch
+        self.write(self.data)
+        rollup = SlackLogRollup(filename)
+        self.assertEqual(10, rollup.update_changelog(self.changelog))
+        expected = SlackLogRollup(os.path.join(self.directory, 'expected.json'))
+        expected.update(self.log)
+        self.assertEqual(expected.weeks, SlackLogRollup(filename).weeks)
+        self.assertEqual(expected.months, SlackLogRollup(filename).months)
+
+        # The counted entries were edited, so everything is counted again
+        self.write(self.data.replace(u'Upgraded.', u'Rebuilt.'))
+        self.assertEqual(len(self.log.entries), rollup.update_changelog(self.changelog))
+        self.assertEqual(0, sum([counts[u'upgraded'] for counts in rollup.months.values()]))
@@ -0,0 +1,46 @@
+# coding=utf-8
+# encoding: utf-8
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+from slacklog.scripts import slacklog2json
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+
+class ScriptsTests (unittest.TestCase):
+
+    def setUp(self):
+        self.output = tempfile.mkdtemp()
+        self.argv = sys.argv
+        self.stderr = sys.stderr
+
+    def tearDown(self):
+        sys.argv = self.argv
+        sys.stderr = self.stderr
+        shutil.rmtree(self.output, True)
+
+    def run_script(self, script, *args):
+        sys.argv = [script.__name__] + list(args)
+        sys.stderr = StringIO()
+        script()
+        return sys.stderr.getvalue()
+
+    def test_timings_json(self):
+        out = os.path.join(self.output, 'slackware-14.2.json')
+        stderr = self.run_script(slacklog2json,
+                                 '--changelog', './test/changelogs/slackware-14.2.txt',
+                                 '--out', out,
+                                 '--timings-json')
+        timings = json.loads(stderr)
+        self.assertEqual('slacklog2json', timings['command'])
+        self.assertEqual(['read', 'parse', 'format', 'write'], [phase['phase'] for phase in timings['phases']])
+        self.assertEqual(os.path.getsize('./test/changelogs/slackware-14.2.txt'), timings['phases'][0]['bytes_in'])
+        self.assertEqual(os.path.getsize(out), timings['phases'][3]['bytes_out'])
+        self.assertTrue(timings['phases'][1]['entries'] > 0)
@@ -0,0 +1,96 @@
+# coding=utf-8
+# encoding: utf-8
+import unittest
+import os
+import shutil
+import tempfile
+import threading
+from slacklog.server import SlackLogFeed, SlackLogServer
+
+try:
+    from urllib.request import Request, urlopen
+    from urllib.error import HTTPError
+except ImportError:
+    from urllib2 import Request, urlopen, HTTPError
+
+
+class ServerTest (unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.changelog = os.path.join(self.tmp, 'ChangeLog.txt')
+        shutil.copy('./test/changelogs/slackware64-14.2.txt', self.changelog)
+        self.feed = SlackLogFeed(u'slackware64-14.2', self.changelog)
+        self.server = SlackLogServer(('localhost', 0), [self.feed], quiet=True)
+        self.server.refresh()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        shutil.rmtree(self.tmp, True)
+
+    def get(self, path, **headers):
+        request = Request('%s/%s' % (self.server.base_url, path), headers=headers)
+        try:
+            response = urlopen(request)
+        except HTTPError as e:
+            return e.code, e.headers, None
+        try:
+            return response.getcode(), response.info(), response.read()
+        finally:
+            response.close()
+
+    def test_formats(self):
+        for fmt, start in [('rss', b'<?xml'), ('atom', b'<?xml'), ('json', b'{'), ('txt', b'Tue Mar 12')]:
+            status, headers, body = self.get('slackware64-14.2.%s' % fmt)
+            self.assertEqual(200, status)
+            self.assertEqual(self.server.content_types[fmt], headers['Content-Type'])
+            self.assertTrue(body.startswith(start))
+        self.assertEqual(404, self.get('slackware64-14.2.html')[0])
+        self.assertEqual(404, self.get('slackware-14.2.rss')[0])
+
+    def test_conditional_get(self):
+        status, headers, body = self.get('slackware64-14.2.rss')
+        etag = headers['ETag']
+        last_modified = headers['Last-Modified']
+        self.assertEqual(304, self.get('slackware64-14.2.rss', **{'If-None-Match': etag})[0])
+        self.assertEqual(304, self.get('slackware64-14.2.rss', **{'If-Modified-Since': last_modified})[0])
+        # Different format, different ETag
+        self.assertEqual(200, self.get('slackware64-14.2.atom', **{'If-None-Match': etag})[0])
+
+        # The modification time is checked without rendering the feed
+        self.server.cache.clear()
+        misses = self.server.cache.misses
+        status, headers, body = self.get('slackware64-14.2.rss', **{'If-Modified-Since': last_modified})
+        self.assertEqual(304, status)
+        self.assertEqual(misses, self.server.cache.misses)
+        # The ETag of a feed that is not cached is checked against the rendered feed
+        self.assertEqual(304, self.get('slackware64-14.2.rss', **{'If-None-Match': etag})[0])
+        self.assertEqual(misses + 1, self.server.cache.misses)
+        self.assertEqual(304, self.get('slackware64-14.2.rss', **{'If-None-Match': etag})[0])
+        self.assertEqual(misses + 1, self.server.cache.misses)
+
+        # Add an entry to the ChangeLog
+        with open(self.changelog, 'rb') as f:
+            data = f.read()
+        with open(self.changelog, 'wb') as f:
+            f.write(b'Sat Jan  1 00:00:00 UTC 2050\na/aaa_base-14.2-x86_64-9.txz:  Rebuilt.\n'
+                    b'+--------------------------+\n')
+            f.write(data)
+        os.utime(self.changelog, (2524608000, 2524608000))
+        log = self.feed.log
+        entries = list(log.entries)
+        self.assertTrue(self.feed.refresh())
+        self.assertFalse(self.feed.refresh())
+        # Old entries were reused, but the old log, which other requests may be formatting, is intact
+        self.assertTrue(self.feed.log.entries[1].description is entries[0].description)
+        self.assertEqual(entries, log.entries)
+        self.assertTrue(entries[0].log is log)
+
+        status, headers, body = self.get('slackware64-14.2.rss', **{'If-None-Match': etag})
+        self.assertEqual(200, status)
+        self.assertNotEqual(etag, headers['ETag'])
+        self.assertIn(b'a/aaa_base-14.2-x86_64-9.txz', body)
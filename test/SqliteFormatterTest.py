@@ -0,0 +1,65 @@
+# coding=utf-8
+# encoding: utf-8
+import unittest
+import os
+import shutil
+import sqlite3
+import tempfile
+from slacklog.scripts import read
+from slacklog.parsers import SlackLogParser
+from slacklog.formatters import SlackLogSqliteFormatter
+
+
+class SqliteFormatterTest (unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.data = read('./test/changelogs/slackware64-14.2.txt', 'iso-8859-1')
+        self.parser = SlackLogParser()
+        self.formatter = SlackLogSqliteFormatter()
+        self.formatter.database = os.path.join(self.tmp, 'slacklog.db')
+        self.formatter.slackware = u'slackware64 14.2'
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, True)
+
+    def query(self, sql, *params):
+        db = sqlite3.connect(self.formatter.database)
+        try:
+            return db.execute(sql, params).fetchall()
+        finally:
+            db.close()
+
+    def test(self):
+        log = self.parser.parse(self.data)
+        self.assertEqual((len(log.entries), 0), self.formatter.store(log))
+        rows = self.query(u'SELECT identifier, parent, checksum, timestamp, description FROM entries '
+                          u'ORDER BY timestamp DESC, id DESC')
+        self.assertEqual([(entry.identifier, entry.parent, entry.checksum,
+                           entry.timestamp.strftime('%Y-%m-%d %H:%M:%S'), entry.description)
+                          for entry in log.entries], rows)
+        rows = self.query(u'SELECT p.pkg, p.description FROM pkgs p JOIN entries e ON e.id = p.entry '
+                          u'WHERE e.identifier = ? ORDER BY p.position', log.entries[3].identifier)
+        self.assertEqual([(pkg.pkg, pkg.description) for pkg in log.entries[3].pkgs], rows)
+        self.assertTrue(self.query(u"SELECT COUNT(*) FROM pkgs WHERE name = 'patches/packages/openssl'")[0][0] > 0)
+
+        # Only the new entries are inserted
+        self.assertEqual((0, 0), self.formatter.store(self.parser.parse(self.data)))
+        log = self.parser.parse(u'Sat Jan  1 00:00:00 UTC 2050\na/aaa_base-14.2-x86_64-9.txz:  Rebuilt.\n'
+                                u'+--------------------------+\n' + self.data)
+        self.assertEqual((1, 0), self.formatter.store(log))
+        self.assertEqual([(len(log.entries),)], self.query(u'SELECT COUNT(*) FROM entries'))
+        self.assertEqual([(u'a/aaa_base',)], self.query(u"SELECT name FROM pkgs WHERE pkg = 'a/aaa_base-14.2-x86_64-9.txz'"))
+
+        # Entries that are no longer in the log are deleted
+        self.assertEqual((0, 1), self.formatter.store(self.parser.parse(self.data)))
+        self.assertEqual([], self.query(u"SELECT name FROM pkgs WHERE pkg = 'a/aaa_base-14.2-x86_64-9.txz'"))
+
+        # Logs are kept apart
+        # A frozen formatter stores the log, too
+        self.formatter.slackware = u'slackware 14.2'
+        self.formatter.freeze()
+        self.assertEqual(u'', self.formatter.format(self.parser.parse(read('./test/changelogs/slackware-14.2.txt',
+                                                                           'iso-8859-1'))))
+        self.assertEqual([(u'slackware 14.2',), (u'slackware64 14.2',)],
+                         self.query(u'SELECT name FROM logs ORDER BY name'))
@@ -5,6 +5,7 @@ import os
 import codecs
 import filecmp
 import shutil
+from datetime import timedelta
 from slacklog.scripts import read
 from slacklog.parsers import SlackLogParser
 from slacklog.formatters import SlackLogTxtFormatter
@@ -40,3 +41,40 @@ class TxtFormatterTest (unittest.TestCase):
         match, mismatch, error = filecmp.cmpfiles(self.input, self.output, changelogs, False)
 
         self.assertEqual(len(changelogs), len(match))
+
+    def test_spans(self):
+        parser = SlackLogParser()
+        parser.keep_spans = True
+        formatter = SlackLogTxtFormatter()
+
+        for changelog in os.listdir(self.input):
+            data = read(self.input + changelog, self.encoding)
+            slacklog = parser.parse(data)
+            self.assertTrue(slacklog.source is not None)
+            self.assertEqual(data, formatter.format(slacklog))
+
+        # Entries changed in memory are formatted from their parts
+        entry = slacklog.entries[1]
+        start, end = entry.span
+        pkg = entry.pkgs[0]
+        old = u'%s:%s' % (pkg.pkg, pkg.description)
+        pkg.description = u'  Changed.\n'
+        self.assertEqual(None, entry.span)
+        changed = data[start:end].replace(old, u'%s:  Changed.\n' % pkg.pkg)
+        self.assertNotEqual(data[start:end], changed)
+        self.assertEqual(data[:start] + changed + data[end:], formatter.format(slacklog))
+        del entry.pkgs[0]
+        changed = data[start:end].replace(old, u'')
+        self.assertEqual(data[:start] + changed + data[end:], formatter.format(slacklog))
+        entry.description += u'More.\n'
+        self.assertEqual(None, entry.span)
+        slacklog = parser.parse(data)
+        slacklog.entries[0].timestamp += timedelta(seconds=1)
+        self.assertEqual(None, slacklog.entries[0].span)
+        self.assertNotEqual(data, formatter.format(slacklog))
+
+        # Entries reused in a re-parsed log are copied from the new source
+        new_data = u'Sat Jan  1 00:00:00 UTC 2050\na/aaa_base-14.2-x86_64-9.txz:  Rebuilt.\n' \
+                   u'+--------------------------+\n' + data
+        new_log = parser.reparse(new_data, parser.parse(data))
+        self.assertEqual(new_data, formatter.format(new_log))
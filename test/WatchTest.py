@@ -0,0 +1,66 @@
+# coding=utf-8
+# encoding: utf-8
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from slacklog.watch import SlackLogWatcher, SlackLogInotifyBackend, SlackLogPollingBackend
+
+
+class WatchTest (unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, True)
+
+    def write(self, name, data):
+        with open(os.path.join(self.tmp, name), 'wb') as f:
+            f.write(data)
+
+    def check(self, watcher):
+        try:
+            self.assertEqual([], watcher.wait(0.1))
+            # A burst of changes is reported once, and only the matching files
+            timers = [threading.Timer(0.05 * n, self.write, ['%s.txt' % name, b'x' * n])
+                      for n, name in enumerate(['a', 'b', 'a', 'notes'], 1)]
+            timers.append(threading.Timer(0.05, self.write, ['a.rss', b'x']))
+            for timer in timers:
+                timer.start()
+            changed = watcher.wait(5)
+            for timer in timers:
+                timer.join()
+            self.assertEqual([os.path.join(self.tmp, name) for name in ('a.txt', 'b.txt', 'notes.txt')], changed)
+            self.assertEqual([], watcher.wait(0.1))
+            # Changes of other files do not end the wait
+            timers = [threading.Timer(0.05, self.write, ['a.rss', b'xx']),
+                      threading.Timer(0.5, self.write, ['b.txt', b'xx'])]
+            for timer in timers:
+                timer.start()
+            changed = watcher.wait()
+            for timer in timers:
+                timer.join()
+            self.assertEqual([os.path.join(self.tmp, 'b.txt')], changed)
+            timer = threading.Timer(0.05, self.write, ['a.rss', b'xxx'])
+            timer.start()
+            start = time.time()
+            self.assertEqual([], watcher.wait(0.5))
+            self.assertTrue(time.time() - start >= 0.45)
+            timer.join()
+        finally:
+            watcher.close()
+
+    def test_polling(self):
+        watcher = SlackLogWatcher(self.tmp, debounce=0.3, interval=0.02, polling=True)
+        self.assertTrue(isinstance(watcher.backend, SlackLogPollingBackend))
+        self.check(watcher)
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), 'inotify is only available on Linux')
+    def test_inotify(self):
+        watcher = SlackLogWatcher(self.tmp, debounce=0.3)
+        self.assertTrue(isinstance(watcher.backend, SlackLogInotifyBackend))
+        self.check(watcher)